@@ -1,3 +1,6 @@
+-- 三元组相似度扩展（术语近似匹配使用）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- 创建翻译知识库表
 CREATE TABLE IF NOT EXISTS "翻译知识库" (
     "中文" VARCHAR PRIMARY KEY,
@@ -5,6 +8,31 @@ CREATE TABLE IF NOT EXISTS "翻译知识库" (
     "日语" VARCHAR,
     "韩语" VARCHAR
 );
+-- 三元组 GIN 索引：术语近似匹配（相似度 % 运算符）走索引，不扫描全表
+CREATE INDEX IF NOT EXISTS "翻译知识库_中文_trgm_idx" ON "翻译知识库" USING gin ("中文" gin_trgm_ops);
+
+-- 创建长表格式的术语表（GLOSSARY_LAYOUT=long 时使用，每个 (中文, 语言) 一行，新增语言无需修改表结构）
+CREATE TABLE IF NOT EXISTS "术语翻译" (
+    "中文" VARCHAR NOT NULL,
+    "语言" VARCHAR NOT NULL,
+    "译文" VARCHAR NOT NULL,
+    CONSTRAINT "术语翻译_pkey" PRIMARY KEY ("中文", "语言") INCLUDE ("译文")
+);
+-- 主键与二级索引均包含译文：按术语查询翻译、按语言查询术语及列出可用语言时都只需扫描索引
+CREATE INDEX IF NOT EXISTS "术语翻译_语言_中文_idx" ON "术语翻译" ("语言", "中文") INCLUDE ("译文");
+CREATE INDEX IF NOT EXISTS "术语翻译_中文_trgm_idx" ON "术语翻译" USING gin ("中文" gin_trgm_ops);
+
+-- 创建翻译记忆表（段落级翻译缓存，键为 sha256(规范化原文, 目标语言, 模型, 配置哈希)）
+CREATE TABLE IF NOT EXISTS "翻译记忆" (
+    "缓存键" VARCHAR(64) PRIMARY KEY,
+    "原文" TEXT NOT NULL,
+    "目标语言" VARCHAR NOT NULL,
+    "模型" VARCHAR NOT NULL,
+    "配置哈希" VARCHAR(16) NOT NULL,
+    "译文" TEXT NOT NULL,
+    "更新时间" TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS "翻译记忆_目标语言_idx" ON "翻译记忆" ("目标语言");
 
 -- 插入示例数据
 INSERT INTO "翻译知识库" ("中文", "英语", "日语", "韩语") VALUES
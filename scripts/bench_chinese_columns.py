@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+中文列识别基准测试：逐单元格正则 vs 采样 + 整块正则扫描
+
+生成合成CSV文件（文本列中部分为中文列，其中一列只在最后一行出现中文，另有数值列），
+读取后分别用两种方式识别中文列，对比耗时并校验结果一致。不需要数据库。
+使用方式: python scripts/bench_chinese_columns.py --rows 1000000 --columns 40
+          python scripts/bench_chinese_columns.py --rows 200000 --columns 200 --keep
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+# 添加 src 目录到 Python 路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_dir = os.path.join(workspace_path, 'src')
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
+
+import pandas as pd
+from graphs.nodes.read_csv_node import CHINESE_PATTERN, detect_chinese_columns
+
+
+def detect_per_cell(df: pd.DataFrame) -> list:
+    """原实现：每列转为字符串后逐单元格正则匹配"""
+    chinese_columns = []
+    for column in df.columns:
+        column_values = df[column].astype(str)
+        if column_values.apply(lambda x: bool(CHINESE_PATTERN.search(x))).any():
+            chinese_columns.append(column)
+    return chinese_columns
+
+
+def write_synthetic_csv(path: str, rows: int, columns: int, chinese_ratio: float) -> None:
+    """生成合成CSV：前 chinese_ratio 的文本列为中文，最后一个文本列只在末行出现中文，每4列一个数值列"""
+    random.seed(0)
+    data = {}
+    text_columns = [f"文本{i}" for i in range(columns) if i % 4 != 3]
+    chinese_count = int(len(text_columns) * chinese_ratio)
+    for i in range(columns):
+        if i % 4 == 3:
+            data[f"数值{i}"] = [random.randrange(100000) for _ in range(rows)]
+            continue
+        name = f"文本{i}"
+        index = text_columns.index(name)
+        if index < chinese_count:
+            data[name] = [f"商品名称{j % 997}" for j in range(rows)]
+        else:
+            data[name] = [f"SKU-{j % 9973}" for j in range(rows)]
+            if index == len(text_columns) - 1:
+                data[name][-1] = "末行中文"
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="中文列识别基准测试")
+    parser.add_argument("--rows", type=int, default=1000000, help="行数")
+    parser.add_argument("--columns", type=int, default=40, help="列数")
+    parser.add_argument("--chinese-ratio", type=float, default=0.5, help="文本列中中文列的比例")
+    parser.add_argument("--skip-per-cell", action="store_true", help="跳过逐单元格识别（耗时较长）")
+    parser.add_argument("--keep", action="store_true", help="保留生成的CSV文件")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".csv", prefix="bench_chinese_columns_")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        write_synthetic_csv(path, args.rows, args.columns, args.chinese_ratio)
+        print(f"生成合成文件: {args.rows} 行 x {args.columns} 列, {os.path.getsize(path) / 1024 / 1024:.1f}MB, 耗时 {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        df = pd.read_csv(path)
+        print(f"读取CSV: 耗时 {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        fast = detect_chinese_columns(df)
+        fast_elapsed = time.perf_counter() - start
+        print(f"采样 + 整块扫描: 识别 {len(fast)} 个中文列, 耗时 {fast_elapsed * 1000:.1f}ms")
+
+        if not args.skip_per_cell:
+            start = time.perf_counter()
+            per_cell = detect_per_cell(df)
+            per_cell_elapsed = time.perf_counter() - start
+            print(f"逐单元格: 识别 {len(per_cell)} 个中文列, 耗时 {per_cell_elapsed * 1000:.1f}ms")
+            print(f"加速比: {per_cell_elapsed / fast_elapsed:.1f}x, 结果一致: {per_cell == fast}")
+    finally:
+        if args.keep:
+            print(f"合成文件: {path}")
+        else:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+术语近似匹配基准测试：pg_trgm GIN 索引上的批量相似度查询
+
+在一个事务内向术语表（按 GLOSSARY_LAYOUT）写入随机中文术语（默认100万行），从中抽取术语并
+改动一个字或追加标点作为待匹配词，按不同批量大小多次调用 find_similar_terms，输出延迟分位数和召回率。
+结束时回滚事务，不会留下测试数据。需要可用的 PGDATABASE_URL、pg_trgm 扩展及 init-db.sql 中的三元组索引，
+数据库区域设置需为 UTF-8（C 区域下中文字符不产生三元组）。
+使用方式: python scripts/bench_fuzzy_glossary.py --rows 1000000 --batch-sizes 1,50,500
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# 添加 src 目录到 Python 路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_dir = os.path.join(workspace_path, 'src')
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
+
+from sqlalchemy import text
+from storage.database.db import get_session
+from storage.database.translation_manager import TranslationKnowledgeManager
+
+# 随机术语使用的汉字范围（常用汉字区间的前3000个字）
+CJK_START = 0x4E00
+CJK_RANGE = 3000
+PUNCTUATION = "，。、（）-"
+
+
+def seed_glossary(db, mgr: TranslationKnowledgeManager, rows: int) -> None:
+    """在当前事务中用 generate_series 生成随机术语（3~8个字），重复的术语忽略"""
+    term_sql = (
+        f"(SELECT string_agg(chr({CJK_START} + floor(random() * {CJK_RANGE})::int), '') "
+        f"FROM generate_series(1, 3 + g % 6) WHERE g > 0)"
+    )
+    if mgr.layout == "long":
+        db.execute(text(
+            f'INSERT INTO "术语翻译" ("中文", "语言", "译文") '
+            f"SELECT {term_sql}, '英语', 'term ' || g FROM generate_series(1, :rows) g "
+            f'ON CONFLICT DO NOTHING'
+        ), {"rows": rows})
+        db.execute(text('ANALYZE "术语翻译"'))
+    else:
+        db.execute(text(
+            f'INSERT INTO "翻译知识库" ("中文", "英语") '
+            f"SELECT {term_sql}, 'term ' || g FROM generate_series(1, :rows) g "
+            f'ON CONFLICT DO NOTHING'
+        ), {"rows": rows})
+        db.execute(text('ANALYZE "翻译知识库"'))
+
+
+def sample_terms(db, mgr: TranslationKnowledgeManager, count: int):
+    table = "术语翻译" if mgr.layout == "long" else "翻译知识库"
+    rows = db.execute(text(
+        f'SELECT DISTINCT "中文" FROM "{table}" TABLESAMPLE SYSTEM (1) WHERE length("中文") >= 4 LIMIT :count'
+    ), {"count": count}).all()
+    return [row[0] for row in rows]
+
+
+def mutate(term: str) -> str:
+    """模拟近似写法：替换一个字，或在末尾追加标点"""
+    if random.random() < 0.5:
+        i = random.randrange(len(term))
+        return term[:i] + chr(CJK_START + random.randrange(CJK_RANGE)) + term[i + 1:]
+    return term + random.choice(PUNCTUATION)
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="术语近似匹配基准测试")
+    parser.add_argument("--rows", type=int, default=1000000, help="术语表行数")
+    parser.add_argument("--batch-sizes", default="1,50,500", help="每次查询的术语数量，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=20, help="每种批量大小的查询次数")
+    parser.add_argument("--threshold", type=float, default=0.5, help="相似度阈值")
+    args = parser.parse_args()
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+    random.seed(0)
+    mgr = TranslationKnowledgeManager()
+    db = get_session()
+    try:
+        start = time.perf_counter()
+        seed_glossary(db, mgr, args.rows)
+        print(f"写入测试术语: {args.rows} 行（{mgr.layout}）, 耗时 {time.perf_counter() - start:.2f}s")
+
+        originals = sample_terms(db, mgr, max(batch_sizes) * 2)
+        print(f"抽样术语: {len(originals)} 个")
+        for size in batch_sizes:
+            latencies = []
+            found = total = 0
+            for _ in range(args.repeat):
+                batch = random.sample(originals, min(size, len(originals)))
+                queries = {mutate(term): term for term in batch}
+                start = time.perf_counter()
+                matches = mgr.find_similar_terms(db, list(queries), ["英文"], threshold=args.threshold)
+                latencies.append((time.perf_counter() - start) * 1000)
+                total += len(queries)
+                found += sum(
+                    1 for query, term in queries.items()
+                    if any(candidate["term"] == term for candidate in matches.get(query, []))
+                )
+            print(
+                f"批量 {size:>4}: p50 {statistics.median(latencies):.1f}ms, p95 {percentile(latencies, 0.95):.1f}ms, "
+                f"单术语均摊 {statistics.mean(latencies) / size:.2f}ms, 召回率 {found / total:.1%}"
+            )
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+术语查询基准测试：逐词逐语言查询 vs 多语言批量查询
+
+在一个事务内向"翻译知识库"写入测试术语（默认10万行），分别用两种方式查询候选词，
+对比耗时并校验结果一致，结束时回滚事务，不会留下测试数据。
+需要可用的 PGDATABASE_URL。
+使用方式: python scripts/bench_terminology_lookup.py --rows 100000 --words 3000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# 添加 src 目录到 Python 路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_dir = os.path.join(workspace_path, 'src')
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
+
+from sqlalchemy import insert
+from storage.database.db import get_session
+from storage.database.shared.model import 翻译知识库
+from storage.database.translation_manager import TranslationKnowledgeManager
+
+TERM_PREFIX = "基准测试术语"
+INSERT_CHUNK_SIZE = 5000
+
+
+def seed_glossary(db, rows: int) -> None:
+    """在当前事务中写入测试术语"""
+    for start in range(0, rows, INSERT_CHUNK_SIZE):
+        db.execute(insert(翻译知识库), [
+            {"中文": f"{TERM_PREFIX}{i}", "英语": f"term {i}", "日语": f"用語{i}", "韩语": f"용어{i}"}
+            for i in range(start, min(start + INSERT_CHUNK_SIZE, rows))
+        ])
+    db.flush()
+
+
+def bench_per_word(db, mgr: TranslationKnowledgeManager, words, languages) -> dict:
+    """原实现：每个 (语言, 候选词) 一次查询"""
+    result = {}
+    for lang in languages:
+        for word in words:
+            translation = mgr.get_translation(db, word, lang)
+            if translation:
+                result.setdefault(word, {})[lang] = translation
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="术语查询基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="术语表行数")
+    parser.add_argument("--words", type=int, default=3000, help="候选词数量")
+    parser.add_argument("--hit-ratio", type=float, default=0.3, help="候选词命中术语表的比例")
+    parser.add_argument("--languages", default="英文,日文,韩文", help="目标语言，逗号分隔")
+    parser.add_argument("--skip-per-word", action="store_true", help="跳过逐词查询（耗时较长）")
+    args = parser.parse_args()
+
+    languages = [lang for lang in args.languages.split(",") if lang]
+    random.seed(0)
+    hits = int(args.words * args.hit_ratio)
+    words = [f"{TERM_PREFIX}{random.randrange(args.rows)}" for _ in range(hits)]
+    words += [f"未收录词{i}" for i in range(args.words - hits)]
+    words = list(dict.fromkeys(words))
+
+    mgr = TranslationKnowledgeManager()
+    db = get_session()
+    try:
+        start = time.perf_counter()
+        seed_glossary(db, args.rows)
+        print(f"写入测试术语: {args.rows} 行, 耗时 {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        bulk = mgr.get_translations_multi(db, words, languages)
+        bulk_elapsed = time.perf_counter() - start
+        print(f"批量查询: {len(words)} 个候选词 x {len(languages)} 种语言, 命中 {len(bulk)} 个, 耗时 {bulk_elapsed * 1000:.1f}ms")
+
+        if not args.skip_per_word:
+            start = time.perf_counter()
+            per_word = bench_per_word(db, mgr, words, languages)
+            per_word_elapsed = time.perf_counter() - start
+            print(f"逐词查询: {len(words) * len(languages)} 次查询, 命中 {len(per_word)} 个, 耗时 {per_word_elapsed * 1000:.1f}ms")
+            print(f"加速比: {per_word_elapsed / bulk_elapsed:.1f}x, 结果一致: {per_word == bulk}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
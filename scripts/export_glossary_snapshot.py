@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+导出术语表离线快照（mmap 只读文件），数据库不可用或实例冷启动时术语查询使用该快照
+
+按 GLOSSARY_LAYOUT 读取宽表或长表，写入 GLOSSARY_SNAPSHOT_PATH（默认 assets/glossary.snapshot），
+先写临时文件再原子替换，运行中的进程在下次查询时自动映射新文件。建议在术语导入后或定时执行。
+需要可用的 PGDATABASE_URL。
+使用方式: python scripts/export_glossary_snapshot.py
+          python scripts/export_glossary_snapshot.py --output /data/glossary.snapshot
+"""
+
+import os
+import sys
+import argparse
+
+# 添加 src 目录到 Python 路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_dir = os.path.join(workspace_path, 'src')
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
+
+from storage.database.db import get_session
+from storage.database.glossary_snapshot import export_glossary_snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="导出术语表离线快照")
+    parser.add_argument("--output", default=None, help="快照文件路径，默认为 GLOSSARY_SNAPSHOT_PATH")
+    args = parser.parse_args()
+
+    db = get_session()
+    try:
+        stats = export_glossary_snapshot(db, args.output)
+    finally:
+        db.close()
+
+    print(f"快照: {stats['path']}")
+    print(f"术语数: {stats['terms']}, 语言数: {stats['languages']}, 文件大小: {stats['bytes']} 字节, 耗时: {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+批量导入术语到术语表（GLOSSARY_LAYOUT=wide 为"翻译知识库"，long 为"术语翻译"）
+
+文件第一行为表头，需包含"中文"列；语言列可使用数据库列名（英语、日语、韩语）
+或语言别名（英文、English、en），长表格式下其他表头按语言名导入，可用 --ignore 排除。已存在的术语按文件内容更新，文件中为空的翻译不覆盖已有翻译。
+需要可用的 PGDATABASE_URL。
+使用方式: python scripts/import_glossary.py glossary.csv
+          python scripts/import_glossary.py glossary.xlsx --sheet 术语表
+          python scripts/import_glossary.py glossary.csv --layout long --ignore 备注
+"""
+
+import os
+import sys
+import argparse
+
+# 添加 src 目录到 Python 路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_dir = os.path.join(workspace_path, 'src')
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
+
+from storage.database.db import get_session
+from storage.database.glossary_import import import_glossary_file
+from storage.database.translation_manager import GLOSSARY_LAYOUT, GLOSSARY_LAYOUTS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="批量导入术语（COPY + ON CONFLICT 合并）")
+    parser.add_argument("path", help="术语文件路径（.csv/.xlsx）")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV文件编码")
+    parser.add_argument("--sheet", default=None, help="XLSX工作表名称，默认使用活动工作表")
+    parser.add_argument("--layout", default=GLOSSARY_LAYOUT, choices=GLOSSARY_LAYOUTS, help="术语表存储格式")
+    parser.add_argument("--ignore", action="append", default=[], help="不导入的表头名称，可多次指定")
+    args = parser.parse_args()
+
+    db = get_session()
+    try:
+        stats = import_glossary_file(
+            db, args.path, encoding=args.encoding, sheet=args.sheet,
+            layout=args.layout, ignore_columns=args.ignore
+        )
+    finally:
+        db.close()
+
+    print(f"读取行数: {stats['rows_read']}, 跳过（中文为空）: {stats['rows_skipped']}, 写入/更新: {stats['rows_upserted']}")
+    print(f"耗时: {stats['seconds']}s, 速度: {stats['rows_per_second']} 行/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+把宽表"翻译知识库"（每种语言一列）迁移到长表"术语翻译"（每个 (中文, 语言) 一行）
+
+长表不存在时自动创建；可重复执行，宽表保持不变。迁移完成后设置 GLOSSARY_LAYOUT=long 切换查询。
+需要可用的 PGDATABASE_URL。
+使用方式: python scripts/migrate_glossary.py
+"""
+
+import os
+import sys
+
+# 添加 src 目录到 Python 路径
+workspace_path = os.getenv("COZE_WORKSPACE_PATH", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_dir = os.path.join(workspace_path, 'src')
+if app_dir not in sys.path:
+    sys.path.insert(0, app_dir)
+
+from storage.database.db import get_session
+from storage.database.glossary_migration import migrate_wide_to_long
+
+
+def main() -> None:
+    db = get_session()
+    try:
+        stats = migrate_wide_to_long(db)
+    finally:
+        db.close()
+
+    for language, count in stats["languages"].items():
+        print(f"{language}: {count} 行")
+    print(f"写入/更新: {stats['rows_upserted']} 行, 耗时: {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import os
 from langgraph.graph import StateGraph, END
 from graphs.state import (
     GlobalState,
@@ -5,27 +6,42 @@ from graphs.state import (
     GraphOutput
 )
 from graphs.nodes.read_csv_node import read_csv_node
-from graphs.nodes.query_terminology_node import query_terminology_node
-from graphs.nodes.parallel_translate_dispatch_node import parallel_translate_dispatch_node
+from graphs.nodes.query_terminology_node import query_terminology_node, aquery_terminology_node
+from graphs.nodes.parallel_translate_dispatch_node import parallel_translate_dispatch_node, aparallel_translate_dispatch_node
 from graphs.nodes.generate_csv_node import generate_csv_node
+from graphs.nodes.stream_translate_csv_node import should_stream_csv, stream_translate_csv_node
+
+# 异步节点：术语查询在事件循环上等待数据库，翻译分发的批次在事件循环上等待大模型调用，均不占用工作线程
+# 仅支持 ainvoke/astream 调用；同步 graph.stream 调用（流式接口）需保持关闭
+TRANSLATE_ASYNC_ENABLED = os.getenv("TRANSLATE_ASYNC_ENABLED", "false").lower() == "true"
 
 # 创建状态图，指定工作流的入参和出参
 builder = StateGraph(GlobalState, input_schema=GraphInput, output_schema=GraphOutput)
 
 # 添加节点
 builder.add_node("read_csv", read_csv_node)
-builder.add_node("query_terminology", query_terminology_node)
-builder.add_node("parallel_translate_dispatch", parallel_translate_dispatch_node, metadata={"type": "looparray"})
+builder.add_node("query_terminology", aquery_terminology_node if TRANSLATE_ASYNC_ENABLED else query_terminology_node)
+builder.add_node(
+    "parallel_translate_dispatch",
+    aparallel_translate_dispatch_node if TRANSLATE_ASYNC_ENABLED else parallel_translate_dispatch_node,
+    metadata={"type": "looparray"}
+)
 builder.add_node("generate_csv", generate_csv_node)
+# 超大CSV：分块流式完成术语查询、翻译和写出，不经过整表流程
+builder.add_node("stream_translate_csv", stream_translate_csv_node)
 
-# 设置入口点
-builder.set_entry_point("read_csv")
+# 设置入口点：按文件大小选择整表流程或流式翻译
+builder.set_conditional_entry_point(
+    should_stream_csv,
+    {"read_csv": "read_csv", "stream_translate_csv": "stream_translate_csv"}
+)
 
 # 添加边（线性流程）
 builder.add_edge("read_csv", "query_terminology")
 builder.add_edge("query_terminology", "parallel_translate_dispatch")
 builder.add_edge("parallel_translate_dispatch", "generate_csv")
 builder.add_edge("generate_csv", END)
+builder.add_edge("stream_translate_csv", END)
 
 # 编译图
 main_graph = builder.compile()
@@ -7,15 +7,21 @@ from coze_coding_utils.runtime_ctx.context import Context
 from coze_coding_dev_sdk.s3 import S3SyncStorage
 from graphs.state import GenerateCSVNodeInput, GenerateCSVNodeOutput
 
+# 输出文件签名URL的有效期（秒）
+OUTPUT_URL_EXPIRE_SECONDS = 3600
 
-def generate_csv_node(state: GenerateCSVNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> GenerateCSVNodeOutput:
+
+def upload_csv_file(file_path: str, file_name: str) -> str:
     """
-    title: 生成并上传CSV
-    desc: 将翻译后的数据生成CSV文件，并上传到对象存储
-    integrations: 对象存储
+    将本地CSV文件流式上传到对象存储（大文件自动分片，不整体读入内存），返回签名URL
+
+    Args:
+        file_path: 本地文件路径
+        file_name: 对象存储中的文件名
+
+    Returns:
+        签名URL（有效期1小时）
     """
-    ctx = runtime.context
-    
     # 1. 初始化对象存储客户端
     storage = S3SyncStorage(
         endpoint_url=os.getenv("COZE_BUCKET_ENDPOINT_URL"),
@@ -25,11 +31,37 @@ def generate_csv_node(state: GenerateCSVNodeInput, config: RunnableConfig, runti
         region="cn-beijing",
     )
     
-    # 2. 将字典数据转换为DataFrame
+    try:
+        # 2. 上传文件
+        with open(file_path, 'rb') as f:
+            file_key = storage.stream_upload_file(
+                fileobj=f,
+                file_name=file_name,
+                content_type="text/csv"
+            )
+        
+        # 3. 生成签名URL（有效期1小时）
+        return storage.generate_presigned_url(
+            key=file_key,
+            expire_time=OUTPUT_URL_EXPIRE_SECONDS
+        )
+    except Exception as e:
+        raise Exception(f"上传CSV文件失败: {str(e)}")
+
+
+def generate_csv_node(state: GenerateCSVNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> GenerateCSVNodeOutput:
+    """
+    title: 生成并上传CSV
+    desc: 将翻译后的数据生成CSV文件，并上传到对象存储
+    integrations: 对象存储
+    """
+    ctx = runtime.context
+    
+    # 1. 将字典数据转换为DataFrame
     data_rows = state.merged_data['data']
     df = pd.DataFrame(data_rows)
     
-    # 3. 生成CSV文件到临时目录
+    # 2. 生成CSV文件到临时目录
     temp_dir = "/tmp"
     os.makedirs(temp_dir, exist_ok=True)
     
@@ -40,28 +72,9 @@ def generate_csv_node(state: GenerateCSVNodeInput, config: RunnableConfig, runti
     # 保存为CSV文件
     df.to_csv(temp_file_path, index=False, encoding='utf-8-sig')
     
-    # 4. 上传到对象存储
+    # 3. 上传到对象存储并生成签名URL
     try:
-        # 读取文件内容
-        with open(temp_file_path, 'rb') as f:
-            file_content = f.read()
-        
-        # 上传文件
-        file_key = storage.upload_file(
-            file_content=file_content,
-            file_name=file_name,
-            content_type="text/csv"
-        )
-        
-        # 5. 生成签名URL（有效期1小时）
-        signed_url = storage.generate_presigned_url(
-            key=file_key,
-            expire_time=3600
-        )
-        
-        return GenerateCSVNodeOutput(output_csv_url=signed_url)
-    except Exception as e:
-        raise Exception(f"上传CSV文件失败: {str(e)}")
+        return GenerateCSVNodeOutput(output_csv_url=upload_csv_file(temp_file_path, file_name))
     finally:
         # 清理临时文件
         if os.path.exists(temp_file_path):
@@ -1,5 +1,6 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import logging
+import pandas as pd
 from langchain_core.runnables import RunnableConfig
 from langgraph.runtime import Runtime
 from coze_coding_utils.runtime_ctx.context import Context
@@ -12,70 +13,58 @@ logger = logging.getLogger(__name__)
 def merge_translations_node(state: MergeTranslationsNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> MergeTranslationsNodeOutput:
     """
     title: 合并翻译结果
-    desc: 将所有目标语言的翻译结果合并到一起，确保列名顺序正确
+    desc: 将所有目标语言的片段翻译结果按列回填，确保列名顺序正确
     integrations: -
     """
     ctx = runtime.context
     
-    # 调试日志：检查输入数据的类型和结构
-    logger.info(f"合并节点输入 - csv_data类型: {type(state.csv_data)}")
-    logger.info(f"合并节点输入 - csv_data columns: {state.csv_data.get('columns', 'N/A')}")
-    logger.info(f"合并节点输入 - csv_data data类型: {type(state.csv_data.get('data'))}")
-    if state.csv_data.get('data'):
-        logger.info(f"合并节点输入 - csv_data data第一行类型: {type(state.csv_data['data'][0])}")
-        logger.info(f"合并节点输入 - csv_data data第一行内容: {state.csv_data['data'][0]}")
-    
+    rows_data = state.csv_data['data']
+    logger.info(f"合并节点输入 - 行数: {len(rows_data)}, 列: {state.csv_data.get('columns', 'N/A')}")
     logger.info(f"合并节点输入 - translated_results数量: {len(state.translated_results)}")
     
-    # 1. 以原始数据为基础
-    merged_rows = state.csv_data['data'].copy()
-    
-    # 2. 收集所有翻译列的信息（按目标语言顺序）
-    all_translated_columns = []  # 格式：[{"original": "商品名称", "translated": "商品名称_英文_翻译", "lang": "英文"}, ...]
+    # 1. 只取出需要翻译的列，按列处理（不修改输入的行字典）；缺少该列的行不生成对应翻译列
+    source_columns: Dict[str, pd.Series] = {}
+    rows_missing_column: Dict[str, List[int]] = {}
     
+    # 2. 逐列生成翻译列：{(目标语言, 原始列名): (翻译列名, 翻译列)}
+    # 每种语言的结果只是 {列名: {原文: 译文}} 的稀疏映射，相同 (列名, 值) 的所有行共享同一译文；
+    # 未翻译及不需要翻译的单元格（空值、数字、链接等）不在映射中，原样保留
+    translated_columns: Dict[Tuple[str, str], Tuple[str, pd.Series]] = {}
     for lang_result in state.translated_results:
-        lang_data = lang_result.get('data', [])
-        translated_columns = lang_result.get('translated_columns', [])
+        segment_translations = lang_result.get('segment_translations', {})
         target_language = lang_result.get('target_language', '')
-        
-        # 将该语言的所有翻译列信息添加到列表中
-        for col_info in translated_columns:
-            all_translated_columns.append({
-                "original": col_info["original_column"],
-                "translated": col_info["translated_column"],
-                "lang": target_language
-            })
-        
-        # 将翻译数据合并到merged_rows中
-        for i, original_row in enumerate(merged_rows):
-            if i < len(lang_data):
-                lang_row = lang_data[i]
-                
-                # 将翻译列添加到原始行
-                for col_info in translated_columns:
-                    translated_col = col_info["translated_column"]
-                    if translated_col in lang_row:
-                        original_row[translated_col] = lang_row[translated_col]
-    
-    # 3. 构建正确的列名顺序：先原始列，然后按目标语言顺序添加翻译列
-    merged_columns = []
+        for col_info in lang_result.get('translated_columns', []):
+            original_col = col_info["original_column"]
+            if original_col not in source_columns:
+                source_columns[original_col] = pd.Series([row.get(original_col) for row in rows_data], dtype=object)
+                rows_missing_column[original_col] = [i for i, row in enumerate(rows_data) if original_col not in row]
+            translated_columns[(target_language, original_col)] = (
+                col_info["translated_column"],
+                _translate_column(source_columns[original_col], segment_translations.get(original_col))
+            )
     
-    # 3.1 先添加所有原始列
-    merged_columns.extend(state.csv_data['columns'])
-    
-    # 3.2 按目标语言顺序添加翻译列
-    # 目标：对于每个目标语言，添加所有中文列对应的翻译列
+    # 3. 构建正确的列名顺序：先原始列，然后按目标语言顺序、原始列顺序添加翻译列
+    new_columns: Dict[str, pd.Series] = {}
+    new_column_sources: Dict[str, str] = {}
     for target_lang in state.target_languages:
-        # 找出该语言的所有翻译列
-        lang_columns = [col for col in all_translated_columns if col["lang"] == target_lang]
-        # 按原始列顺序添加翻译列
         for original_col in state.chinese_columns:
-            for col_info in lang_columns:
-                if col_info["original"] == original_col:
-                    merged_columns.append(col_info["translated"])
-                    break
+            if (target_lang, original_col) in translated_columns:
+                name, column = translated_columns[(target_lang, original_col)]
+                new_columns[name] = column
+                new_column_sources[name] = original_col
+    merged_columns = list(state.csv_data['columns']) + list(new_columns)
     
-    # 4. 构建输出数据
+    # 4. 翻译列按列拼接后逐行附加到原始行的副本上
+    # （没有列的 DataFrame 不产生任何元组，无翻译列时直接复制原始行）
+    if new_columns:
+        translated_names = list(new_columns)
+        translated_values = pd.concat(new_columns, axis=1).itertuples(index=False, name=None)
+        merged_rows = [{**row, **dict(zip(translated_names, values))} for row, values in zip(rows_data, translated_values)]
+    else:
+        merged_rows = [dict(row) for row in rows_data]
+    for name, original_col in new_column_sources.items():
+        for i in rows_missing_column[original_col]:
+            del merged_rows[i][name]
     merged_data = {
         'columns': merged_columns,  # 使用正确的列名顺序
         'data': merged_rows,
@@ -84,3 +73,11 @@ def merge_translations_node(state: MergeTranslationsNodeInput, config: RunnableC
     }
     
     return MergeTranslationsNodeOutput(merged_data=merged_data)
+
+
+def _translate_column(source: pd.Series, translations: Optional[Dict[str, str]]) -> pd.Series:
+    """按 {原文: 译文} 映射整列替换，映射中没有的单元格保留原值"""
+    if not translations:
+        return source.copy()
+    translated = source.map(translations)
+    return translated.where(translated.notna(), source)
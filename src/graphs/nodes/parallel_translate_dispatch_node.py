@@ -1,6 +1,8 @@
+import os
 import uuid
-from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from langchain_core.runnables import RunnableConfig
 from langgraph.runtime import Runtime
 from coze_coding_utils.runtime_ctx.context import Context
@@ -14,6 +16,25 @@ from graphs.state import (
     MergeTranslationsNodeOutput
 )
 from graphs.nodes.merge_translations_node import merge_translations_node
+from graphs.run_data import RunData, run_data_scope
+from graphs.nodes.parallel_translate_node import (
+    DEFAULT_MODEL,
+    get_llm_cfg_entry,
+    build_terminology_hint,
+    use_compact_format,
+    parallel_translate_node,
+    aparallel_translate_node
+)
+from storage.database.translation_memory import get_translation_memory
+from utils.llm.scheduler import get_llm_scheduler
+from utils.llm.tokens import estimate_output_tokens, get_output_token_budget, get_token_estimator, pack_segments
+from utils.text.cell_classifier import is_translatable_cell
+from utils.text.term_matcher import TermMatcher
+
+# 重试配置
+TRANSLATE_MAX_ATTEMPTS = int(os.getenv("TRANSLATE_MAX_ATTEMPTS", "3"))  # 同一批片段不拆分时的最大尝试次数
+TRANSLATE_RETRY_BUDGET_RATIO = float(os.getenv("TRANSLATE_RETRY_BUDGET_RATIO", "0.5"))  # 每次运行的重试预算：初始批次数的比例
+TRANSLATE_RETRY_BUDGET_MIN = 32  # 每次运行的最小重试预算
 
 
 def parallel_translate_dispatch_node(
@@ -23,95 +44,377 @@ def parallel_translate_dispatch_node(
 ) -> ParallelTranslateDispatchNodeOutput:
     """
     title: 并行翻译分发（批次化）
-    desc: 将数据按行数拆分成多个批次，并行处理每个批次的翻译
+    desc: 对中文列的 (列名, 值) 片段去重后拆分成多个批次，并行处理每个批次的翻译；输出长度允许时一次请求返回所有目标语言
     integrations: -
     """
     ctx = runtime.context
     
-    # 配置批次大小（每批次处理的行数）
-    BATCH_SIZE = 20  # 每批处理20行，可根据实际情况调整
+    # 1~3. 去重、查询翻译记忆并规划批次
+    plan = _plan_translation(state, config)
     
-    # 为每个目标语言处理翻译
-    all_translated_results = []
+    # 4. 所有批次提交到进程级调度器，与其他语言、其他请求共享全局并发
+    scheduler = get_llm_scheduler()
+    run_id = getattr(ctx, 'run_id', None) or str(uuid.uuid4())
+    pending: Dict[Future, Dict[str, Any]] = {}
     
-    for target_language in state.target_languages:
-        # 1. 提取需要翻译的数据
-        rows_data = state.csv_data.get('data', [])
-        
-        # 2. 按行数拆分成多个批次
-        batches = []
-        for i in range(0, len(rows_data), BATCH_SIZE):
-            batch_data = rows_data[i:i + BATCH_SIZE]
-            batches.append({
-                'batch_id': str(uuid.uuid4()),
-                'batch_index': i // BATCH_SIZE,
-                'total_batches': (len(rows_data) + BATCH_SIZE - 1) // BATCH_SIZE,
-                'data': batch_data
-            })
-        
-        print(f"[INFO] 目标语言: {target_language}, 总行数: {len(rows_data)}, 批次数: {len(batches)}, 每批次: {BATCH_SIZE}行")
-        
-        # 3. 并行处理所有批次
-        translated_batches = []
-        
-        with ThreadPoolExecutor(max_workers=3) as executor:  # 最多3个并发任务
-            # 创建所有翻译任务
-            future_to_batch = {}
-            for batch in batches:
-                # 构建批次输入
-                batch_input = ParallelTranslateNodeInput(
-                    csv_data=state.csv_data,
-                    chinese_columns=state.chinese_columns,
-                    target_language=target_language,
-                    terminology_dict=state.terminology_dict,
-                    batch_id=batch['batch_id'],
-                    batch_index=batch['batch_index'],
-                    total_batches=batch['total_batches'],
-                    batch_data=batch['data']
-                )
-                
-                # 提交任务到线程池
-                future = executor.submit(
-                    translate_batch,
-                    batch_input,
-                    config,
-                    runtime
-                )
-                future_to_batch[future] = batch
+    def submit(batch: Dict[str, Any]) -> None:
+        future = scheduler.submit(
+            run_id,
+            translate_batch,
+            _build_batch_input(state, plan, batch),
+            config,
+            runtime
+        )
+        pending[future] = batch
+    
+    # 批次只携带运行数据句柄和片段ID，所有批次结束后释放
+    with run_data_scope(plan['run_data']):
+        try:
+            for batch in plan['jobs']:
+                submit(batch)
             
-            # 收集结果
-            for future in as_completed(future_to_batch):
-                batch = future_to_batch[future]
-                try:
-                    result = future.result()
-                    translated_batches.append(result)
-                    print(f"[INFO] 批次 {result.batch_index + 1}/{result.total_batches} 完成: {target_language}")
-                except Exception as e:
-                    print(f"[ERROR] 批次 {batch['batch_index']} 失败: {str(e)}")
-                    # 使用原始数据作为fallback
-                    translated_batches.append({
-                        'batch_index': batch['batch_index'],
-                        'translated_batch_data': batch['data'],
-                        'error': str(e)
-                    })
-        
-        # 4. 合并所有批次的翻译结果（按批次索引排序）
-        translated_batches.sort(key=lambda x: x.get('batch_index', 0))
-        
-        # 拼接所有批次的数据
-        all_translated_rows = []
-        for batch in translated_batches:
-            all_translated_rows.extend(batch.get('translated_batch_data', []))
+            # 收集结果，缺失或失败的片段重新提交（必要时拆分批次）
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = pending.pop(future)
+                    error = future.exception()
+                    result = future.result() if error is None else None
+                    for followup in _handle_batch_outcome(plan, batch, result, error):
+                        submit(followup)
+        finally:
+            # 结果处理出错或运行中断时，取消尚未开始的批次，不再留下引用已释放运行数据的任务
+            for future in pending:
+                future.cancel()
+    
+    # 5~6. 构建各语言的片段翻译结果并合并
+    return _merge_results(state, plan, config, runtime)
+
+
+async def aparallel_translate_dispatch_node(
+    state: ParallelTranslateDispatchNodeInput,
+    config: RunnableConfig,
+    runtime: Runtime[Context]
+) -> ParallelTranslateDispatchNodeOutput:
+    """
+    title: 并行翻译分发（批次化，异步）
+    desc: 与 parallel_translate_dispatch_node 相同，批次在事件循环上并发等待大模型调用，并发由调度器的公平信号量限制
+    integrations: -
+    """
+    ctx = runtime.context
+    
+    # 规划阶段包含翻译记忆的数据库查询，放到线程中执行避免阻塞事件循环
+    plan = await asyncio.to_thread(_plan_translation, state, config)
+    
+    scheduler = get_llm_scheduler()
+    run_id = getattr(ctx, 'run_id', None) or str(uuid.uuid4())
+    
+    tasks: Dict[asyncio.Future, Dict[str, Any]] = {}
+    
+    def submit(batch: Dict[str, Any]) -> None:
+        task = asyncio.ensure_future(scheduler.arun(
+            run_id,
+            atranslate_batch,
+            _build_batch_input(state, plan, batch),
+            config,
+            runtime
+        ))
+        tasks[task] = batch
+    
+    with run_data_scope(plan['run_data']):
+        for batch in plan['jobs']:
+            submit(batch)
         
-        # 5. 构建该语言的完整翻译数据
-        translated_data = {
-            'columns': state.csv_data.get('columns', []),
-            'data': all_translated_rows,
-            'target_language': target_language
+        # 收集结果，缺失或失败的片段重新提交（必要时拆分批次）
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    batch = tasks.pop(task)
+                    error = task.exception()
+                    result = task.result() if error is None else None
+                    # 结果处理包含翻译记忆的数据库写回，放到线程中执行
+                    for followup in await asyncio.to_thread(_handle_batch_outcome, plan, batch, result, error):
+                        submit(followup)
+        finally:
+            # 运行被取消时不再留下引用已释放运行数据的批次
+            for task in tasks:
+                task.cancel()
+    
+    return _merge_results(state, plan, config, runtime)
+
+
+def _plan_translation(state: ParallelTranslateDispatchNodeInput, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    去重、查询翻译记忆并规划批次
+
+    Returns:
+        规划字典：jobs、segments、run_data、segment_translations 以及翻译记忆写回所需的 model/cfg_hash
+    """
+    # 翻译记忆：缓存键包含模型和配置哈希，提示词或模型变更后自动失效
+    llm_cfg = get_llm_cfg_entry(config)
+    model = llm_cfg.model_config.get("model", DEFAULT_MODEL)
+    max_completion_tokens = llm_cfg.model_config.get("max_completion_tokens", 8192)
+    # 批次按估算的输入/输出token打包，而不是固定行数
+    output_budget = get_output_token_budget(max_completion_tokens)
+    cfg_hash = llm_cfg.cfg_hash
+    compact = use_compact_format(llm_cfg)
+    memory = get_translation_memory()
+    
+    # 1. 文件内去重：收集中文列中不同的 (列名, 值) 片段，相同片段只翻译一次
+    rows_data = state.csv_data.get('data', [])
+    # 空值、数字、SKU、链接等不含中文的单元格不发送，由合并节点原样保留
+    cell_stats = {'sent': 0, 'skipped': 0}
+    segments = collect_distinct_segments(rows_data, state.chinese_columns, cell_stats)
+    print(f"[INFO] 单元格分类与去重: 需翻译: {cell_stats['sent']}, 跳过: {cell_stats['skipped']}, 不同片段数: {len(segments)}")
+    
+    # 2. 逐语言查询翻译记忆，命中的片段不再发送给大模型
+    # {目标语言: {列名: {原文: 译文}}}
+    segment_translations: Dict[str, Dict[str, Dict[str, str]]] = {}
+    miss_segments: Dict[str, List[Tuple[str, str]]] = {}
+    for target_language in state.target_languages:
+        cached = memory.get_many({text for _, text in segments}, target_language, model, cfg_hash)
+        segment_translations[target_language] = {col: {} for col in state.chinese_columns}
+        miss_segments[target_language] = []
+        for col, text in segments:
+            if text in cached:
+                segment_translations[target_language][col][text] = cached[text]
+            else:
+                miss_segments[target_language].append((col, text))
+        print(f"[INFO] 翻译记忆: {target_language}, 命中片段: {len(segments) - len(miss_segments[target_language])}/{len(segments)}")
+    
+    # 运行级只读数据：批次按片段ID引用原文，专词字典只保存一份
+    run_data = RunData(state.csv_data.get('columns', []), state.chinese_columns, segments, state.terminology_dict)
+    
+    # 3. 选择翻译模式：所有语言的输出都能放进 max_completion_tokens 时，一次请求返回片段未命中的所有语言
+    jobs = _plan_multi_language_jobs(run_data, miss_segments, state.target_languages, output_budget, compact)
+    if jobs:
+        print(f"[INFO] 多语言模式: 目标语言: {state.target_languages}, 批次数: {len(jobs)}")
+    else:
+        for target_language in state.target_languages:
+            lang_jobs = _pack_batches(run_data, miss_segments[target_language], [target_language], output_budget, compact)
+            jobs.extend(lang_jobs)
+            print(f"[INFO] 目标语言: {target_language}, 待翻译片段数: {len(miss_segments[target_language])}, 批次数: {len(lang_jobs)}")
+    
+    # 4. 术语表构建一次多模式匹配器，每个批次只携带其中出现的专词
+    term_matcher = TermMatcher(state.terminology_dict.keys()) if state.terminology_dict else None
+    
+    return {
+        'jobs': jobs,
+        # 每次运行的重试预算（重新提交的批次数），避免个别坏数据无限重试
+        'retry_budget': max(TRANSLATE_RETRY_BUDGET_MIN, int(len(jobs) * TRANSLATE_RETRY_BUDGET_RATIO)),
+        'retry_stats': {'retries': 0, 'bisections': 0, 'abandoned': 0},
+        'segments': segments,
+        'run_data': run_data,
+        'segment_translations': segment_translations,
+        'memory': memory,
+        'model': model,
+        'cfg_hash': cfg_hash,
+        'term_matcher': term_matcher,
+        'glossary_stats': {'full_tokens': 0, 'pruned_tokens': 0},
+        # {目标语言元组: 完整术语提示的token数}
+        'full_hint_tokens': {}
+    }
+
+
+def _build_batch_input(
+    state: ParallelTranslateDispatchNodeInput,
+    plan: Dict[str, Any],
+    batch: Dict[str, Any]
+) -> ParallelTranslateNodeInput:
+    """构建批次的翻译节点输入：只携带运行数据句柄和片段ID，术语表裁剪为批次中实际出现的专词"""
+    languages = batch['target_languages']
+    return ParallelTranslateNodeInput(
+        chinese_columns=state.chinese_columns,
+        target_language='、'.join(languages),
+        target_languages=languages if len(languages) > 1 else None,
+        terminology_dict=_prune_terminology(state, plan, batch),
+        batch_id=batch['batch_id'],
+        batch_index=batch['batch_index'],
+        total_batches=batch['total_batches'],
+        data_handle=plan['run_data'].handle,
+        segment_ids=batch['segment_ids']
+    )
+
+
+def _prune_terminology(
+    state: ParallelTranslateDispatchNodeInput,
+    plan: Dict[str, Any],
+    batch: Dict[str, Any]
+) -> Dict[str, Dict[str, str]]:
+    """
+    裁剪批次的术语表：只保留批次原文中出现的专词，并累计节省的提示词token
+
+    Returns:
+        批次专词字典：{中文词: {目标语言: 翻译}}
+    """
+    term_matcher = plan['term_matcher']
+    if term_matcher is None:
+        return {}
+    terminology_dict = plan['run_data'].terminology_dict
+    terms = term_matcher.find_terms(plan['run_data'].texts(batch['segment_ids']))
+    pruned = {term: dict(terminology_dict[term]) for term in terms}
+    
+    languages = batch['target_languages']
+    estimator = get_token_estimator()
+    full_tokens = plan['full_hint_tokens'].get(tuple(languages))
+    if full_tokens is None:
+        full_tokens = estimator(build_terminology_hint(terminology_dict, languages))
+        plan['full_hint_tokens'][tuple(languages)] = full_tokens
+    plan['glossary_stats']['full_tokens'] += full_tokens
+    plan['glossary_stats']['pruned_tokens'] += estimator(build_terminology_hint(pruned, languages))
+    return pruned
+
+
+def _handle_batch_outcome(
+    plan: Dict[str, Any],
+    batch: Dict[str, Any],
+    result: Optional[Dict[str, Any]],
+    error: Optional[BaseException]
+) -> List[Dict[str, Any]]:
+    """
+    处理批次结果：记录成功的片段翻译，为缺失或失败的片段规划重试批次
+
+    Returns:
+        需要重新提交的批次列表
+    """
+    languages_label = '、'.join(batch['target_languages'])
+    if error is None:
+        try:
+            missing = _apply_batch_result(plan, batch, result)
+        except Exception as e:
+            error = e
+    if error is not None:
+        print(f"[ERROR] 批次 {batch['batch_index']} 失败（{languages_label}，第{batch.get('attempt', 1)}次）: {str(error)}")
+        missing = {segment_id: list(batch['target_languages']) for segment_id in batch['segment_ids']}
+        return _plan_followups(plan, batch, missing, failed=True, truncated=False)
+    
+    truncated = result.get('finish_reason') == 'length'
+    failed = truncated or bool(result.get('parse_failed'))
+    if missing:
+        reason = "输出被截断" if truncated else ("JSON解析失败" if failed else "结果缺失或错位")
+        print(f"[WARN] 批次 {batch['batch_index']}（{languages_label}）{reason}，缺失片段: {len(missing)}/{len(batch['segment_ids'])}")
+    return _plan_followups(plan, batch, missing, failed, truncated)
+
+
+def _plan_followups(
+    plan: Dict[str, Any],
+    batch: Dict[str, Any],
+    missing: Dict[int, List[str]],
+    failed: bool,
+    truncated: bool
+) -> List[Dict[str, Any]]:
+    """
+    为缺失的片段规划重试批次
+
+    - 输出被截断，或同一批片段连续失败时，对半拆分后分别重试
+    - 其余情况只重新提交缺失的片段
+    - 单个片段最多尝试 TRANSLATE_MAX_ATTEMPTS 次，所有重试共享每次运行的重试预算
+    """
+    if not missing:
+        return []
+    segment_ids = list(missing.keys())
+    languages = [lang for lang in batch['target_languages'] if any(lang in langs for langs in missing.values())]
+    attempt = batch.get('attempt', 1)
+    
+    if len(segment_ids) > 1 and (truncated or (failed and attempt >= 2)):
+        mid = len(segment_ids) // 2
+        parts = [segment_ids[:mid], segment_ids[mid:]]
+        next_attempt = 1
+    elif attempt < TRANSLATE_MAX_ATTEMPTS:
+        parts = [segment_ids]
+        next_attempt = attempt + 1
+    else:
+        parts = []
+    
+    if not parts or plan['retry_budget'] < len(parts):
+        plan['retry_stats']['abandoned'] += len(segment_ids)
+        print(f"[WARN] 批次 {batch['batch_index']} 放弃重试，{len(segment_ids)} 个片段保持原文（剩余重试预算: {plan['retry_budget']}）")
+        return []
+    
+    plan['retry_budget'] -= len(parts)
+    plan['retry_stats']['retries'] += len(parts)
+    if len(parts) > 1:
+        plan['retry_stats']['bisections'] += 1
+    return [
+        {
+            'batch_id': str(uuid.uuid4()),
+            'batch_index': batch['batch_index'],
+            'total_batches': batch['total_batches'],
+            'target_languages': languages,
+            'segment_ids': part,
+            'attempt': next_attempt
         }
-        
-        all_translated_results.append(translated_data)
-        print(f"[INFO] 语言 {target_language} 翻译完成，总行数: {len(all_translated_rows)}")
+        for part in parts
+    ]
+
+
+def _apply_batch_result(
+    plan: Dict[str, Any],
+    batch: Dict[str, Any],
+    result: Dict[str, Any]
+) -> Dict[int, List[str]]:
+    """
+    记录批次的片段翻译，并写回翻译记忆
+
+    Returns:
+        缺失翻译的片段：{片段ID: [缺失的目标语言]}
+    """
+    translations_by_language = result.get('translations_by_language') or {}
+    segments = plan['run_data'].segments
+    missing: Dict[int, List[str]] = {}
+    for target_language in batch['target_languages']:
+        texts_by_column: Dict[str, Dict[str, str]] = {}
+        translated_ids = set()
+        for segment_id, translation in _collect_segment_translations(
+            segments,
+            batch['segment_ids'],
+            translations_by_language.get(target_language, {}),
+            target_language
+        ):
+            col, text = segments[segment_id]
+            plan['segment_translations'][target_language][col][text] = translation
+            texts_by_column.setdefault(col, {})[text] = translation
+            translated_ids.add(segment_id)
+        for segment_id in batch['segment_ids']:
+            if segment_id not in translated_ids:
+                missing.setdefault(segment_id, []).append(target_language)
+        # 批次成功后立即写回翻译记忆
+        for col_translations in texts_by_column.values():
+            plan['memory'].put_many(col_translations, target_language, plan['model'], plan['cfg_hash'])
+    done = len(batch['segment_ids']) - len(missing)
+    print(f"[INFO] 批次 {batch['batch_index'] + 1}/{batch['total_batches']} 完成: {'、'.join(batch['target_languages'])}，成功片段: {done}/{len(batch['segment_ids'])}")
+    return missing
+
+
+def _merge_results(
+    state: ParallelTranslateDispatchNodeInput,
+    plan: Dict[str, Any],
+    config: RunnableConfig,
+    runtime: Runtime[Context]
+) -> ParallelTranslateDispatchNodeOutput:
+    """构建各语言的片段翻译结果，由合并节点回填到每一行"""
+    # 5. 构建各语言的片段翻译结果
+    all_translated_results = []
+    for target_language in state.target_languages:
+        segment_translations = plan['segment_translations'][target_language]
+        all_translated_results.append({
+            'segment_translations': segment_translations,
+            'translated_columns': [
+                {"original_column": col, "translated_column": f"{col}_{target_language}_翻译"}
+                for col in state.chinese_columns
+            ],
+            'target_language': target_language
+        })
+        translated_count = sum(len(v) for v in segment_translations.values())
+        print(f"[INFO] 语言 {target_language} 翻译完成，已翻译片段数: {translated_count}/{len(plan['segments'])}")
+    
+    print(f"[INFO] 重试统计: {plan['retry_stats']}，剩余重试预算: {plan['retry_budget']}")
+    print(f"[INFO] 翻译记忆累计统计: {plan['memory'].get_stats()}")
+    glossary_stats = plan['glossary_stats']
+    if plan['term_matcher'] is not None:
+        saved = glossary_stats['full_tokens'] - glossary_stats['pruned_tokens']
+        print(f"[INFO] 术语表裁剪: 专词数: {len(plan['term_matcher'])}, 提示词token: {glossary_stats['pruned_tokens']}/{glossary_stats['full_tokens']}，节省: {saved}")
     
     # 6. 调用合并节点，合并所有语言的结果
     merge_input = MergeTranslationsNodeInput(
@@ -151,5 +454,138 @@ def translate_batch(
     return {
         'batch_id': result.batch_id,
         'batch_index': result.batch_index,
-        'translated_batch_data': result.translated_batch_data
+        'translations_by_language': result.translations_by_language,
+        'finish_reason': result.finish_reason,
+        'parse_failed': result.parse_failed
     }
+
+
+async def atranslate_batch(
+    batch_input: ParallelTranslateNodeInput,
+    config: RunnableConfig,
+    runtime: Runtime[Context]
+) -> Dict[str, Any]:
+    """处理单个批次的翻译（异步）"""
+    result = await aparallel_translate_node(batch_input, config, runtime)
+    
+    return {
+        'batch_id': result.batch_id,
+        'batch_index': result.batch_index,
+        'translations_by_language': result.translations_by_language,
+        'finish_reason': result.finish_reason,
+        'parse_failed': result.parse_failed
+    }
+
+
+def _pack_batches(
+    run_data: RunData,
+    segments: List[Tuple[str, str]],
+    target_languages: List[str],
+    output_budget: int,
+    compact: bool = False
+) -> List[Dict[str, Any]]:
+    """将片段按token预算打包成批次，批次只记录片段ID，发送时每个片段作为 {列名: 原文}"""
+    packed = pack_segments(segments, target_languages, output_budget, compact=compact)
+    return [
+        {
+            'batch_id': str(uuid.uuid4()),
+            'batch_index': batch_index,
+            'total_batches': len(packed),
+            'target_languages': target_languages,
+            'segment_ids': [run_data.segment_index[segment] for segment in batch_segments]
+        }
+        for batch_index, batch_segments in enumerate(packed)
+    ]
+
+
+def _plan_multi_language_jobs(
+    run_data: RunData,
+    miss_segments: Dict[str, List[Tuple[str, str]]],
+    target_languages: List[str],
+    output_budget: int,
+    compact: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    规划多语言模式的批次：每个片段只请求翻译记忆未命中的语言，未命中语言相同的片段一起打包
+
+    Returns:
+        批次列表；目标语言少于2种或任一片段未命中语言的估算输出超出预算时返回空列表
+    """
+    if len(target_languages) < 2:
+        return []
+    missing_languages: Dict[Tuple[str, str], List[str]] = {}
+    for target_language in target_languages:
+        for segment in miss_segments.get(target_language, []):
+            missing_languages.setdefault(segment, []).append(target_language)
+    # {未命中语言: [片段, ...]}，片段保持首次出现的顺序
+    groups: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+    for segment in run_data.segments:
+        if segment in missing_languages:
+            groups.setdefault(tuple(missing_languages[segment]), []).append(segment)
+    if any(
+        estimate_output_tokens(col, text, list(languages), compact) > output_budget
+        for languages, group in groups.items()
+        for col, text in group
+    ):
+        return []
+    jobs: List[Dict[str, Any]] = []
+    for languages, group in groups.items():
+        jobs.extend(_pack_batches(run_data, group, list(languages), output_budget, compact))
+    return jobs
+
+
+def collect_distinct_segments(
+    rows_data: List[dict],
+    chinese_columns: List[str],
+    cell_stats: Optional[Dict[str, int]] = None
+) -> List[Tuple[str, str]]:
+    """
+    收集中文列中需要翻译的不同 (列名, 值) 片段，保持首次出现的顺序
+
+    Args:
+        rows_data: 行数据列表
+        chinese_columns: 中文列名列表
+        cell_stats: 可选，累计需翻译（sent）与跳过（skipped）的单元格数
+
+    Returns:
+        片段列表：[(列名, 原文), ...]
+    """
+    seen = set()
+    segments: List[Tuple[str, str]] = []
+    sent = skipped = 0
+    for row in rows_data:
+        for col in chinese_columns:
+            if col not in row:
+                continue
+            text = row[col]
+            if not is_translatable_cell(text):
+                skipped += 1
+                continue
+            sent += 1
+            if (col, text) not in seen:
+                seen.add((col, text))
+                segments.append((col, text))
+    if cell_stats is not None:
+        cell_stats['sent'] = cell_stats.get('sent', 0) + sent
+        cell_stats['skipped'] = cell_stats.get('skipped', 0) + skipped
+    return segments
+
+
+def _collect_segment_translations(
+    segments: Sequence[Tuple[str, str]],
+    segment_ids: List[int],
+    translated_items: Dict[int, Dict[str, str]],
+    target_language: str
+) -> List[Tuple[int, str]]:
+    """
+    从批次结果中提取片段翻译：[(片段ID, 译文), ...]，译文按批次内下标与发送的片段对应
+
+    缺失、错位的翻译在拆分时已被剔除，不会出现在结果中
+    """
+    translations: List[Tuple[int, str]] = []
+    for i, segment_id in enumerate(segment_ids):
+        col, _ = segments[segment_id]
+        translation = translated_items.get(i, {}).get(f"{col}_{target_language}_翻译")
+        if isinstance(translation, str) and translation.strip():
+            translations.append((segment_id, translation))
+    return translations
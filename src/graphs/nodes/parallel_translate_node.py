@@ -1,14 +1,57 @@
 import os
 import json
 import uuid
-from jinja2 import Template
-from typing import Dict, List
+import re
+from typing import Any, Dict, List, Optional
 from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.runtime import Runtime
 from coze_coding_utils.runtime_ctx.context import Context
-from coze_coding_dev_sdk import LLMClient
 from graphs.state import ParallelTranslateNodeInput, ParallelTranslateNodeOutput
+from graphs.run_data import get_run_data
+from utils.llm.async_client import ainvoke_llm
+from utils.llm.config_registry import LLMConfigEntry, get_llm_config_registry
+from utils.text.cell_classifier import is_translatable_cell
+
+# 翻译节点默认使用的大模型配置文件（相对 COZE_WORKSPACE_PATH）
+DEFAULT_LLM_CFG = "config/translate_llm_cfg.json"
+# 配置文件未指定模型时使用的默认模型
+DEFAULT_MODEL = "doubao-seed-1-8-251228"
+# 请求格式：compact 只发送 [编号, 原文] 并要求返回 {编号: 译文}；json 发送整行并要求回显原文
+TRANSLATE_WIRE_FORMAT = os.getenv("TRANSLATE_WIRE_FORMAT", "compact").lower()
+
+
+def get_llm_cfg_entry(config: RunnableConfig) -> LLMConfigEntry:
+    """
+    获取翻译大模型配置（带缓存，配置文件变化时自动重新加载）
+
+    Args:
+        config: RunnableConfig，优先使用 metadata.llm_cfg 指定的配置文件
+
+    Returns:
+        LLMConfigEntry，包含配置字典、配置哈希及编译后的提示词模板
+    """
+    cfg_path = (config.get('metadata') or {}).get('llm_cfg', DEFAULT_LLM_CFG)
+    cfg_file = os.path.join(os.getenv("COZE_WORKSPACE_PATH", ""), cfg_path)
+    return get_llm_config_registry().get(cfg_file)
+
+
+def use_compact_format(llm_cfg: LLMConfigEntry) -> bool:
+    """是否使用紧凑请求格式：需开启 TRANSLATE_WIRE_FORMAT=compact 且配置文件提供 sp_compact/up_compact 模板"""
+    return TRANSLATE_WIRE_FORMAT == "compact" and "sp_compact" in llm_cfg.cfg and "up_compact" in llm_cfg.cfg
+
+
+def load_llm_cfg(config: RunnableConfig) -> dict:
+    """
+    读取翻译大模型配置
+
+    Args:
+        config: RunnableConfig，优先使用 metadata.llm_cfg 指定的配置文件
+
+    Returns:
+        配置字典，包含 config/sp/up；为缓存中的共享对象，调用方不应修改
+    """
+    return get_llm_cfg_entry(config).cfg
 
 
 def parallel_translate_node(state: ParallelTranslateNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> ParallelTranslateNodeOutput:
@@ -19,19 +62,52 @@ def parallel_translate_node(state: ParallelTranslateNodeInput, config: RunnableC
     """
     ctx = runtime.context
     
-    # 生成批次ID
-    batch_id = state.batch_id or str(uuid.uuid4())
-    batch_index = state.batch_index or 0
-    total_batches = state.total_batches or 1
+    # 1~4. 读取配置、准备数据并构建提示词
+    request = _prepare_request(state, config)
     
-    # 1. 读取大模型配置
-    cfg_file = os.path.join(os.getenv("COZE_WORKSPACE_PATH"), config['metadata']['llm_cfg'])
-    with open(cfg_file, 'r', encoding='utf-8') as fd:
-        llm_cfg = json.load(fd)
+    # 5. 调用大模型
+    llm_client = get_llm_config_registry().get_client(ctx)
+    response = llm_client.invoke(messages=request['messages'], **request['invoke_kwargs'])
+    
+    # 6~8. 解析响应并构建输出
+    return _build_output(state, request, response)
+
+
+async def aparallel_translate_node(state: ParallelTranslateNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> ParallelTranslateNodeOutput:
+    """
+    title: 并行翻译（批次化，异步）
+    desc: 与 parallel_translate_node 相同，在事件循环上直接等待大模型调用，不占用工作线程
+    integrations: 大语言模型
+    """
+    ctx = runtime.context
+    
+    request = _prepare_request(state, config)
+    
+    llm_client = get_llm_config_registry().get_client(ctx)
+    response = await ainvoke_llm(llm_client, messages=request['messages'], **request['invoke_kwargs'])
+    
+    return _build_output(state, request, response)
+
+
+def _prepare_request(state: ParallelTranslateNodeInput, config: RunnableConfig) -> Dict[str, Any]:
+    """
+    读取配置、准备翻译数据并渲染提示词
+
+    Returns:
+        请求字典：messages、invoke_kwargs、translate_items、columns、target_languages，
+        紧凑格式下另含 cell_ids：[(行下标, 列名), ...]，下标即编号
+    """
+    # 1. 读取大模型配置（进程内缓存）
+    llm_cfg = get_llm_cfg_entry(config)
     
     # 2. 准备翻译数据
-    # 如果提供了批次数据，使用批次数据；否则使用csv_data中的数据
-    if state.batch_data:
+    # 优先按片段ID从运行数据中取原文；其次使用批次数据；否则使用csv_data中的数据
+    columns = state.csv_data.get('columns', [])
+    if state.data_handle is not None and state.segment_ids is not None:
+        run_data = get_run_data(state.data_handle)
+        translate_items = run_data.items(state.segment_ids)
+        columns = list(run_data.columns)
+    elif state.batch_data:
         translate_items = state.batch_data
     else:
         rows_data = state.csv_data.get('data', [])
@@ -43,115 +119,261 @@ def parallel_translate_node(state: ParallelTranslateNodeInput, config: RunnableC
                     item[col] = row[col]
             translate_items.append(item)
     
+    # 多语言模式：一次请求返回所有目标语言的翻译
+    target_languages = state.target_languages if state.target_languages and len(state.target_languages) > 1 else [state.target_language]
+    multi_language = len(target_languages) > 1
+    
     # 3. 构建术语提示（如果有）
-    terminology_hint = ""
-    if state.terminology_dict:
-        terminology_hint = "\n# 专词翻译参考\n以下专词请按参考翻译：\n"
-        for chinese_word, translations in state.terminology_dict.items():
-            lang_translation = translations.get(state.target_language, "")
-            if lang_translation:
-                terminology_hint += f"{chinese_word} → {lang_translation}\n"
+    terminology_hint = build_terminology_hint(state.terminology_dict, target_languages)
     
     # 4. 构建提示词
-    model_config = llm_cfg.get("config", {})
-    sp_template = llm_cfg.get("sp", "")
-    up_template = llm_cfg.get("up", "")
+    model_config = llm_cfg.model_config
+    compact = use_compact_format(llm_cfg)
+    cell_ids: List[tuple] = []
+    if compact:
+        # 紧凑格式：只发送中文单元格，编号 -> (行下标, 列名)，由 _build_output 在本地还原整行
+        payload_items = []
+        for i, item in enumerate(translate_items):
+            for col in state.chinese_columns:
+                value = item.get(col)
+                if is_translatable_cell(value):
+                    payload_items.append([len(cell_ids), value])
+                    cell_ids.append((i, col))
+        sp_template = llm_cfg.get_template("sp_compact")
+        up_template = llm_cfg.get_template("up_compact")
+        payload = json.dumps(payload_items, ensure_ascii=False, separators=(',', ':'))
+        total_items = len(cell_ids)
+    else:
+        sp_template = llm_cfg.get_template("sp_multi" if multi_language else "sp")
+        up_template = llm_cfg.get_template("up_multi" if multi_language else "up")
+        payload = ""
+        total_items = len(translate_items)
     
     # 渲染系统提示词
-    sp = Template(sp_template).render({
+    sp = sp_template.render({
         "target_language": state.target_language,
+        "target_languages": target_languages,
         "chinese_columns": state.chinese_columns,
         "terminology_hint": terminology_hint
     })
     
     # 渲染用户提示词
-    up = Template(up_template).render({
+    up = up_template.render({
         "translate_items": translate_items,  # 不再限制数量，批次化处理
+        "payload": payload,
         "chinese_columns": state.chinese_columns,
         "target_language": state.target_language,
+        "target_languages": target_languages,
         "terminology_hint": terminology_hint,
-        "total_items": len(translate_items)
+        "total_items": total_items
     })
     
-    # 5. 调用大模型
-    llm_client = LLMClient(ctx=ctx)
-    
-    messages = [
-        SystemMessage(content=sp),
-        HumanMessage(content=up)
-    ]
-    
-    response = llm_client.invoke(
-        messages=messages,
-        model=model_config.get("model", "doubao-seed-1-8-251228"),
-        temperature=model_config.get("temperature", 0.3),
-        max_completion_tokens=model_config.get("max_completion_tokens", 8192),
-        thinking=model_config.get("thinking", "disabled")
-    )
+    return {
+        'messages': [
+            SystemMessage(content=sp),
+            HumanMessage(content=up)
+        ],
+        'invoke_kwargs': {
+            'model': model_config.get("model", DEFAULT_MODEL),
+            'temperature': model_config.get("temperature", 0.3),
+            'max_completion_tokens': model_config.get("max_completion_tokens", 8192),
+            'thinking': model_config.get("thinking", "disabled")
+        },
+        'translate_items': translate_items,
+        'columns': columns,
+        'target_languages': target_languages,
+        'compact': compact,
+        'cell_ids': cell_ids
+    }
+
+
+def build_terminology_hint(terminology_dict: Dict[str, Dict[str, str]], target_languages: List[str]) -> str:
+    """
+    构建系统提示词中的专词翻译参考
+
+    Args:
+        terminology_dict: 专词字典：{中文词: {目标语言: 翻译}}
+        target_languages: 本次请求的目标语言，多于一种时每个专词列出各语言的翻译
+
+    Returns:
+        专词提示文本，没有可用专词时返回空字符串
+    """
+    if not terminology_dict:
+        return ""
+    terminology_hint = "\n# 专词翻译参考\n以下专词请按参考翻译：\n"
+    for chinese_word, translations in terminology_dict.items():
+        if len(target_languages) > 1:
+            lang_translations = [f"{lang}: {translations[lang]}" for lang in target_languages if translations.get(lang)]
+            if lang_translations:
+                terminology_hint += f"{chinese_word} → {'；'.join(lang_translations)}\n"
+        else:
+            lang_translation = translations.get(target_languages[0], "")
+            if lang_translation:
+                terminology_hint += f"{chinese_word} → {lang_translation}\n"
+    return terminology_hint
+
+
+def _build_output(state: ParallelTranslateNodeInput, request: Dict[str, Any], response: Any) -> ParallelTranslateNodeOutput:
+    """解析大模型响应，按目标语言拆分并构建节点输出"""
+    # 生成批次ID
+    batch_id = state.batch_id or str(uuid.uuid4())
+    batch_index = state.batch_index or 0
+    translate_items = request['translate_items']
+    target_languages = request['target_languages']
     
-    # 6. 解析响应
+    # 6. 解析响应，解析失败时使用原始数据（由分发节点识别缺失片段并重试）
     response_text = response.content if isinstance(response.content, str) else str(response.content)
+    # finish_reason 为 length 表示输出被 max_completion_tokens 截断
+    finish_reason = (getattr(response, 'response_metadata', None) or {}).get('finish_reason')
     
-    # 尝试解析JSON
-    try:
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            json_str = json_match.group(0)
-            result = json.loads(json_str)
-        else:
-            result = json.loads(response_text)
-    except json.JSONDecodeError:
-        # 如果解析失败，使用原始数据
-        result = {"translated_items": translate_items}
-    
-    # 7. 构建翻译后的数据
-    translated_items = result.get("translated_items", translate_items)
-    
-    # 生成列名：列名_目标语言_翻译
-    translated_columns = []
-    for col in state.chinese_columns:
-        new_col_name = f"{col}_{state.target_language}_翻译"
-        translated_columns.append({
-            "original_column": col,
-            "translated_column": new_col_name
-        })
-    
-    # 合并原始数据和翻译数据
-    translated_batch_rows = []
-    for i, original_row in enumerate(translate_items):
-        translated_row = original_row.copy()
-        
-        if i < len(translated_items):
-            translated_item = translated_items[i]
-            # 添加翻译后的列
-            for col_info in translated_columns:
-                original_col = col_info["original_column"]
-                translated_col = col_info["translated_column"]
-                
-                # 从翻译结果中提取对应的值
-                if translated_col in translated_item:
-                    translated_row[translated_col] = translated_item[translated_col]
-                elif original_col in translated_item:
-                    translated_row[translated_col] = translated_item[original_col]
-        
-        translated_batch_rows.append(translated_row)
-    
-    # 8. 构建输出数据
-    translated_data = {
-        'columns': state.csv_data.get('columns', []),
-        'data': translated_batch_rows,
-        'translated_columns': translated_columns,
-        'target_language': state.target_language,
-        'batch_id': batch_id,
-        'batch_index': batch_index,
-        'total_batches': total_batches
-    }
+    # 7. 按目标语言拆分翻译结果
+    if request['compact']:
+        translations = parse_compact_translations(response_text)
+        parse_failed = translations is None
+        translated_by_language = split_compact_translations(
+            translate_items,
+            request['cell_ids'],
+            translations or {},
+            target_languages
+        )
+    else:
+        translated_items = parse_translated_items(response_text)
+        parse_failed = translated_items is None
+        if parse_failed:
+            translated_items = translate_items
+        translated_by_language = split_translations_by_language(
+            translate_items,
+            translated_items,
+            state.chinese_columns,
+            target_languages
+        )
     
+    # 8. 只返回稀疏的片段译文，由合并节点按列回填，不再逐行复制批次数据
     return ParallelTranslateNodeOutput(
         target_language=state.target_language,
-        translated_data=translated_data,
         batch_id=batch_id,
         batch_index=batch_index,
-        translated_batch_data=translated_batch_rows
+        translations_by_language=translated_by_language,
+        finish_reason=finish_reason,
+        parse_failed=parse_failed
     )
+
+
+def parse_translated_items(response_text: str) -> Optional[List[dict]]:
+    """
+    解析大模型返回的 {"translated_items": [...]} JSON
+
+    Args:
+        response_text: 大模型响应文本
+
+    Returns:
+        翻译结果列表，解析失败（包括输出被截断导致的JSON不完整）时返回None
+    """
+    try:
+        json_match = re.search(r'\{[\s\S]*\}', response_text)
+        if json_match:
+            result = json.loads(json_match.group(0))
+        else:
+            result = json.loads(response_text)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(result, dict) or not isinstance(result.get("translated_items"), list):
+        return None
+    return result["translated_items"]
+
+
+def parse_compact_translations(response_text: str) -> Optional[Dict[str, Any]]:
+    """
+    解析紧凑格式的 {编号: 译文} 或 {编号: {目标语言: 译文}} JSON
+
+    Args:
+        response_text: 大模型响应文本
+
+    Returns:
+        字典：{编号字符串: 译文}，解析失败时返回None
+    """
+    try:
+        json_match = re.search(r'\{[\s\S]*\}', response_text)
+        result = json.loads(json_match.group(0) if json_match else response_text)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(result, dict):
+        return None
+    return {str(key): value for key, value in result.items()}
+
+
+def split_compact_translations(
+    translate_items: List[dict],
+    cell_ids: List[tuple],
+    translations: Dict[str, Any],
+    target_languages: List[str]
+) -> Dict[str, Dict[int, Dict[str, str]]]:
+    """
+    按编号将紧凑格式的译文还原到所在行，并按目标语言拆分
+
+    Args:
+        translate_items: 发送的原始数据
+        cell_ids: 编号对应的单元格：[(行下标, 列名), ...]
+        translations: 大模型返回的 {编号: 译文} 或 {编号: {目标语言: 译文}}
+        target_languages: 目标语言列表
+
+    Returns:
+        与 split_translations_by_language 相同的结构，缺失的译文不包含翻译列
+    """
+    translated_by_language: Dict[str, Dict[int, Dict[str, str]]] = {lang: {} for lang in target_languages}
+    for cell_id, (row_index, col) in enumerate(cell_ids):
+        value = translations.get(str(cell_id))
+        for lang in target_languages:
+            if isinstance(value, dict):
+                translation = value.get(lang)
+            else:
+                # 单语言模式直接返回译文字符串
+                translation = value if len(target_languages) == 1 else None
+            if isinstance(translation, str) and translation:
+                translated_by_language[lang].setdefault(row_index, {})[f"{col}_{lang}_翻译"] = translation
+    return translated_by_language
+
+
+def split_translations_by_language(
+    translate_items: List[dict],
+    translated_items: List[dict],
+    chinese_columns: List[str],
+    target_languages: List[str]
+) -> Dict[str, Dict[int, Dict[str, str]]]:
+    """
+    将翻译结果按目标语言拆分，每种语言只保存译文，不复制原始行
+
+    Args:
+        translate_items: 发送的原始数据
+        translated_items: 大模型返回的翻译结果
+        chinese_columns: 中文列名列表
+        target_languages: 目标语言列表
+
+    Returns:
+        稀疏字典：{目标语言: {行下标: {"列名_目标语言_翻译": 翻译值}}}，
+        缺失、错位的翻译不包含翻译列，没有任何译文的行不出现
+    """
+    translated_by_language: Dict[str, Dict[int, Dict[str, str]]] = {}
+    for lang in target_languages:
+        lang_rows: Dict[int, Dict[str, str]] = {}
+        for i, original_row in enumerate(translate_items):
+            translated_row: Dict[str, str] = {}
+            if i < len(translated_items) and isinstance(translated_items[i], dict):
+                translated_item = translated_items[i]
+                for original_col in chinese_columns:
+                    if original_col not in original_row:
+                        continue
+                    translated_col = f"{original_col}_{lang}_翻译"
+                    echoed = translated_item.get(original_col)
+                    # 从翻译结果中提取对应的值
+                    if translated_col in translated_item:
+                        # 回显的原文与发送的不一致说明结果错位（漏项或乱序），不采纳
+                        if echoed is None or echoed == original_row[original_col]:
+                            translated_row[translated_col] = translated_item[translated_col]
+                    elif len(target_languages) == 1 and echoed is not None and echoed != original_row[original_col]:
+                        # 模型直接在原列名上返回了译文
+                        translated_row[translated_col] = echoed
+            if translated_row:
+                lang_rows[i] = translated_row
+        translated_by_language[lang] = lang_rows
+    return translated_by_language
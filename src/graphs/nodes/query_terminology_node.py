@@ -1,81 +1,257 @@
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Set, Tuple
+import os
 import re
+import asyncio
 import logging
 from langchain_core.runnables import RunnableConfig
 from langgraph.runtime import Runtime
 from coze_coding_utils.runtime_ctx.context import Context
-from coze_coding_dev_sdk.database import get_session
+from storage.database.db import get_session
+from storage.database.db import get_async_session
 from storage.database.translation_manager import TranslationKnowledgeManager
+from storage.database.glossary_cache import GLOSSARY_CACHE_ENABLED, get_glossary_cache
+from storage.database.glossary_snapshot import GlossarySnapshot, get_glossary_snapshot
+from utils.text.cell_classifier import is_translatable_cell
+from utils.text.term_matcher import TermMatcher
 from graphs.state import QueryTerminologyNodeInput, QueryTerminologyNodeOutput
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
+# 精确匹配未命中的中文片段是否再用 pg_trgm 近似匹配术语表（需 init-db.sql 中的三元组索引）
+GLOSSARY_FUZZY_FALLBACK = os.getenv("GLOSSARY_FUZZY_FALLBACK", "false").lower() == "true"
+# 单次请求参与近似匹配的最大片段数
+GLOSSARY_FUZZY_MAX_TERMS = int(os.getenv("GLOSSARY_FUZZY_MAX_TERMS", "2000"))
+
+
+def _collect_texts(state: QueryTerminologyNodeInput) -> Set[str]:
+    """收集中文列中需要翻译的不同文本，相同单元格只扫描一次"""
+    return {
+        row[col]
+        for row in state.csv_data['data']
+        for col in state.chinese_columns
+        if col in row and is_translatable_cell(row[col])
+    }
+
+
+def _extract_candidates(texts: Set[str]) -> Set[str]:
+    # 未启用术语表缓存时没有术语列表可用，退化为提取连续中文（2个字及以上）作为候选词
+    all_chinese_words = set()
+    for text in texts:
+        all_chinese_words.update(re.findall(r'[\u4e00-\u9fff]{2,}', text))
+    return all_chinese_words
+
+
+def _fuzzy_queries(texts: Set[str], terminology_dict: Dict[str, Dict[str, str]]) -> List[str]:
+    """精确匹配未命中的中文片段：不包含任何已命中术语的连续中文（2个字及以上），最多 GLOSSARY_FUZZY_MAX_TERMS 个"""
+    found = TermMatcher(terminology_dict.keys())
+    misses = sorted(word for word in _extract_candidates(texts) if not found.find_terms([word]))
+    return misses[:GLOSSARY_FUZZY_MAX_TERMS]
+
+
+def _merge_fuzzy_matches(
+    all_chinese_words: Set[str],
+    terminology_dict: Dict[str, Dict[str, str]],
+    matches: Dict[str, List[Dict[str, Any]]]
+) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """
+    合并近似匹配结果：以原文中的片段为键（批次按原文裁剪术语时仍能命中），译文取相似度最高的候选
+
+    Returns:
+        (中文词汇, 专词字典)
+    """
+    if not matches:
+        return all_chinese_words, terminology_dict
+    merged = dict(terminology_dict)
+    for word, candidates in matches.items():
+        merged.setdefault(word, dict(candidates[0]["translations"]))
+        logger.info(f"  近似匹配: {word} ≈ {candidates[0]['term']}（相似度 {candidates[0]['similarity']}）")
+    return all_chinese_words | set(matches), merged
+
+
+def _query_fuzzy(texts: Set[str], all_chinese_words: Set[str], terminology_dict: Dict[str, Dict[str, str]], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """精确匹配之后的近似匹配兜底；查询失败时只保留精确匹配结果"""
+    queries = _fuzzy_queries(texts, terminology_dict)
+    if not queries:
+        return all_chinese_words, terminology_dict
+    db = get_session()
+    try:
+        matches = TranslationKnowledgeManager().find_similar_terms(db, queries, target_languages)
+    except Exception as e:
+        logger.warning(f"术语近似匹配失败，只使用精确匹配结果: {e}")
+        return all_chinese_words, terminology_dict
+    finally:
+        db.close()
+    return _merge_fuzzy_matches(all_chinese_words, terminology_dict, matches)
+
+
+async def _aquery_fuzzy(texts: Set[str], all_chinese_words: Set[str], terminology_dict: Dict[str, Dict[str, str]], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """_query_fuzzy 的异步版本"""
+    queries = _fuzzy_queries(texts, terminology_dict)
+    if not queries:
+        return all_chinese_words, terminology_dict
+    try:
+        async with get_async_session() as db:
+            matches = await TranslationKnowledgeManager().afind_similar_terms(db, queries, target_languages)
+    except Exception as e:
+        logger.warning(f"术语近似匹配失败，只使用精确匹配结果: {e}")
+        return all_chinese_words, terminology_dict
+    return _merge_fuzzy_matches(all_chinese_words, terminology_dict, matches)
+
+
+def _query_database(texts: Set[str], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """精确匹配术语，启用 GLOSSARY_FUZZY_FALLBACK 时再对未命中的片段做近似匹配"""
+    all_chinese_words, terminology_dict = _query_exact(texts, target_languages)
+    if GLOSSARY_FUZZY_FALLBACK:
+        return _query_fuzzy(texts, all_chinese_words, terminology_dict, target_languages)
+    return all_chinese_words, terminology_dict
+
+
+async def _aquery_database(texts: Set[str], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """_query_database 的异步版本"""
+    all_chinese_words, terminology_dict = await _aquery_exact(texts, target_languages)
+    if GLOSSARY_FUZZY_FALLBACK:
+        return await _aquery_fuzzy(texts, all_chinese_words, terminology_dict, target_languages)
+    return all_chinese_words, terminology_dict
+
+
+def _query_exact(texts: Set[str], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """通过进程内术语表缓存（或直接查询数据库）匹配术语并查询翻译"""
+    if GLOSSARY_CACHE_ENABLED:
+        # 用术语表构建的自动机单遍扫描每个文本，只保留真正出现的术语（重叠时取最长匹配）
+        glossary_cache = get_glossary_cache()
+        all_chinese_words = glossary_cache.get_matcher().find_longest_terms(texts)
+        if not all_chinese_words:
+            return all_chinese_words, {}
+        # 进程内术语表快照，通常无需访问数据库
+        return all_chinese_words, glossary_cache.lookup(all_chinese_words, target_languages)
+
+    all_chinese_words = _extract_candidates(texts)
+    if not all_chinese_words:
+        return all_chinese_words, {}
+    # 一次批量查询所有候选词在所有目标语言下的翻译（按块分批，避免逐词逐语言查询）
+    db = get_session()
+    try:
+        return all_chinese_words, TranslationKnowledgeManager().get_translations_multi(
+            db,
+            list(all_chinese_words),
+            target_languages
+        )
+    finally:
+        db.close()
+
+
+async def _aquery_exact(texts: Set[str], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """_query_exact 的异步版本：缓存加载/自动机构建放到线程中，直接查询数据库时使用异步会话"""
+    if GLOSSARY_CACHE_ENABLED:
+        # 已加载时 get_matcher 立即返回（过期重载、自动机重建在后台进行）；首次加载时不阻塞事件循环
+        glossary_cache = get_glossary_cache()
+        matcher = await asyncio.to_thread(glossary_cache.get_matcher)
+        all_chinese_words = matcher.find_longest_terms(texts)
+        if not all_chinese_words:
+            return all_chinese_words, {}
+        return all_chinese_words, glossary_cache.lookup(all_chinese_words, target_languages)
+
+    all_chinese_words = _extract_candidates(texts)
+    if not all_chinese_words:
+        return all_chinese_words, {}
+    async with get_async_session() as db:
+        return all_chinese_words, await TranslationKnowledgeManager().aget_translations_multi(
+            db,
+            list(all_chinese_words),
+            target_languages
+        )
+
+
+def _query_snapshot(snapshot: GlossarySnapshot, texts: Set[str], target_languages: List[str]) -> Tuple[Set[str], Dict[str, Dict[str, str]]]:
+    """通过 mmap 离线快照匹配术语并查询翻译，不访问数据库"""
+    all_chinese_words = snapshot.find_longest_terms(texts)
+    return all_chinese_words, snapshot.lookup(all_chinese_words, target_languages)
+
+
+def _use_snapshot_for_cold_start(snapshot: Optional[GlossarySnapshot]) -> bool:
+    """冷启动：术语表缓存在后台加载，本次请求直接使用离线快照，不等待数据库"""
+    if GLOSSARY_CACHE_ENABLED and snapshot is not None and not get_glossary_cache().is_loaded:
+        get_glossary_cache().warm_in_background()
+        logger.info(f"术语表缓存尚未加载，使用离线快照: {snapshot.path}")
+        return True
+    return False
+
+
+def _log_query_start(state: QueryTerminologyNodeInput, text_count: int) -> None:
+    logger.info(f"开始术语查询，目标语言: {state.target_languages}，待扫描文本数: {text_count}")
+
+
+def _build_output(all_chinese_words: Set[str], terminology_dict: Dict[str, Dict[str, str]]) -> QueryTerminologyNodeOutput:
+    # 如果没有中文词汇，直接返回
+    if not all_chinese_words:
+        logger.info("没有找到中文词汇")
+        return QueryTerminologyNodeOutput(terminology_dict={})
+
+    logger.info(f"待查询的中文词汇数量: {len(all_chinese_words)}")
+    match_count = sum(len(translations) for translations in terminology_dict.values())
+
+    # 打印汇总信息
+    logger.info(f"术语查询完成，共找到 {len(terminology_dict)} 个术语的翻译")
+    logger.info(f"  - 匹配数量: {match_count} 个")
+    for word, translations in terminology_dict.items():
+        logger.info(f"  {word}: {translations}")
+
+    return QueryTerminologyNodeOutput(terminology_dict=terminology_dict)
+
 
 def query_terminology_node(state: QueryTerminologyNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> QueryTerminologyNodeOutput:
     """
     title: 术语查询（精确匹配）
-    desc: 从数据库表"翻译知识库"中精确查询专词翻译
+    desc: 用术语表构建的匹配自动机扫描中文列，查询命中专词在"翻译知识库"中的翻译；可选对未命中片段近似匹配；数据库不可用时使用离线快照
     integrations: 数据库
     """
     ctx = runtime.context
-    
-    # 初始化数据库会话
-    db = get_session()
-    
-    # 初始化翻译知识库管理器
-    translation_mgr = TranslationKnowledgeManager()
-    
-    # 构建术语字典：{中文词: {目标语言: 翻译}}
-    terminology_dict: Dict[str, Dict[str, str]] = {}
-    
+
     try:
-        # 从CSV数据中提取需要翻译的中文词汇
-        all_chinese_words = set()
-        
-        for row in state.csv_data['data']:
-            for col in state.chinese_columns:
-                if col in row:
-                    text = str(row[col])
-                    # 提取中文词（2个字及以上）
-                    chinese_words = re.findall(r'[\u4e00-\u9fff]{2,}', text)
-                    all_chinese_words.update(chinese_words)
-        
-        # 如果没有中文词汇，直接返回
-        if not all_chinese_words:
-            logger.info("没有找到中文词汇")
-            return QueryTerminologyNodeOutput(terminology_dict={})
-        
-        logger.info(f"开始从数据库进行术语查询")
-        logger.info(f"待查询的中文词汇数量: {len(all_chinese_words)}")
-        logger.info(f"目标语言: {state.target_languages}")
-        
-        match_count = 0
-        
-        # 为每个目标语言进行精确匹配查询
-        for target_lang in state.target_languages:
-            for chinese_word in all_chinese_words:
-                # 精确匹配
-                translation = translation_mgr.get_translation(db, chinese_word, target_lang)
-                if translation:
-                    if chinese_word not in terminology_dict:
-                        terminology_dict[chinese_word] = {}
-                    terminology_dict[chinese_word][target_lang] = translation
-                    match_count += 1
-                    logger.info(f"✓ 匹配: {chinese_word} -> {translation} ({target_lang})")
-        
-        # 打印汇总信息
-        logger.info(f"术语查询完成，共找到 {len(terminology_dict)} 个术语的翻译")
-        logger.info(f"  - 匹配数量: {match_count} 个")
-        for word, translations in terminology_dict.items():
-            logger.info(f"  {word}: {translations}")
-        
-        return QueryTerminologyNodeOutput(terminology_dict=terminology_dict)
-    
+        texts = _collect_texts(state)
+        _log_query_start(state, len(texts))
+
+        snapshot = get_glossary_snapshot()
+        if _use_snapshot_for_cold_start(snapshot):
+            return _build_output(*_query_snapshot(snapshot, texts, state.target_languages))
+        try:
+            return _build_output(*_query_database(texts, state.target_languages))
+        except Exception as e:
+            if snapshot is None:
+                raise
+            logger.warning(f"术语查询失败，改用离线快照 {snapshot.path}: {str(e)}")
+            return _build_output(*_query_snapshot(snapshot, texts, state.target_languages))
+
+    except Exception as e:
+        # 如果查询失败（且没有可用的离线快照），返回空字典，不影响后续翻译流程
+        logger.error(f"术语查询失败: {str(e)}", exc_info=True)
+        return QueryTerminologyNodeOutput(terminology_dict={})
+
+
+async def aquery_terminology_node(state: QueryTerminologyNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> QueryTerminologyNodeOutput:
+    """
+    title: 术语查询（精确匹配，异步）
+    desc: 与 query_terminology_node 相同，数据库查询在事件循环上等待，不占用工作线程
+    integrations: 数据库
+    """
+    ctx = runtime.context
+
+    try:
+        texts = _collect_texts(state)
+        _log_query_start(state, len(texts))
+
+        snapshot = get_glossary_snapshot()
+        if _use_snapshot_for_cold_start(snapshot):
+            return _build_output(*_query_snapshot(snapshot, texts, state.target_languages))
+        try:
+            return _build_output(*await _aquery_database(texts, state.target_languages))
+        except Exception as e:
+            if snapshot is None:
+                raise
+            logger.warning(f"术语查询失败，改用离线快照 {snapshot.path}: {str(e)}")
+            return _build_output(*_query_snapshot(snapshot, texts, state.target_languages))
+
     except Exception as e:
-        # 如果查询失败，返回空字典，不影响后续翻译流程
         logger.error(f"术语查询失败: {str(e)}", exc_info=True)
         return QueryTerminologyNodeOutput(terminology_dict={})
-    finally:
-        # 关闭数据库会话
-        db.close()
@@ -1,11 +1,73 @@
-import pandas as pd
+import os
 import re
+import pandas as pd
+from typing import List, Optional
 from langchain_core.runnables import RunnableConfig
 from langgraph.runtime import Runtime
 from coze_coding_utils.runtime_ctx.context import Context
 from graphs.state import ReadCSVNodeInput, ReadCSVNodeOutput, normalize_language_names
 from utils.file.file import FileOps
 
+# 定义中文正则表达式
+CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+# 中文列识别：先检查开头这么多行，未命中的列再按块扫描全列
+CHINESE_DETECT_SAMPLE_ROWS = int(os.getenv("CHINESE_DETECT_SAMPLE_ROWS", "1000"))
+# 全列扫描时每块的行数，某块命中后该列不再继续扫描
+CHINESE_DETECT_BLOCK_ROWS = int(os.getenv("CHINESE_DETECT_BLOCK_ROWS", "65536"))
+
+
+def _contains_chinese(values: pd.Series) -> bool:
+    # 整块拼接为一个字符串后做一次正则搜索：扫描在正则引擎内完成，遇到第一个中文字符即返回
+    cells = values.tolist()
+    try:
+        text = "\n".join(cells)
+    except TypeError:
+        # 含缺失值（NaN）等非字符串单元格：非字符串不可能包含中文
+        text = "\n".join(cell for cell in cells if isinstance(cell, str))
+    # 纯 ASCII 文本（判断为 O(1)）不需要正则扫描
+    return not text.isascii() and CHINESE_PATTERN.search(text) is not None
+
+
+def _column_has_chinese(series: pd.Series, start: int = 0) -> bool:
+    """从第 start 行开始按块扫描一列，命中即停止"""
+    for offset in range(start, len(series), CHINESE_DETECT_BLOCK_ROWS):
+        if _contains_chinese(series.iloc[offset:offset + CHINESE_DETECT_BLOCK_ROWS]):
+            return True
+    return False
+
+
+def detect_chinese_columns(df: pd.DataFrame, columns: Optional[List[str]] = None) -> List[str]:
+    """
+    识别包含中文内容的列
+
+    数值、布尔、日期等非文本列不可能包含中文，直接跳过；文本列先检查开头
+    CHINESE_DETECT_SAMPLE_ROWS 行，未命中的列再从样本之后按块扫描，结果与逐单元格检查一致。
+
+    Args:
+        df: 数据
+        columns: 只检查这些列（按 df 中的顺序返回），默认检查所有列
+
+    Returns:
+        包含中文的列名列表
+    """
+    candidates = [
+        column for column in df.columns
+        if (columns is None or column in columns)
+        and (pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column]))
+    ]
+    sample_rows = min(max(CHINESE_DETECT_SAMPLE_ROWS, 0), len(df))
+    found = set()
+    # 1. 样本：大多数中文列在开头几行就能命中
+    if sample_rows:
+        for column in candidates:
+            if _contains_chinese(df[column].iloc[:sample_rows]):
+                found.add(column)
+    # 2. 样本未命中的列扫描剩余行
+    for column in candidates:
+        if column not in found and _column_has_chinese(df[column], sample_rows):
+            found.add(column)
+    return [column for column in candidates if column in found]
+
 
 def read_csv_node(state: ReadCSVNodeInput, config: RunnableConfig, runtime: Runtime[Context]) -> ReadCSVNodeOutput:
     """
@@ -18,55 +80,24 @@ def read_csv_node(state: ReadCSVNodeInput, config: RunnableConfig, runtime: Runt
     # 1. 标准化目标语言名称
     normalized_languages = normalize_language_names(state.target_languages)
     
-    # 2. 读取CSV文件内容
-    csv_content = FileOps.extract_text(state.csv_file)
+    # 2. 直接从下载缓冲区解析CSV（按样本检测编码，不解码为整段字符串、不写临时文件）
+    df = FileOps.read_csv(state.csv_file)
     
-    # 2. 使用pandas读取CSV（从字符串）
-    # 需要先将文本保存到临时文件，pandas才能正确读取
-    import tempfile
-    import os
+    # 3. 识别包含中文的列
+    chinese_columns = detect_chinese_columns(df)
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8') as f:
-        f.write(csv_content)
-        temp_file = f.name
+    # 4. 将DataFrame转换为字典格式（便于后续处理）
+    # 使用orient='records'格式，每行一个字典
+    csv_data_dict = df.to_dict(orient='records')
     
-    try:
-        # 读取CSV文件
-        df = pd.read_csv(temp_file, encoding='utf-8')
-        
-        # 3. 识别包含中文的列
-        chinese_columns = []
-        
-        # 定义中文正则表达式
-        chinese_pattern = re.compile(r'[\u4e00-\u9fff]+')
-        
-        # 检查每一列
-        for column in df.columns:
-            # 获取该列的值（转为字符串）
-            column_values = df[column].astype(str)
-            
-            # 检查是否有任何值包含中文
-            has_chinese = bool(column_values.apply(lambda x: bool(chinese_pattern.search(x))).any())
-            
-            if has_chinese:
-                chinese_columns.append(column)
-        
-        # 4. 将DataFrame转换为字典格式（便于后续处理）
-        # 使用orient='records'格式，每行一个字典
-        csv_data_dict = df.to_dict(orient='records')
-        
-        # 同时也保存列信息
-        csv_data = {
-            'columns': df.columns.tolist(),
-            'data': csv_data_dict
-        }
-        
-        return ReadCSVNodeOutput(
-            csv_data=csv_data,
-            chinese_columns=chinese_columns,
-            target_languages=normalized_languages
-        )
-    finally:
-        # 清理临时文件
-        if os.path.exists(temp_file):
-            os.unlink(temp_file)
+    # 同时也保存列信息
+    csv_data = {
+        'columns': df.columns.tolist(),
+        'data': csv_data_dict
+    }
+    
+    return ReadCSVNodeOutput(
+        csv_data=csv_data,
+        chinese_columns=chinese_columns,
+        target_languages=normalized_languages
+    )
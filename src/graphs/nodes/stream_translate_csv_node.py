@@ -0,0 +1,218 @@
+import os
+import uuid
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import pandas as pd
+from langchain_core.runnables import RunnableConfig
+from langgraph.runtime import Runtime
+from coze_coding_utils.runtime_ctx.context import Context
+from graphs.state import (
+    GlobalState,
+    StreamTranslateCSVNodeInput,
+    StreamTranslateCSVNodeOutput,
+    QueryTerminologyNodeInput,
+    ParallelTranslateDispatchNodeInput,
+    normalize_language_names
+)
+from graphs.nodes.read_csv_node import detect_chinese_columns
+from graphs.nodes.query_terminology_node import query_terminology_node
+from graphs.nodes.parallel_translate_dispatch_node import parallel_translate_dispatch_node
+from graphs.nodes.generate_csv_node import upload_csv_file
+from utils.file.file import FileOps, MAX_FILE_SIZE, detect_file_encoding, infer_file_category
+
+logger = logging.getLogger(__name__)
+
+# 超过该大小（字节）的CSV走流式翻译，不整体读入内存；<= 0 表示不启用
+CSV_STREAMING_THRESHOLD = int(os.getenv("CSV_STREAMING_THRESHOLD", str(MAX_FILE_SIZE)))
+# 每块的行数：每块独立完成术语查询、翻译和写出
+CSV_STREAM_CHUNK_ROWS = int(os.getenv("CSV_STREAM_CHUNK_ROWS", "2000"))
+# 同时翻译的块数上限（内存中最多保留这么多块及其翻译结果）
+CSV_STREAM_MAX_INFLIGHT = max(1, int(os.getenv("CSV_STREAM_MAX_INFLIGHT", "2")))
+
+
+def should_stream_csv(state: GlobalState) -> str:
+    """
+    入口路由：超过 CSV_STREAMING_THRESHOLD 的CSV文件走流式翻译，其余走整表流程
+
+    Returns:
+        下一个节点名称
+    """
+    if CSV_STREAMING_THRESHOLD <= 0:
+        return "read_csv"
+    _, ext = infer_file_category(state.csv_file.url)
+    if ext != '.csv':
+        return "read_csv"
+    size = FileOps.get_size(state.csv_file)
+    if size is not None and size > CSV_STREAMING_THRESHOLD:
+        print(f"[INFO] CSV文件大小 {size} bytes 超过 {CSV_STREAMING_THRESHOLD} bytes，使用流式翻译")
+        return "stream_translate_csv"
+    return "read_csv"
+
+
+def _iter_chunks(path: str, encoding: str):
+    # 所有单元格按字符串读取：各块的类型推断互不影响，写出的值与原文件一致
+    return pd.read_csv(
+        path,
+        encoding=encoding,
+        chunksize=CSV_STREAM_CHUNK_ROWS,
+        dtype=str,
+        keep_default_na=False
+    )
+
+
+def _scan_chunks(path: str, encoding: str) -> Tuple[List[str], List[str], int]:
+    """逐块扫描整个文件：识别中文列（已识别的列不再检查），同时校验整个文件能按该编码解码"""
+    columns: List[str] = []
+    found = set()
+    total_rows = 0
+    with _iter_chunks(path, encoding) as reader:
+        for chunk in reader:
+            if not columns:
+                columns = chunk.columns.tolist()
+            remaining = [col for col in columns if col not in found]
+            if remaining:
+                found.update(detect_chinese_columns(chunk, remaining))
+            total_rows += len(chunk)
+    return columns, [col for col in columns if col in found], total_rows
+
+
+def _scan_csv(path: str) -> Tuple[str, List[str], List[str], int]:
+    """
+    预扫描CSV文件，确定编码和中文列
+
+    Returns:
+        (编码, 列名列表, 中文列名列表, 总行数)
+    """
+    encoding = detect_file_encoding(path)
+    try:
+        return (encoding, *_scan_chunks(path, encoding))
+    except UnicodeDecodeError:
+        # 开头样本为 UTF-8 但后文无法解码：从第一个非 ASCII 字节处取样重新检测
+        encoding = detect_file_encoding(path, after_decode_error=True)
+        logger.info(f"CSV文件按开头样本检测的编码解码失败，重新检测为: {encoding}")
+        return (encoding, *_scan_chunks(path, encoding))
+
+
+def _translate_chunk(
+    chunk: pd.DataFrame,
+    chinese_columns: List[str],
+    target_languages: List[str],
+    config: RunnableConfig,
+    runtime: Runtime[Context]
+) -> Dict[str, Any]:
+    """单块依次执行术语查询和并行翻译，返回合并后的数据（格式同 merged_data）"""
+    csv_data = {
+        'columns': chunk.columns.tolist(),
+        'data': chunk.to_dict(orient='records')
+    }
+    if not chinese_columns:
+        return csv_data
+    terminology_output = query_terminology_node(
+        QueryTerminologyNodeInput(
+            csv_data=csv_data,
+            chinese_columns=chinese_columns,
+            target_languages=target_languages
+        ),
+        config,
+        runtime
+    )
+    dispatch_output = parallel_translate_dispatch_node(
+        ParallelTranslateDispatchNodeInput(
+            csv_data=csv_data,
+            chinese_columns=chinese_columns,
+            target_languages=target_languages,
+            terminology_dict=terminology_output.terminology_dict
+        ),
+        config,
+        runtime
+    )
+    return dispatch_output.merged_data
+
+
+def _stream_translate(
+    path: str,
+    encoding: str,
+    chinese_columns: List[str],
+    target_languages: List[str],
+    output_path: str,
+    total_rows: int,
+    config: RunnableConfig,
+    runtime: Runtime[Context]
+) -> int:
+    """
+    逐块读取、翻译并按原顺序追加写入输出文件，最多 CSV_STREAM_MAX_INFLIGHT 块同时翻译
+
+    每块所有目标语言翻译完成后立即写出并释放，内存占用与文件大小无关。
+
+    Returns:
+        写出的行数
+    """
+    header: Optional[List[str]] = None
+    written = 0
+    pending: Deque[Future] = deque()
+
+    with open(output_path, 'w', encoding='utf-8-sig', newline='') as out, \
+            ThreadPoolExecutor(max_workers=CSV_STREAM_MAX_INFLIGHT, thread_name_prefix="csv-stream") as executor:
+
+        def write_next() -> None:
+            nonlocal header, written
+            merged_data = pending.popleft().result()
+            is_first = header is None
+            if is_first:
+                header = merged_data['columns']
+            pd.DataFrame(merged_data['data'], columns=header).to_csv(out, header=is_first, index=False)
+            written += len(merged_data['data'])
+            print(f"[INFO] 流式翻译: 已写出 {written}/{total_rows} 行")
+
+        try:
+            with _iter_chunks(path, encoding) as reader:
+                for chunk in reader:
+                    pending.append(executor.submit(
+                        _translate_chunk, chunk, chinese_columns, target_languages, config, runtime
+                    ))
+                    if len(pending) >= CSV_STREAM_MAX_INFLIGHT:
+                        write_next()
+            while pending:
+                write_next()
+        finally:
+            for future in pending:
+                future.cancel()
+    return written
+
+
+def stream_translate_csv_node(
+    state: StreamTranslateCSVNodeInput,
+    config: RunnableConfig,
+    runtime: Runtime[Context]
+) -> StreamTranslateCSVNodeOutput:
+    """
+    title: 流式翻译大CSV
+    desc: 按行分块读取超大CSV，每块依次完成术语查询、并行翻译并追加写出，最后上传到对象存储
+    integrations: 文件处理、数据库、对象存储
+    """
+    ctx = runtime.context
+
+    target_languages = normalize_language_names(state.target_languages)
+
+    # 下载到本地文件（不受 MAX_FILE_SIZE 限制），之后按块读取
+    input_path = FileOps.save_to_local(state.csv_file, f"stream_{uuid.uuid4().hex[:8]}.csv")
+    file_name = f"translated_{uuid.uuid4().hex[:8]}.csv"
+    output_path = os.path.join(FileOps.DOWNLOAD_DIR, file_name)
+    try:
+        encoding, columns, chinese_columns, total_rows = _scan_csv(input_path)
+        print(f"[INFO] 流式翻译: 编码 {encoding}，总行数 {total_rows}，中文列 {chinese_columns}，每块 {CSV_STREAM_CHUNK_ROWS} 行")
+
+        written = _stream_translate(
+            input_path, encoding, chinese_columns, target_languages,
+            output_path, total_rows, config, runtime
+        )
+        print(f"[INFO] 流式翻译完成，共写出 {written} 行")
+
+        return StreamTranslateCSVNodeOutput(output_csv_url=upload_csv_file(output_path, file_name))
+    finally:
+        if state.csv_file.is_remote and os.path.exists(input_path):
+            os.unlink(input_path)
+        if os.path.exists(output_path):
+            os.unlink(output_path)
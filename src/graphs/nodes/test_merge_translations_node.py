@@ -0,0 +1,122 @@
+"""
+合并翻译结果单元测试：与逐行回填的参考实现对比，并确认不修改输入数据
+"""
+import copy
+import math
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from graphs.nodes.merge_translations_node import merge_translations_node
+from graphs.state import MergeTranslationsNodeInput
+from utils.text.cell_classifier import is_translatable_cell
+
+COLUMNS = ["名称", "描述", "价格"]
+CHINESE_COLUMNS = ["名称", "描述"]
+LANGUAGES = ["英文", "日文"]
+ROWS = [
+    {"名称": "苹果", "描述": "红色", "价格": 1},
+    {"名称": float("nan"), "描述": "红色", "价格": 2.5},
+    {"名称": 123, "描述": None, "价格": 3},
+    {"描述": "绿色", "价格": 4},                       # 缺少“名称”
+    {"名称": "香蕉", "价格": 5},                       # 缺少“描述”
+    {"名称": "梨", "描述": "https://example.com/梨", "价格": 6},
+    {"名称": "苹果", "描述": "未翻译", "价格": 7},
+    {},
+]
+TRANSLATED_RESULTS = [
+    {
+        "target_language": "英文",
+        "segment_translations": {
+            "名称": {"苹果": "apple", "香蕉": "banana"},
+            "描述": {"红色": "red", "绿色": "green"},
+        },
+        "translated_columns": [
+            {"original_column": "名称", "translated_column": "名称_英文_翻译"},
+            {"original_column": "描述", "translated_column": "描述_英文_翻译"},
+        ],
+    },
+    {
+        # 部分翻译：日文只有“名称”列的部分结果
+        "target_language": "日文",
+        "segment_translations": {"名称": {"苹果": "りんご"}},
+        "translated_columns": [
+            {"original_column": "名称", "translated_column": "名称_日文_翻译"},
+            {"original_column": "描述", "translated_column": "描述_日文_翻译"},
+        ],
+    },
+]
+
+
+def reference_merge(rows_data, translated_results):
+    """逐行回填的参考实现（按列合并之前的行为）"""
+    merged_rows = copy.deepcopy(rows_data)
+    for lang_result in translated_results:
+        segment_translations = lang_result.get('segment_translations', {})
+        for original_row in merged_rows:
+            for col_info in lang_result.get('translated_columns', []):
+                original_col = col_info["original_column"]
+                if original_col not in original_row:
+                    continue
+                value = original_row[original_col]
+                if is_translatable_cell(value):
+                    value = segment_translations.get(original_col, {}).get(value, value)
+                original_row[col_info["translated_column"]] = value
+    return merged_rows
+
+
+def normalize(row):
+    return {key: None if isinstance(value, float) and math.isnan(value) else value for key, value in row.items()}
+
+
+def run_merge(rows_data, translated_results=TRANSLATED_RESULTS):
+    state = MergeTranslationsNodeInput(
+        csv_data={"columns": COLUMNS, "data": rows_data},
+        chinese_columns=CHINESE_COLUMNS,
+        target_languages=LANGUAGES,
+        translated_results=translated_results,
+    )
+    return state, merge_translations_node(state, {}, SimpleNamespace(context=None)).merged_data
+
+
+def test_matches_reference_merge():
+    _, merged_data = run_merge(copy.deepcopy(ROWS))
+    expected = reference_merge(ROWS, TRANSLATED_RESULTS)
+    assert [normalize(row) for row in merged_data['data']] == [normalize(row) for row in expected]
+    assert merged_data['columns'] == COLUMNS + ["名称_英文_翻译", "描述_英文_翻译", "名称_日文_翻译", "描述_日文_翻译"]
+
+
+def test_rows_missing_source_column_get_no_translated_column():
+    _, merged_data = run_merge(copy.deepcopy(ROWS))
+    rows = merged_data['data']
+    assert "名称_英文_翻译" not in rows[3] and "名称_日文_翻译" not in rows[3]
+    assert rows[3]["描述_英文_翻译"] == "green"
+    assert "描述_英文_翻译" not in rows[4] and rows[4]["名称_英文_翻译"] == "banana"
+    assert rows[7] == {}
+
+
+def test_untranslated_cells_keep_original_value():
+    _, merged_data = run_merge(copy.deepcopy(ROWS))
+    rows = merged_data['data']
+    assert math.isnan(rows[1]["名称_英文_翻译"])
+    assert rows[2]["名称_英文_翻译"] == 123 and rows[2]["描述_英文_翻译"] is None
+    assert rows[5]["描述_英文_翻译"] == "https://example.com/梨"
+    assert rows[6]["描述_英文_翻译"] == "未翻译"
+    assert rows[0]["名称_日文_翻译"] == "りんご" and rows[0]["描述_日文_翻译"] == "红色"
+
+
+def test_input_not_mutated():
+    rows_data = copy.deepcopy(ROWS)
+    state, merged_data = run_merge(rows_data)
+    assert state.csv_data['data'] is rows_data
+    assert [normalize(row) for row in state.csv_data['data']] == [normalize(row) for row in ROWS]
+    assert all(merged is not original for merged, original in zip(merged_data['data'], rows_data))
+
+
+def test_no_translated_results():
+    _, merged_data = run_merge(copy.deepcopy(ROWS), [])
+    assert merged_data['columns'] == COLUMNS
+    assert [normalize(row) for row in merged_data['data']] == [normalize(row) for row in ROWS]
@@ -0,0 +1,109 @@
+"""
+批次规划单元测试：多语言模式按片段未命中的语言分组；重试规划（_plan_followups）的拆分、重试、放弃三种分支
+"""
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from graphs.nodes.parallel_translate_dispatch_node import TRANSLATE_MAX_ATTEMPTS, _plan_followups, _plan_multi_language_jobs
+from graphs.run_data import RunData
+
+SEGMENTS = [("名称", "苹果"), ("名称", "香蕉"), ("描述", "红色"), ("描述", "黄色")]
+
+
+def make_plan(retry_budget=10):
+    return {'retry_budget': retry_budget, 'retry_stats': {'retries': 0, 'bisections': 0, 'abandoned': 0}}
+
+
+def make_batch(attempt=1, languages=("英文", "日文")):
+    return {
+        'batch_id': 'b',
+        'batch_index': 3,
+        'total_batches': 5,
+        'target_languages': list(languages),
+        'segment_ids': [0, 1, 2, 3],
+        'attempt': attempt,
+    }
+
+
+def test_nothing_missing():
+    plan = make_plan()
+    assert _plan_followups(plan, make_batch(), {}, failed=False, truncated=False) == []
+    assert plan['retry_budget'] == 10
+
+
+def test_missing_segments_are_retried_alone():
+    plan = make_plan()
+    followups = _plan_followups(plan, make_batch(), {1: ["日文"], 3: ["日文"]}, failed=False, truncated=False)
+    assert len(followups) == 1
+    assert followups[0]['segment_ids'] == [1, 3]
+    # 只请求缺失的语言
+    assert followups[0]['target_languages'] == ["日文"]
+    assert followups[0]['attempt'] == 2
+    assert followups[0]['batch_index'] == 3 and followups[0]['total_batches'] == 5
+    assert plan['retry_budget'] == 9
+    assert plan['retry_stats'] == {'retries': 1, 'bisections': 0, 'abandoned': 0}
+
+
+def test_truncated_batch_is_bisected():
+    plan = make_plan()
+    missing = {segment_id: ["英文", "日文"] for segment_id in range(4)}
+    followups = _plan_followups(plan, make_batch(), missing, failed=True, truncated=True)
+    assert [followup['segment_ids'] for followup in followups] == [[0, 1], [2, 3]]
+    assert all(followup['attempt'] == 1 for followup in followups)
+    assert plan['retry_budget'] == 8
+    assert plan['retry_stats'] == {'retries': 2, 'bisections': 1, 'abandoned': 0}
+
+
+def test_repeated_failure_is_bisected():
+    plan = make_plan()
+    missing = {segment_id: ["英文"] for segment_id in range(4)}
+    # 第一次失败只重试，第二次仍失败时拆分
+    first = _plan_followups(plan, make_batch(attempt=1), missing, failed=True, truncated=False)
+    assert [followup['segment_ids'] for followup in first] == [[0, 1, 2, 3]]
+    second = _plan_followups(plan, make_batch(attempt=2), missing, failed=True, truncated=False)
+    assert [followup['segment_ids'] for followup in second] == [[0, 1], [2, 3]]
+
+
+def test_single_segment_abandoned_after_max_attempts():
+    plan = make_plan()
+    followups = _plan_followups(plan, make_batch(attempt=TRANSLATE_MAX_ATTEMPTS), {2: ["英文"]}, failed=True, truncated=False)
+    assert followups == []
+    assert plan['retry_budget'] == 10
+    assert plan['retry_stats'] == {'retries': 0, 'bisections': 0, 'abandoned': 1}
+
+
+def test_abandoned_when_retry_budget_exhausted():
+    plan = make_plan(retry_budget=1)
+    missing = {segment_id: ["英文"] for segment_id in range(4)}
+    # 拆分需要2个预算，只剩1个
+    assert _plan_followups(plan, make_batch(), missing, failed=True, truncated=True) == []
+    assert plan['retry_budget'] == 1
+    assert plan['retry_stats']['abandoned'] == 4
+
+
+def test_multi_language_jobs_request_only_missing_languages():
+    run_data = RunData(["名称", "描述"], ["名称", "描述"], SEGMENTS, {})
+    # 苹果：英文已命中翻译记忆；香蕉：全部未命中；红色：全部命中；黄色：只有日文未命中
+    miss_segments = {
+        "英文": [("名称", "香蕉")],
+        "日文": [("名称", "苹果"), ("名称", "香蕉"), ("描述", "黄色")],
+        "韩文": [("名称", "苹果"), ("名称", "香蕉")],
+    }
+    jobs = _plan_multi_language_jobs(run_data, miss_segments, ["英文", "日文", "韩文"], output_budget=10 ** 6)
+    requested = {
+        segment_id: job['target_languages']
+        for job in jobs
+        for segment_id in job['segment_ids']
+    }
+    assert requested == {0: ["日文", "韩文"], 1: ["英文", "日文", "韩文"], 3: ["日文"]}
+    assert all(job['total_batches'] == 1 and job['batch_index'] == 0 for job in jobs)
+
+
+def test_multi_language_jobs_fall_back_when_over_budget():
+    run_data = RunData(["名称", "描述"], ["名称", "描述"], SEGMENTS, {})
+    miss_segments = {"英文": SEGMENTS, "日文": SEGMENTS}
+    assert _plan_multi_language_jobs(run_data, miss_segments, ["英文", "日文"], output_budget=1) == []
+    assert _plan_multi_language_jobs(run_data, {"英文": SEGMENTS}, ["英文"], output_budget=10 ** 6) == []
@@ -0,0 +1,62 @@
+"""
+紧凑格式（[编号, 原文] / {编号: 译文}）解析与还原的单元测试
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from graphs.nodes.parallel_translate_node import parse_compact_translations, split_compact_translations
+
+ITEMS = [{"名称": "商品"}, {"名称": "苹果"}, {"描述": "好看"}]
+CELL_IDS = [(0, "名称"), (1, "名称"), (2, "描述")]
+
+
+@pytest.mark.parametrize("response_text, expected", [
+    ('{"0": "Goods", "1": "Apple"}', {"0": "Goods", "1": "Apple"}),
+    ('好的，结果如下：\n```json\n{"0": "Goods"}\n```', {"0": "Goods"}),
+    ('{0: "Goods"}', None),
+    ('{"0": "Goods", "1": "App', None),
+    ('["Goods", "Apple"]', None),
+    ('', None),
+    ('没有JSON', None),
+    ('{"0": {"英文": "Goods", "日文": "商品"}}', {"0": {"英文": "Goods", "日文": "商品"}}),
+])
+def test_parse_compact_translations(response_text, expected):
+    assert parse_compact_translations(response_text) == expected
+
+
+def test_split_single_language():
+    result = split_compact_translations(ITEMS, CELL_IDS, {"0": "Goods", "2": "Pretty"}, ["英文"])
+    assert result == {"英文": {0: {"名称_英文_翻译": "Goods"}, 2: {"描述_英文_翻译": "Pretty"}}}
+
+
+def test_split_multi_language_partial():
+    translations = {"0": {"英文": "Goods", "日文": "商品"}, "1": {"英文": "Apple"}}
+    assert split_compact_translations(ITEMS, CELL_IDS, translations, ["英文", "日文"]) == {
+        "英文": {0: {"名称_英文_翻译": "Goods"}, 1: {"名称_英文_翻译": "Apple"}},
+        "日文": {0: {"名称_日文_翻译": "商品"}},
+    }
+
+
+def test_split_ignores_missing_out_of_range_and_malformed_ids():
+    translations = {
+        "1": "",            # 空译文视为缺失
+        "2": 42,            # 非字符串译文视为缺失
+        "3": "越界",        # 不存在的编号
+        "-1": "负数",
+        "x": "非数字",
+    }
+    assert split_compact_translations(ITEMS, CELL_IDS, translations, ["英文"]) == {"英文": {}}
+
+
+def test_split_multi_language_rejects_bare_string():
+    # 多语言模式下返回字符串无法判断语言，不采纳
+    assert split_compact_translations(ITEMS, CELL_IDS, {"0": "Goods"}, ["英文", "日文"]) == {"英文": {}, "日文": {}}
+
+
+def test_split_empty_response():
+    assert split_compact_translations(ITEMS, CELL_IDS, {}, ["英文"]) == {"英文": {}}
@@ -0,0 +1,93 @@
+"""
+术语查询近似匹配兜底单元测试：只对精确未命中的片段近似匹配，查询失败时保留精确匹配结果
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import graphs.nodes.query_terminology_node as node
+
+TEXTS = {"不锈钢板材 天使扣", "天使扣子", "红色外套", "A1"}
+EXACT = {"天使扣": {"英文": "angel button"}}
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+class FakeManager:
+    """只记录近似匹配的查询；精确匹配返回固定结果"""
+
+    queries = []
+    fail = False
+
+    def get_translations_multi(self, db, terms, target_languages):
+        return {term: dict(EXACT[term]) for term in terms if term in EXACT}
+
+    def find_similar_terms(self, db, chinese_terms, target_languages):
+        FakeManager.queries.append(list(chinese_terms))
+        if FakeManager.fail:
+            raise RuntimeError("pg_trgm 未安装")
+        return {
+            "不锈钢板材": [
+                {"term": "不锈钢板", "similarity": 0.8, "translations": {"英文": "stainless steel plate"}},
+                {"term": "不锈钢", "similarity": 0.6, "translations": {"英文": "stainless steel"}},
+            ]
+        }
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    FakeManager.queries = []
+    FakeManager.fail = False
+    monkeypatch.setattr(node, "GLOSSARY_CACHE_ENABLED", False)
+    monkeypatch.setattr(node, "get_session", FakeSession)
+    monkeypatch.setattr(node, "TranslationKnowledgeManager", FakeManager)
+    return FakeManager
+
+
+def test_fuzzy_queries_skip_exact_hits():
+    # 包含已命中术语的片段（“天使扣子”）和非中文片段不参与近似匹配
+    assert node._fuzzy_queries(TEXTS, EXACT) == ["不锈钢板材", "红色外套"]
+    assert node._fuzzy_queries(TEXTS, {}) == ["不锈钢板材", "天使扣", "天使扣子", "红色外套"]
+
+
+def test_fuzzy_queries_limit(monkeypatch):
+    monkeypatch.setattr(node, "GLOSSARY_FUZZY_MAX_TERMS", 1)
+    assert node._fuzzy_queries(TEXTS, EXACT) == ["不锈钢板材"]
+
+
+def test_fuzzy_disabled(fake_db, monkeypatch):
+    monkeypatch.setattr(node, "GLOSSARY_FUZZY_FALLBACK", False)
+    words, terminology = node._query_database(TEXTS, ["英文"])
+    assert terminology == EXACT
+    assert fake_db.queries == []
+
+
+def test_fuzzy_fallback_keys_by_source_text(fake_db, monkeypatch):
+    monkeypatch.setattr(node, "GLOSSARY_FUZZY_FALLBACK", True)
+    words, terminology = node._query_database(TEXTS, ["英文"])
+    assert fake_db.queries == [["不锈钢板材", "红色外套"]]
+    # 以原文片段为键，取相似度最高的候选；精确匹配结果不变
+    assert terminology == {
+        "天使扣": {"英文": "angel button"},
+        "不锈钢板材": {"英文": "stainless steel plate"},
+    }
+    assert "不锈钢板材" in words
+
+
+def test_fuzzy_failure_keeps_exact_results(fake_db, monkeypatch):
+    monkeypatch.setattr(node, "GLOSSARY_FUZZY_FALLBACK", True)
+    fake_db.fail = True
+    assert node._query_database(TEXTS, ["英文"])[1] == EXACT
+
+
+def test_merge_keeps_exact_translation():
+    matches = {"天使扣": [{"term": "天使扣子", "similarity": 0.7, "translations": {"英文": "other"}}]}
+    words, terminology = node._merge_fuzzy_matches({"天使扣"}, EXACT, matches)
+    assert terminology == EXACT and words == {"天使扣"}
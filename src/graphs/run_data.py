@@ -0,0 +1,68 @@
+"""
+运行级只读数据：一次翻译运行中，列信息、去重后的片段和专词字典只保存一份
+
+批次输入（ParallelTranslateNodeInput）只携带数据句柄和片段ID，不再携带整份 csv_data 和专词字典，
+批次扇出的内存和校验开销不再随 行数 × 批次数 增长。句柄为字符串，节点输入仍可序列化。
+"""
+import uuid
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+
+class RunData:
+    """一次运行的只读共享数据，片段ID即片段在 segments 中的下标"""
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        chinese_columns: Sequence[str],
+        segments: Sequence[Tuple[str, str]],
+        terminology_dict: Mapping[str, Mapping[str, str]]
+    ):
+        self.handle = uuid.uuid4().hex
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.chinese_columns: Tuple[str, ...] = tuple(chinese_columns)
+        self.segments: Tuple[Tuple[str, str], ...] = tuple(segments)
+        self.segment_index: Dict[Tuple[str, str], int] = {segment: i for i, segment in enumerate(self.segments)}
+        self.terminology_dict: Mapping[str, Mapping[str, str]] = MappingProxyType(terminology_dict)
+
+    def texts(self, segment_ids: Iterable[int]) -> Iterator[str]:
+        """按片段ID依次返回原文"""
+        for segment_id in segment_ids:
+            yield self.segments[segment_id][1]
+
+    def items(self, segment_ids: Iterable[int]) -> List[Dict[str, str]]:
+        """按片段ID构建发送给大模型的数据：[{列名: 原文}, ...]"""
+        return [{col: text} for col, text in (self.segments[segment_id] for segment_id in segment_ids)]
+
+
+_run_data: Dict[str, RunData] = {}
+_run_data_lock = threading.Lock()
+
+
+def get_run_data(handle: str) -> RunData:
+    """
+    按句柄获取运行数据
+
+    Raises:
+        KeyError: 句柄不存在或运行已结束
+    """
+    with _run_data_lock:
+        run_data = _run_data.get(handle)
+    if run_data is None:
+        raise KeyError(f"运行数据不存在或已释放: {handle}")
+    return run_data
+
+
+@contextmanager
+def run_data_scope(run_data: RunData) -> Iterator[RunData]:
+    """在 with 块内登记运行数据，退出时释放（同步、异步节点均可使用）"""
+    with _run_data_lock:
+        _run_data[run_data.handle] = run_data
+    try:
+        yield run_data
+    finally:
+        with _run_data_lock:
+            _run_data.pop(run_data.handle, None)
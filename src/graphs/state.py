@@ -161,6 +161,17 @@ class GenerateCSVNodeOutput(BaseModel):
     output_csv_url: str = Field(..., description="生成的CSV文件URL")
 
 
+class StreamTranslateCSVNodeInput(BaseModel):
+    """流式翻译节点输入（大文件）"""
+    csv_file: File = Field(..., description="输入的CSV文件")
+    target_languages: str = Field(..., description="目标语言，用顿号分隔，如'英文、韩语'")
+
+
+class StreamTranslateCSVNodeOutput(BaseModel):
+    """流式翻译节点输出"""
+    output_csv_url: str = Field(..., description="生成的CSV文件URL")
+
+
 class QueryTerminologyNodeInput(BaseModel):
     """术语查询节点输入"""
     csv_data: dict = Field(..., description="CSV原始数据（DataFrame转字典格式）")
@@ -176,23 +187,27 @@ class QueryTerminologyNodeOutput(BaseModel):
 
 class ParallelTranslateNodeInput(BaseModel):
     """并行翻译节点输入"""
-    csv_data: dict = Field(..., description="CSV原始数据（DataFrame转字典格式）")
+    csv_data: dict = Field(default={}, description="CSV原始数据（DataFrame转字典格式），未提供 data_handle 和 batch_data 时使用")
     chinese_columns: List[str] = Field(..., description="需要翻译的中文列名列表")
     target_language: str = Field(..., description="单个目标语言")
+    target_languages: Optional[List[str]] = Field(default=None, description="多语言模式下的目标语言列表，一次请求返回所有语言的翻译")
     terminology_dict: dict = Field(default={}, description="专词字典")
     batch_id: Optional[str] = Field(default=None, description="批次ID")
     batch_index: Optional[int] = Field(default=0, description="批次索引")
     total_batches: Optional[int] = Field(default=1, description="总批次数")
     batch_data: Optional[List[dict]] = Field(default=None, description="批次数据（行数据列表）")
+    data_handle: Optional[str] = Field(default=None, description="运行级只读数据句柄（见 graphs.run_data），与 segment_ids 一起使用")
+    segment_ids: Optional[List[int]] = Field(default=None, description="批次的片段ID列表")
 
 
 class ParallelTranslateNodeOutput(BaseModel):
     """并行翻译节点输出"""
     target_language: str = Field(..., description="已翻译的目标语言")
-    translated_data: dict = Field(..., description="该语言的翻译结果")
     batch_id: Optional[str] = Field(default=None, description="批次ID")
     batch_index: Optional[int] = Field(default=0, description="批次索引")
-    translated_batch_data: Optional[List[dict]] = Field(default=None, description="翻译后的批次数据")
+    translations_by_language: Optional[Dict[str, Dict[int, Dict[str, str]]]] = Field(default=None, description="按目标语言拆分的稀疏译文：{目标语言: {行下标: {翻译列名: 译文}}}")
+    finish_reason: Optional[str] = Field(default=None, description="大模型结束原因，length 表示输出被截断")
+    parse_failed: bool = Field(default=False, description="响应JSON是否解析失败")
 
 
 class MergeTranslationsNodeInput(BaseModel):
@@ -200,7 +215,7 @@ class MergeTranslationsNodeInput(BaseModel):
     csv_data: dict = Field(..., description="CSV原始数据")
     chinese_columns: List[str] = Field(..., description="中文列名列表")
     target_languages: List[str] = Field(..., description="目标语言列表")
-    translated_results: List[dict] = Field(..., description="所有语言的翻译结果列表")
+    translated_results: List[dict] = Field(..., description="所有语言的翻译结果列表，每项包含 segment_translations：{列名: {原文: 译文}}")
 
 
 class MergeTranslationsNodeOutput(BaseModel):
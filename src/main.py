@@ -26,6 +26,11 @@ from utils.messages.server import (
     MESSAGE_END_CODE_CANCELED,
 )
 from utils.error import ErrorClassifier, classify_error
+from storage.database.translation_memory import get_translation_memory
+from utils.llm.scheduler import get_llm_scheduler
+from utils.llm.config_registry import get_llm_config_registry
+from storage.database.glossary_cache import get_glossary_cache
+from storage.database.pool import get_pool_stats
 
 setup_logging(
     log_file=LOG_FILE,
@@ -599,6 +604,18 @@ async def health_check():
         raise HTTPException(status_code=503, detail=str(e))
 
 
+@app.get("/translation_stats")
+async def translation_stats():
+    """翻译链路运行指标：翻译记忆命中/未命中计数、大模型调度器排队与执行中数量、配置及术语表缓存状态、数据库连接池"""
+    return {
+        "translation_memory": get_translation_memory().get_stats(),
+        "llm_scheduler": get_llm_scheduler().get_stats(),
+        "llm_config": get_llm_config_registry().get_stats(),
+        "glossary_cache": get_glossary_cache().get_stats(),
+        "db_pools": get_pool_stats(),
+    }
+
+
 @app.get(path="/graph_parameter")
 async def http_graph_inout_parameter(request: Request):
     return service.graph_inout_schema()
@@ -1,8 +1,11 @@
 import os
 import time
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from storage.database.pool import engine_options, instrument_engine
 import logging
 logger = logging.getLogger(__name__)
 
@@ -43,18 +46,9 @@ def _create_engine_with_retry():
     if url is None or url == "":
         logger.error("PGDATABASE_URL is not set")
         raise ValueError("PGDATABASE_URL is not set")
-    size = 100
-    overflow = 100
-    recycle = 1800
-    timeout = 30
-    engine = create_engine(
-        url,
-        pool_size=size,
-        max_overflow=overflow,
-        pool_pre_ping=True,
-        pool_recycle=recycle,
-        pool_timeout=timeout,
-    )
+    # 连接池大小、超时及 PgBouncer 兼容参数统一由 storage.database.pool 配置
+    engine = create_engine(url, **engine_options(url))
+    instrument_engine(engine, "orm")
     # 验证连接，带重试
     start_time = time.time()
     last_error = None
@@ -86,9 +80,58 @@ def get_sessionmaker():
 def get_session():
     return get_sessionmaker()()
 
+_async_engine = None
+_AsyncSessionLocal = None
+
+def _create_async_engine() -> AsyncEngine:
+    url = get_db_url()
+    if url is None or url == "":
+        logger.error("PGDATABASE_URL is not set")
+        raise ValueError("PGDATABASE_URL is not set")
+    # 使用 psycopg 3 的异步驱动（postgresql+psycopg 在 create_async_engine 下自动选择异步实现）
+    async_url = make_url(url).set(drivername="postgresql+psycopg")
+    # 不在创建时验证连接（需要事件循环），由 pool_pre_ping 在取出连接时检测
+    engine = create_async_engine(async_url, **engine_options(async_url.render_as_string(hide_password=False), async_engine=True))
+    instrument_engine(engine.sync_engine, "orm_async")
+    return engine
+
+def get_async_engine() -> AsyncEngine:
+    """
+    获取进程级异步引擎
+
+    连接池中的连接绑定在首次使用它们的事件循环上，应只在服务的主事件循环中使用；
+    在 asyncio.run 等临时事件循环中使用时，结束前需调用 dispose_async_engine。
+    """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_async_engine()
+    return _async_engine
+
+def get_async_sessionmaker():
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+def get_async_session() -> AsyncSession:
+    """获取异步会话，配合 async with 使用：async with get_async_session() as db: ..."""
+    return get_async_sessionmaker()()
+
+async def dispose_async_engine() -> None:
+    """关闭异步引擎的所有连接（服务退出或临时事件循环结束时调用）"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
 __all__ = [
     "get_db_url",
     "get_engine",
     "get_sessionmaker",
     "get_session",
+    "get_async_engine",
+    "get_async_sessionmaker",
+    "get_async_session",
+    "dispose_async_engine",
 ]
@@ -0,0 +1,336 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from storage.database.pool import DB_PGBOUNCER, connect_direct
+from storage.database.translation_manager import TranslationKnowledgeManager
+from utils.text.term_matcher import TermMatcher
+
+logger = logging.getLogger(__name__)
+
+# 是否启用进程内术语表缓存，关闭后每次术语查询直接访问数据库
+GLOSSARY_CACHE_ENABLED = os.getenv("GLOSSARY_CACHE_ENABLED", "true").lower() != "false"
+# 快照有效期（秒）：LISTEN 连接正常时由通知增量刷新，有效期只是兜底；
+# PgBouncer 事务池模式下 LISTEN 不可用，只依赖有效期刷新
+GLOSSARY_CACHE_TTL = float(os.getenv("GLOSSARY_CACHE_TTL", "600"))
+# 术语表变更通知的频道
+GLOSSARY_NOTIFY_CHANNEL = "glossary_changed"
+# NOTIFY 负载上限为8000字节，超出时改为通知全量刷新
+NOTIFY_PAYLOAD_LIMIT = 7000
+# 通知负载：全量刷新
+FULL_RELOAD_PAYLOAD = "*"
+# 增量刷新时单条SQL中IN列表的最大长度
+REFRESH_CHUNK_SIZE = 1000
+# LISTEN 连接断开后的重连间隔（秒）
+LISTEN_RETRY_INTERVAL = 5
+
+
+def notify_glossary_changed(db: Session, terms: Optional[Iterable[str]] = None) -> None:
+    """
+    在当前事务中发送术语表变更通知，事务提交后各实例的缓存收到通知并刷新
+
+    Args:
+        db: 数据库会话（与术语写入使用同一事务）
+        terms: 变更的中文术语，为None或负载过大时通知全量刷新
+    """
+    payload = FULL_RELOAD_PAYLOAD
+    if terms is not None:
+        payload = json.dumps(list(terms), ensure_ascii=False)
+        if len(payload.encode('utf-8')) > NOTIFY_PAYLOAD_LIMIT:
+            payload = FULL_RELOAD_PAYLOAD
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": GLOSSARY_NOTIFY_CHANNEL, "payload": payload})
+
+
+class GlossaryCache:
+    """进程内术语表快照：全量加载后常驻内存，由 LISTEN/NOTIFY 增量刷新，TTL 兜底"""
+
+    def __init__(self, ttl: float = GLOSSARY_CACHE_TTL, listen: bool = not DB_PGBOUNCER):
+        self.ttl = ttl
+        self.listen = listen
+        # 按 GLOSSARY_LAYOUT 读取宽表或长表
+        self.manager = TranslationKnowledgeManager()
+        # {中文: {标准语言名: 翻译}}
+        self._entries: Dict[str, Dict[str, Optional[str]]] = {}
+        self._loaded_at = 0.0
+        # 快照每次变化时递增，供依赖术语表的派生结构（如匹配自动机）判断是否需要重建
+        self.version = 0
+        self._lock = threading.RLock()
+        # 每次读取数据库前递增的加载序号：读取较早的结果不得覆盖读取较晚的结果
+        self._load_seq = 0
+        # 当前快照所基于的全量加载序号
+        self._full_load_seq = 0
+        # 全量加载之后被增量刷新过的术语：{中文: 刷新序号}
+        self._term_seqs: Dict[str, int] = {}
+        # 串行化全量加载，_lock 只在替换快照时持有，加载期间查询和统计不受阻塞
+        self._reload_lock = threading.Lock()
+        # 术语匹配自动机：快照版本变化后在后台重建，重建完成前继续使用旧的自动机
+        self._matcher: Optional[TermMatcher] = None
+        self._matcher_version = -1
+        self._matcher_lock = threading.Lock()
+        self._matcher_builder: Optional[threading.Thread] = None
+        self._matcher_builder_lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._warming: Optional[threading.Thread] = None
+        self._warming_lock = threading.Lock()
+        self._listening = threading.Event()
+        self._stats: Dict[str, int] = {
+            "lookups": 0,
+            "full_loads": 0,
+            "incremental_refreshes": 0,
+            "notifications": 0,
+            "listener_errors": 0,
+            "matcher_builds": 0,
+        }
+
+    @property
+    def is_loaded(self) -> bool:
+        """是否已完成过全量加载（之后即使过期也可在刷新前继续使用）"""
+        return self._loaded_at > 0
+
+    def warm_in_background(self) -> None:
+        """在后台线程中加载快照，调用方不等待；冷启动时先用离线快照服务请求，过期后继续使用旧快照"""
+        with self._warming_lock:
+            if self._warming is not None and self._warming.is_alive():
+                return
+            self._warming = threading.Thread(target=self._warm, name="glossary-warmup", daemon=True)
+            self._warming.start()
+
+    def _warm(self) -> None:
+        try:
+            self._reload()
+        except Exception as e:
+            logger.warning(f"术语表缓存后台加载失败: {e}")
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at > 0 and time.monotonic() - self._loaded_at < self.ttl
+
+    def ensure_fresh(self) -> None:
+        """快照未加载时同步全量加载；已加载但过期时继续使用旧快照，在后台重新加载"""
+        if self._is_fresh():
+            return
+        if self.is_loaded:
+            self.warm_in_background()
+            return
+        self._reload()
+
+    def _reload(self) -> None:
+        """快照未加载或已过期时全量加载；首次加载前先建立 LISTEN 连接，避免遗漏加载期间的变更"""
+        with self._reload_lock:
+            if self._is_fresh():
+                return
+            if self.listen and self._listener is None:
+                self._listener = threading.Thread(target=self._listen_loop, name="glossary-listener", daemon=True)
+                self._listener.start()
+                self._listening.wait(timeout=LISTEN_RETRY_INTERVAL)
+            self._full_reload()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _next_load_seq(self) -> int:
+        """在读取数据库之前取得加载序号"""
+        with self._lock:
+            self._load_seq += 1
+            return self._load_seq
+
+    def _full_reload(self) -> None:
+        """
+        全量加载快照
+
+        监听线程的增量刷新与请求线程的全量加载可能并发：全量加载开始读取后才提交的变更，
+        其增量刷新可能先于全量加载完成。应用时保留序号更大的增量刷新结果，
+        若期间已有更晚开始的全量加载完成，则丢弃本次结果。
+        """
+        from storage.database.db import get_session
+        seq = self._next_load_seq()
+        db = get_session()
+        try:
+            entries = self.manager.load_entries(db)
+        finally:
+            db.close()
+        with self._lock:
+            if seq < self._full_load_seq:
+                logger.info(f"丢弃过期的术语表全量加载结果（序号 {seq} < {self._full_load_seq}）")
+                return
+            newer_terms = {term: term_seq for term, term_seq in self._term_seqs.items() if term_seq > seq}
+            for term in newer_terms:
+                if term in self._entries:
+                    entries[term] = self._entries[term]
+                else:
+                    entries.pop(term, None)
+            self._entries = entries
+            self._full_load_seq = seq
+            self._term_seqs = newer_terms
+            self._loaded_at = time.monotonic()
+            self.version += 1
+            self._stats["full_loads"] += 1
+        logger.info(f"术语表缓存全量加载完成，术语数: {len(entries)}")
+
+    def _refresh_terms(self, terms: List[str]) -> None:
+        """增量刷新指定术语，跳过已被更晚开始的加载覆盖的术语"""
+        from storage.database.db import get_session
+        seq = self._next_load_seq()
+        fetched: Dict[str, Dict[str, Optional[str]]] = {}
+        db = get_session()
+        try:
+            for i in range(0, len(terms), REFRESH_CHUNK_SIZE):
+                fetched.update(self.manager.load_entries(db, terms[i:i + REFRESH_CHUNK_SIZE]))
+        finally:
+            db.close()
+        with self._lock:
+            if seq < self._full_load_seq:
+                # 更晚开始的全量加载已包含这些变更
+                return
+            entries = dict(self._entries)
+            for term in terms:
+                if self._term_seqs.get(term, 0) > seq:
+                    continue
+                if term in fetched:
+                    entries[term] = fetched[term]
+                else:
+                    entries.pop(term, None)
+                self._term_seqs[term] = seq
+            self._entries = entries
+            self.version += 1
+            self._stats["incremental_refreshes"] += 1
+
+    def _apply_notification(self, payload: str) -> None:
+        self._count("notifications")
+        terms = None
+        if payload != FULL_RELOAD_PAYLOAD:
+            try:
+                terms = [term for term in json.loads(payload) if isinstance(term, str)]
+            except (ValueError, TypeError):
+                logger.warning(f"无法解析术语表变更通知，执行全量刷新: {payload[:200]}")
+        if terms is None:
+            self._full_reload()
+        elif terms:
+            self._refresh_terms(terms)
+
+    def _listen_loop(self) -> None:
+        from storage.database.db import get_db_url
+        reconnect = False
+        while True:
+            conn = None
+            try:
+                conn = connect_direct(get_db_url(), name="glossary_listener", autocommit=True)
+                conn.execute(f"LISTEN {GLOSSARY_NOTIFY_CHANNEL}")
+                self._listening.set()
+                if reconnect:
+                    # 断开期间的通知已丢失，重连后全量刷新
+                    self._full_reload()
+                for notify in conn.notifies():
+                    self._apply_notification(notify.payload)
+            except Exception as e:
+                self._count("listener_errors")
+                logger.warning(f"术语表变更监听中断，{LISTEN_RETRY_INTERVAL}秒后重连（期间依赖TTL刷新）: {e}")
+            finally:
+                self._listening.clear()
+                if conn is not None:
+                    conn.close()
+            reconnect = True
+            time.sleep(LISTEN_RETRY_INTERVAL)
+
+    def get_matcher(self) -> TermMatcher:
+        """
+        获取由全部术语构建的匹配自动机
+
+        只有首次使用时同步构建；术语表变化后在后台重建，重建完成前返回旧的自动机
+
+        Returns:
+            TermMatcher
+        """
+        self.ensure_fresh()
+        matcher = self._matcher
+        if matcher is None:
+            with self._matcher_lock:
+                if self._matcher is None:
+                    self._build_matcher()
+                return self._matcher
+        if self._matcher_version != self.version:
+            self._rebuild_matcher_in_background()
+        return matcher
+
+    def _build_matcher(self) -> None:
+        # 调用方需持有 self._matcher_lock
+        with self._lock:
+            version, entries = self.version, self._entries
+        start = time.monotonic()
+        matcher = TermMatcher(entries.keys())
+        self._matcher, self._matcher_version = matcher, version
+        self._count("matcher_builds")
+        logger.info(f"术语匹配自动机构建完成，术语数: {len(matcher)}，耗时: {time.monotonic() - start:.2f}s")
+
+    def _rebuild_matcher_in_background(self) -> None:
+        with self._matcher_builder_lock:
+            if self._matcher_builder is not None and self._matcher_builder.is_alive():
+                return
+            self._matcher_builder = threading.Thread(target=self._rebuild_matcher, name="glossary-matcher", daemon=True)
+            self._matcher_builder.start()
+
+    def _rebuild_matcher(self) -> None:
+        try:
+            # 重建期间快照再次变化时继续重建，直到与最新版本一致
+            while self._matcher_version != self.version:
+                with self._matcher_lock:
+                    self._build_matcher()
+        except Exception as e:
+            logger.warning(f"术语匹配自动机后台重建失败: {e}")
+
+    def lookup(self, chinese_terms: Iterable[str], target_languages: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        从快照中查询术语翻译，快照新鲜时不访问数据库
+
+        Args:
+            chinese_terms: 中文术语
+            target_languages: 目标语言列表（如["英文", "日文"]）
+
+        Returns:
+            字典：{中文术语: {目标语言: 翻译结果}}，只包含非空的翻译
+        """
+        self.ensure_fresh()
+        self._count("lookups")
+        language_columns = {lang: self.manager.get_language_key(lang) for lang in target_languages}
+        entries = self._entries
+        translations: Dict[str, Dict[str, str]] = {}
+        for term in chinese_terms:
+            entry = entries.get(term)
+            if entry is None:
+                continue
+            lang_translations = {
+                lang: entry[column_name]
+                for lang, column_name in language_columns.items()
+                if column_name and entry.get(column_name)
+            }
+            if lang_translations:
+                translations[term] = lang_translations
+        return translations
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取加载/刷新/通知计数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["terms"] = len(self._entries)
+            stats["version"] = self.version
+            stats["listening"] = self._listening.is_set()
+            stats["age_seconds"] = round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+        return stats
+
+
+_glossary_cache: Optional[GlossaryCache] = None
+_glossary_cache_lock = threading.Lock()
+
+
+def get_glossary_cache() -> GlossaryCache:
+    """获取进程级术语表缓存单例"""
+    global _glossary_cache
+    if _glossary_cache is None:
+        with _glossary_cache_lock:
+            if _glossary_cache is None:
+                _glossary_cache = GlossaryCache()
+    return _glossary_cache
@@ -0,0 +1,264 @@
+import os
+import csv
+import io
+import time
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from storage.database.translation_manager import GLOSSARY_LAYOUT, TranslationKnowledgeManager
+from storage.database.glossary_cache import notify_glossary_changed
+
+logger = logging.getLogger(__name__)
+
+# 导入时使用的临时中转表，事务结束时自动删除；列按文件表头顺序命名为 c0、c1...，c0 为中文
+STAGING_TABLE = "术语导入"
+# 中转表中记录行顺序的列，同一术语出现多次时以最后一次为准
+STAGING_SEQ_COLUMN = "_导入序号"
+# psycopg2 COPY 时每次读取的字节数
+COPY_BUFFER_SIZE = 1 << 16
+
+
+def _resolve_columns(
+    header: Sequence[Any],
+    manager: TranslationKnowledgeManager,
+    ignore_columns: Optional[Iterable[str]] = None
+) -> List[Tuple[int, str]]:
+    """
+    将表头映射到标准语言名：中文列必须存在，语言列支持列名（英语）或语言别名（英文、English、en）
+
+    宽表只接受已有的语言列；长表接受任意语言，未登记别名的表头按原名作为语言。
+
+    Returns:
+        [(表头下标, 中文或标准语言名), ...]，第一个元素为中文列
+    """
+    ignored = set(ignore_columns or ())
+    term_index = None
+    mapping: List[Tuple[int, str]] = []
+    seen = set()
+    for i, name in enumerate(header):
+        name = str(name).strip() if name is not None else ""
+        if name == "中文":
+            term_index = i
+            continue
+        if not name or name in ignored:
+            continue
+        key = manager.get_language_key(name)
+        if key and key not in seen:
+            seen.add(key)
+            mapping.append((i, key))
+        else:
+            logger.warning(f"术语导入: 忽略未知列 {name}")
+    if term_index is None:
+        raise ValueError('术语文件缺少"中文"列')
+    return [(term_index, "中文")] + mapping
+
+
+def _iter_file_rows(path: str, encoding: str = "utf-8-sig", sheet: Optional[str] = None) -> Iterator[Sequence[Any]]:
+    """逐行读取 CSV/XLSX 文件（含表头），不把整个文件载入内存"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.active
+            for row in worksheet.iter_rows(values_only=True):
+                yield row
+        finally:
+            workbook.close()
+    elif ext == ".csv":
+        with open(path, "r", encoding=encoding, newline="") as fd:
+            yield from csv.reader(fd)
+    else:
+        raise ValueError(f"不支持的术语文件格式: {ext}，仅支持 .csv/.xlsx")
+
+
+def _normalize_rows(
+    rows: Iterator[Sequence[Any]],
+    columns: List[Tuple[int, str]],
+    stats: Dict[str, int]
+) -> Iterator[List[Optional[str]]]:
+    """按列映射取值并去除首尾空白，空单元格视为NULL，中文为空的行跳过"""
+    for row in rows:
+        stats["rows_read"] += 1
+        values: List[Optional[str]] = []
+        for index, _ in columns:
+            value = row[index] if index < len(row) else None
+            value = str(value).strip() if value is not None else ""
+            values.append(value or None)
+        if values[0] is None:
+            stats["rows_skipped"] += 1
+            continue
+        yield values
+
+
+class _CsvStream(io.RawIOBase):
+    """把行迭代器按需编码为CSV字节流，供 psycopg2 的 copy_expert 读取"""
+
+    def __init__(self, rows: Iterable[List[Optional[str]]]):
+        self._rows = iter(rows)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = io.StringIO()
+            # NULL 以未加引号的空字段表示，空字符串不会出现（已在 _normalize_rows 中转为NULL）
+            csv.writer(line, quoting=csv.QUOTE_MINIMAL, lineterminator="\n").writerow(
+                ["" if value is None else value for value in row]
+            )
+            self._buffer += line.getvalue().encode("utf-8")
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _copy_rows(db: Session, column_names: List[str], rows: Iterable[List[Optional[str]]]) -> None:
+    """通过当前事务的底层连接执行 COPY ... FROM STDIN，兼容 psycopg 3 与 psycopg2"""
+    quoted = ", ".join(f'"{name}"' for name in column_names)
+    driver_connection = db.connection().connection.driver_connection
+    cursor = driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(f'COPY "{STAGING_TABLE}" ({quoted}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            cursor.copy_expert(
+                f'COPY "{STAGING_TABLE}" ({quoted}) FROM STDIN WITH (FORMAT csv)',
+                _CsvStream(rows),
+                size=COPY_BUFFER_SIZE
+            )
+    finally:
+        cursor.close()
+
+
+def _merge_wide(db: Session, keys: List[str]):
+    """中转表合并到"翻译知识库"：文件中为空的翻译不覆盖已有翻译"""
+    quoted = ", ".join(f'"{key}"' for key in keys)
+    staged = ", ".join(f'"c{i}"' for i in range(len(keys)))
+    language_columns = keys[1:]
+    if language_columns:
+        updates = ", ".join(
+            f'"{name}" = COALESCE(EXCLUDED."{name}", "翻译知识库"."{name}")' for name in language_columns
+        )
+        conflict = f"DO UPDATE SET {updates}"
+    else:
+        conflict = "DO NOTHING"
+    # 同一术语在文件中出现多次时只保留最后一次，避免 ON CONFLICT 在同一语句中更新同一行两次
+    return db.execute(text(
+        f'INSERT INTO "翻译知识库" ({quoted}) '
+        f'SELECT DISTINCT ON ("c0") {staged} FROM "{STAGING_TABLE}" '
+        f'ORDER BY "c0", "{STAGING_SEQ_COLUMN}" DESC '
+        f'ON CONFLICT ("中文") {conflict}'
+    ))
+
+
+def _merge_long(db: Session, keys: List[str]):
+    """中转表逐列展开为 (中文, 语言, 译文) 后合并到"术语翻译"：空翻译不写入，也不覆盖已有翻译"""
+    language_keys = keys[1:]
+    if not language_keys:
+        return None
+    values = ", ".join(f'(:lang{i}, s."c{i}")' for i in range(1, len(keys)))
+    params = {f"lang{i}": key for i, key in enumerate(keys) if i > 0}
+    # 同一 (中文, 语言) 在文件中出现多次时取最后一个非空翻译
+    return db.execute(text(
+        f'INSERT INTO "术语翻译" ("中文", "语言", "译文") '
+        f'SELECT DISTINCT ON (s."c0", v."语言") s."c0", v."语言", v."译文" FROM "{STAGING_TABLE}" s '
+        f'CROSS JOIN LATERAL (VALUES {values}) AS v("语言", "译文") '
+        f'WHERE v."译文" IS NOT NULL '
+        f'ORDER BY s."c0", v."语言", s."{STAGING_SEQ_COLUMN}" DESC '
+        f'ON CONFLICT ("中文", "语言") DO UPDATE SET "译文" = EXCLUDED."译文"'
+    ), params)
+
+
+def import_glossary_rows(
+    db: Session,
+    rows: Iterable[Sequence[Any]],
+    layout: str = GLOSSARY_LAYOUT,
+    ignore_columns: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    批量导入术语：COPY 到临时中转表后，一条 INSERT ... ON CONFLICT DO UPDATE 合并到术语表
+
+    在调用方的事务中执行并提交；导入文件中为空的翻译不会覆盖库中已有的翻译。
+
+    Args:
+        db: 数据库会话
+        rows: 行迭代器，第一行为表头（需包含"中文"列，语言列可用列名或语言别名）
+        layout: 术语表存储格式，wide 写入"翻译知识库"，long 写入"术语翻译"
+        ignore_columns: 不导入的表头名称（如备注列）
+
+    Returns:
+        导入统计：rows_read、rows_skipped、rows_upserted、seconds、rows_per_second；
+        长表的 rows_upserted 为写入/更新的 (中文, 语言) 行数
+    """
+    start = time.perf_counter()
+    stats: Dict[str, Any] = {"rows_read": 0, "rows_skipped": 0, "rows_upserted": 0}
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("术语文件为空")
+    manager = TranslationKnowledgeManager(layout)
+    columns = _resolve_columns(header, manager, ignore_columns)
+    keys = [key for _, key in columns]
+    staged_columns = [f"c{i}" for i in range(len(keys))]
+
+    try:
+        column_defs = ", ".join(f'"{name}" VARCHAR' for name in staged_columns)
+        db.execute(text(
+            f'CREATE TEMP TABLE "{STAGING_TABLE}" '
+            f'({column_defs}, "{STAGING_SEQ_COLUMN}" BIGSERIAL) ON COMMIT DROP'
+        ))
+        _copy_rows(db, staged_columns, _normalize_rows(rows, columns, stats))
+
+        result = _merge_long(db, keys) if manager.layout == "long" else _merge_wide(db, keys)
+        stats["rows_upserted"] = result.rowcount if result is not None else 0
+        notify_glossary_changed(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_second"] = round(stats["rows_read"] / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(f"术语导入完成: {stats}")
+    return stats
+
+
+def import_glossary_file(
+    db: Session,
+    path: str,
+    encoding: str = "utf-8-sig",
+    sheet: Optional[str] = None,
+    layout: str = GLOSSARY_LAYOUT,
+    ignore_columns: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    从 CSV/XLSX 文件批量导入术语，文件逐行流式读取
+
+    Args:
+        db: 数据库会话
+        path: 文件路径（.csv/.xlsx）
+        encoding: CSV文件编码
+        sheet: XLSX工作表名称，默认使用活动工作表
+        layout: 术语表存储格式，见 import_glossary_rows
+        ignore_columns: 不导入的表头名称
+
+    Returns:
+        导入统计，见 import_glossary_rows
+    """
+    return import_glossary_rows(
+        db,
+        _iter_file_rows(path, encoding=encoding, sheet=sheet),
+        layout=layout,
+        ignore_columns=ignore_columns
+    )
@@ -0,0 +1,54 @@
+import time
+import logging
+from typing import Any, Dict
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from storage.database.shared.model import 术语翻译
+from storage.database.glossary_cache import notify_glossary_changed
+
+logger = logging.getLogger(__name__)
+
+
+def migrate_wide_to_long(db: Session) -> Dict[str, Any]:
+    """
+    把宽表"翻译知识库"的每个语言列展开写入长表"术语翻译"
+
+    可重复执行：已存在的 (中文, 语言) 以宽表中的翻译为准，空翻译不写入；宽表保持不变，
+    切换 GLOSSARY_LAYOUT=long 前执行一次即可。在调用方的事务中执行并提交。
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        迁移统计：{"languages": {语言: 写入/更新行数}, "rows_upserted": 总行数, "seconds": 耗时}
+    """
+    start = time.perf_counter()
+    # 长表的近似匹配索引依赖 pg_trgm 扩展
+    db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    术语翻译.__table__.create(bind=db.connection(), checkfirst=True)
+    # 按数据库实际的列迁移，包括模型中未声明、通过DDL新增的语言列
+    columns = [
+        col['name'] for col in inspect(db.connection()).get_columns('翻译知识库')
+        if col['name'] != '中文'
+    ]
+
+    stats: Dict[str, Any] = {"languages": {}, "rows_upserted": 0}
+    try:
+        for column in columns:
+            result = db.execute(text(
+                f'INSERT INTO "术语翻译" ("中文", "语言", "译文") '
+                f'SELECT "中文", :lang, "{column}" FROM "翻译知识库" '
+                f'WHERE "{column}" IS NOT NULL AND "{column}" <> \'\' '
+                f'ON CONFLICT ("中文", "语言") DO UPDATE SET "译文" = EXCLUDED."译文"'
+            ), {"lang": column})
+            stats["languages"][column] = result.rowcount
+            stats["rows_upserted"] += result.rowcount
+        notify_glossary_changed(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"术语表迁移完成: {stats}")
+    return stats
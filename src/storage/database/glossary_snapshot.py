@@ -0,0 +1,274 @@
+"""
+术语表离线快照：把术语表导出为只读的有序字符串表文件，工作进程通过 mmap 直接查询
+
+数据库不可用或实例冷启动时，术语查询改用快照，不访问数据库。快照打开时只读取文件头，
+启动耗时与术语数量无关；文件页由操作系统页缓存按需加载，同一台机器上的多个进程共享。
+
+文件格式（整数均为小端）：
+    文件头      魔数 b"GLSNAP01"，之后为 术语数 u32、语言数 u32、最长术语字符数 u32、
+                语言表长度 u32，以及各段起始位置 u64 × 4（术语偏移、翻译偏移、术语数据、翻译数据）
+    语言表      UTF-8 JSON 数组，语言下标即数组下标
+    术语偏移    (术语数 + 1) × u64，术语数据中第 i 个术语的起止位置
+    翻译偏移    (术语数 + 1) × u64，翻译数据中第 i 个术语的翻译记录起止位置
+    术语数据    按 UTF-8 字节序排序的术语，依次拼接
+    翻译数据    每个术语一条记录：翻译数 u16，之后为 (语言下标 u16, 长度 u32, UTF-8 译文) × 翻译数
+"""
+import os
+import json
+import mmap
+import time
+import struct
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from storage.database.translation_manager import TranslationKnowledgeManager
+
+logger = logging.getLogger(__name__)
+
+# 快照文件路径（相对 COZE_WORKSPACE_PATH），文件不存在时不启用离线查询
+GLOSSARY_SNAPSHOT_PATH = os.getenv("GLOSSARY_SNAPSHOT_PATH", "assets/glossary.snapshot")
+
+SNAPSHOT_MAGIC = b"GLSNAP01"
+_HEADER = struct.Struct("<8sIIII4Q")
+_OFFSET = struct.Struct("<Q")
+_COUNT = struct.Struct("<H")
+_VALUE = struct.Struct("<HI")
+
+
+def resolve_snapshot_path(path: Optional[str] = None) -> str:
+    """快照路径为相对路径时相对 COZE_WORKSPACE_PATH 解析"""
+    return os.path.join(os.getenv("COZE_WORKSPACE_PATH", ""), path or GLOSSARY_SNAPSHOT_PATH)
+
+
+def write_glossary_snapshot(path: str, entries: Mapping[str, Mapping[str, Optional[str]]]) -> Dict[str, Any]:
+    """
+    把术语表写入快照文件：先写临时文件再原子替换，正在读取旧文件的进程不受影响
+
+    Args:
+        path: 快照文件路径
+        entries: {中文术语: {标准语言名: 翻译}}，空翻译不写入
+
+    Returns:
+        写入统计：terms、languages、bytes
+    """
+    languages: List[str] = sorted({lang for values in entries.values() for lang, tr in values.items() if tr})
+    language_index = {lang: i for i, lang in enumerate(languages)}
+    terms = sorted((term.encode("utf-8"), term) for term in entries if term)
+
+    term_offsets = bytearray()
+    value_offsets = bytearray()
+    term_data = bytearray()
+    value_data = bytearray()
+    max_term_chars = 0
+    for encoded, term in terms:
+        term_offsets += _OFFSET.pack(len(term_data))
+        value_offsets += _OFFSET.pack(len(value_data))
+        term_data += encoded
+        max_term_chars = max(max_term_chars, len(term))
+        values = [(language_index[lang], tr.encode("utf-8")) for lang, tr in entries[term].items() if tr]
+        value_data += _COUNT.pack(len(values))
+        for index, encoded_value in values:
+            value_data += _VALUE.pack(index, len(encoded_value)) + encoded_value
+    term_offsets += _OFFSET.pack(len(term_data))
+    value_offsets += _OFFSET.pack(len(value_data))
+
+    language_table = json.dumps(languages, ensure_ascii=False).encode("utf-8")
+    term_offsets_start = _HEADER.size + len(language_table)
+    value_offsets_start = term_offsets_start + len(term_offsets)
+    term_data_start = value_offsets_start + len(value_offsets)
+    value_data_start = term_data_start + len(term_data)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, len(terms), len(languages), max_term_chars, len(language_table),
+        term_offsets_start, value_offsets_start, term_data_start, value_data_start
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as fd:
+        for part in (header, language_table, term_offsets, value_offsets, term_data, value_data):
+            fd.write(part)
+    os.replace(tmp_path, path)
+    return {"terms": len(terms), "languages": len(languages), "bytes": value_data_start + len(value_data)}
+
+
+def export_glossary_snapshot(db: Session, path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    从数据库导出术语表快照（按 GLOSSARY_LAYOUT 读取宽表或长表）
+
+    Args:
+        db: 数据库会话
+        path: 快照文件路径，默认为 GLOSSARY_SNAPSHOT_PATH
+
+    Returns:
+        写入统计，见 write_glossary_snapshot，另含 path、seconds
+    """
+    start = time.perf_counter()
+    path = resolve_snapshot_path(path)
+    stats = write_glossary_snapshot(path, TranslationKnowledgeManager().load_entries(db))
+    stats["path"] = path
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    logger.info(f"术语表快照导出完成: {stats}")
+    return stats
+
+
+class GlossarySnapshot:
+    """mmap 打开的只读术语表快照，查询为有序表上的二分查找"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fd:
+            stat = os.fstat(fd.fileno())
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self._count, language_count, self.max_term_chars, language_table_size,
+         self._term_offsets, self._value_offsets, self._term_data, self._value_data) = _HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self._mm.close()
+            raise ValueError(f"不是术语表快照文件: {path}")
+        self.languages: List[str] = json.loads(self._mm[_HEADER.size:_HEADER.size + language_table_size].decode("utf-8"))
+        self._language_index = {lang: i for i, lang in enumerate(self.languages)}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _term_bytes(self, i: int) -> bytes:
+        start, = _OFFSET.unpack_from(self._mm, self._term_offsets + i * 8)
+        end, = _OFFSET.unpack_from(self._mm, self._term_offsets + i * 8 + 8)
+        return self._mm[self._term_data + start:self._term_data + end]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, term: str) -> int:
+        key = term.encode("utf-8")
+        i = self._lower_bound(key)
+        return i if i < self._count and self._term_bytes(i) == key else -1
+
+    def _values(self, i: int) -> Dict[int, str]:
+        position, = _OFFSET.unpack_from(self._mm, self._value_offsets + i * 8)
+        position += self._value_data
+        count, = _COUNT.unpack_from(self._mm, position)
+        position += _COUNT.size
+        values: Dict[int, str] = {}
+        for _ in range(count):
+            index, length = _VALUE.unpack_from(self._mm, position)
+            position += _VALUE.size
+            values[index] = self._mm[position:position + length].decode("utf-8")
+            position += length
+        return values
+
+    def __contains__(self, term: str) -> bool:
+        return self._find(term) >= 0
+
+    def find_longest_terms(self, texts: Iterable[str]) -> Set[str]:
+        """
+        查找多段文本中的术语，重叠时取最左最长匹配，与 TermMatcher.find_longest_terms 结果一致
+
+        每个位置按长度递增探测前缀，有序表中没有以该前缀开头的术语时立即停止，无需构建自动机。
+
+        Args:
+            texts: 文本列表，非字符串元素会被忽略
+
+        Returns:
+            命中的术语集合
+        """
+        found: Set[str] = set()
+        if not self._count:
+            return found
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            i = 0
+            while i < len(text):
+                longest = 0
+                for length in range(1, min(self.max_term_chars, len(text) - i) + 1):
+                    prefix = text[i:i + length].encode("utf-8")
+                    j = self._lower_bound(prefix)
+                    if j >= self._count:
+                        break
+                    candidate = self._term_bytes(j)
+                    if candidate == prefix:
+                        longest = length
+                    elif not candidate.startswith(prefix):
+                        break
+                if longest:
+                    found.add(text[i:i + longest])
+                    i += longest
+                else:
+                    i += 1
+        return found
+
+    def lookup(self, chinese_terms: Iterable[str], target_languages: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        查询术语翻译，不访问数据库
+
+        Args:
+            chinese_terms: 中文术语
+            target_languages: 目标语言列表（如["英文", "日文"]）
+
+        Returns:
+            字典：{中文术语: {目标语言: 翻译结果}}，只包含非空的翻译
+        """
+        language_indexes: List[Tuple[str, int]] = []
+        for lang in target_languages:
+            key = TranslationKnowledgeManager.LANGUAGE_COLUMN_MAPPING.get(lang, lang)
+            if key in self._language_index:
+                language_indexes.append((lang, self._language_index[key]))
+        translations: Dict[str, Dict[str, str]] = {}
+        if not language_indexes:
+            return translations
+        for term in chinese_terms:
+            i = self._find(term)
+            if i < 0:
+                continue
+            values = self._values(i)
+            lang_translations = {lang: values[index] for lang, index in language_indexes if index in values}
+            if lang_translations:
+                translations[term] = lang_translations
+        return translations
+
+
+_glossary_snapshot: Optional[GlossarySnapshot] = None
+_glossary_snapshot_lock = threading.Lock()
+
+
+def get_glossary_snapshot() -> Optional[GlossarySnapshot]:
+    """
+    获取进程级术语表快照，快照文件被重新导出后自动重新映射
+
+    Returns:
+        GlossarySnapshot；快照文件不存在或无法读取时返回None
+    """
+    global _glossary_snapshot
+    path = resolve_snapshot_path()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    snapshot = _glossary_snapshot
+    if snapshot is not None and snapshot.path == path and snapshot.signature == signature:
+        return snapshot
+    with _glossary_snapshot_lock:
+        snapshot = _glossary_snapshot
+        if snapshot is not None and snapshot.path == path and snapshot.signature == signature:
+            return snapshot
+        try:
+            # 旧快照不主动关闭：可能仍有线程在读，交给垃圾回收释放映射
+            _glossary_snapshot = GlossarySnapshot(path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"术语表快照无法读取，忽略: {path}: {e}")
+            return None
+        logger.info(f"术语表快照已映射: {path}，术语数: {len(_glossary_snapshot)}")
+        return _glossary_snapshot
@@ -0,0 +1,321 @@
+"""
+数据库连接池统一配置与指标
+
+ORM 同步/异步引擎、LangGraph checkpointer 的 psycopg 连接池以及 LISTEN、建表等直连，
+都通过本模块按同一套环境变量创建，并记录借出、排队、等待耗时和建连耗时。
+单个进程最多占用的连接数为各连接池上限之和（见 get_pool_stats 的 max_connections），
+多个 uvicorn worker 时乘以 worker 数，应小于 Postgres 的 max_connections。
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# 同步 ORM 引擎连接池
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# 异步 ORM 引擎连接池：协程等待查询时不占用线程，少量连接即可支撑大量并发请求
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "10"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+# checkpointer 的 psycopg 连接池上限及借出连接的最长等待时间（秒）
+DB_CHECKPOINT_POOL_SIZE = int(os.getenv("DB_CHECKPOINT_POOL_SIZE", "5"))
+DB_CHECKPOINT_POOL_TIMEOUT = float(os.getenv("DB_CHECKPOINT_POOL_TIMEOUT", "15"))
+# 借出连接的最长等待时间、连接回收周期、建连超时（秒）
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "15"))
+# PgBouncer（事务池模式）兼容：关闭 psycopg 3 的服务端预备语句，并停用依赖会话的 LISTEN
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+
+class PoolMetrics:
+    """单个连接池的运行指标，线程安全"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connects = 0
+        self.connect_errors = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+
+    def begin_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def on_checkout(self) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def on_checkin(self) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_connect(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            if not ok:
+                self.connect_errors += 1
+                return
+            self.connects += 1
+            self.connect_seconds_total += seconds
+            self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.checkouts, 2) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+                "connects": self.connects,
+                "connect_errors": self.connect_errors,
+                "connect_ms_avg": round(self.connect_seconds_total * 1000 / self.connects, 2) if self.connects else 0.0,
+                "connect_ms_max": round(self.connect_seconds_max * 1000, 2),
+            }
+
+
+_metrics: Dict[str, PoolMetrics] = {}
+# {名称: 连接上限}，用于汇总单进程最多占用的连接数
+_limits: Dict[str, int] = {}
+# psycopg_pool 连接池自带统计，查询指标时直接读取
+_psycopg_pools: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    """获取（不存在时创建）指定名称的连接池指标"""
+    with _registry_lock:
+        metrics = _metrics.get(name)
+        if metrics is None:
+            metrics = _metrics[name] = PoolMetrics(name)
+        return metrics
+
+
+class _MeasuredPoolMixin:
+    """记录借出连接时的排队数与等待耗时（包括池中无空闲连接时新建连接的耗时）"""
+
+    _pool_metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        metrics = self._pool_metrics
+        if metrics is None:
+            return super()._do_get()
+        metrics.begin_wait()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.end_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() 会按原参数重建连接池，指标需要带到新连接池上
+        pool = super().recreate()
+        pool._pool_metrics = self._pool_metrics
+        return pool
+
+
+class MeasuredQueuePool(_MeasuredPoolMixin, QueuePool):
+    pass
+
+
+class MeasuredAsyncQueuePool(_MeasuredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _uses_psycopg3(url: str) -> bool:
+    return make_url(url).get_driver_name() in ("psycopg", "psycopg_async")
+
+
+def engine_options(url: str, async_engine: bool = False) -> Dict[str, Any]:
+    """
+    生成 create_engine/create_async_engine 的连接池参数
+
+    Args:
+        url: SQLAlchemy 连接串（决定驱动相关的连接参数）
+        async_engine: 是否为异步引擎
+
+    Returns:
+        关键字参数字典
+    """
+    connect_args: Dict[str, Any] = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if DB_PGBOUNCER and _uses_psycopg3(url):
+        # PgBouncer 事务池模式下同一会话的语句可能落到不同服务端连接，预备语句会失效
+        connect_args["prepare_threshold"] = None
+    return {
+        "poolclass": MeasuredAsyncQueuePool if async_engine else MeasuredQueuePool,
+        "pool_size": DB_ASYNC_POOL_SIZE if async_engine else DB_POOL_SIZE,
+        "max_overflow": DB_ASYNC_MAX_OVERFLOW if async_engine else DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "connect_args": connect_args,
+    }
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolMetrics:
+    """
+    为 SQLAlchemy 引擎挂载连接池指标（异步引擎传入 engine.sync_engine）
+
+    Args:
+        engine: 使用 engine_options 创建的引擎
+        name: 指标名称
+
+    Returns:
+        PoolMetrics
+    """
+    metrics = get_pool_metrics(name)
+    pool = engine.pool
+    if isinstance(pool, _MeasuredPoolMixin):
+        pool._pool_metrics = metrics
+    with _registry_lock:
+        _limits[name] = pool.size() + max(0, pool._max_overflow) if isinstance(pool, QueuePool) else 0
+
+    @event.listens_for(engine, "do_connect")
+    def _timed_connect(dialect, conn_rec, cargs, cparams):
+        start = time.perf_counter()
+        try:
+            connection = dialect.connect(*cargs, **cparams)
+        except Exception:
+            metrics.record_connect(time.perf_counter() - start, ok=False)
+            raise
+        metrics.record_connect(time.perf_counter() - start)
+        return connection
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.on_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.on_checkin()
+
+    return metrics
+
+
+def libpq_conninfo(url: str) -> str:
+    """把 SQLAlchemy 连接串（可能带 +psycopg2 等驱动后缀）转换为 libpq/psycopg 可用的连接串"""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _psycopg_kwargs() -> Dict[str, Any]:
+    return {"prepare_threshold": None} if DB_PGBOUNCER else {}
+
+
+def connect_direct(url: str, name: str = "direct", **kwargs):
+    """
+    建立一条不经过连接池的 psycopg 连接（建表、LISTEN 等），记录建连耗时
+
+    Args:
+        url: 数据库连接串
+        name: 指标名称
+        **kwargs: 透传给 psycopg.connect（如 autocommit=True）
+
+    Returns:
+        psycopg.Connection
+    """
+    import psycopg
+    metrics = get_pool_metrics(name)
+    kwargs.setdefault("connect_timeout", DB_CONNECT_TIMEOUT)
+    start = time.perf_counter()
+    try:
+        conn = psycopg.connect(libpq_conninfo(url), **_psycopg_kwargs(), **kwargs)
+    except Exception:
+        metrics.record_connect(time.perf_counter() - start, ok=False)
+        raise
+    metrics.record_connect(time.perf_counter() - start)
+    return conn
+
+
+def create_psycopg_pool(
+    conninfo: str,
+    name: str,
+    max_size: int = DB_CHECKPOINT_POOL_SIZE,
+    timeout: float = DB_CHECKPOINT_POOL_TIMEOUT,
+    **kwargs
+):
+    """
+    创建 psycopg_pool.AsyncConnectionPool，统一超时与 PgBouncer 配置并登记到指标中
+
+    Args:
+        conninfo: 连接串
+        name: 指标名称
+        max_size: 连接上限
+        timeout: 借出连接的最长等待时间（秒）
+        **kwargs: 透传给 AsyncConnectionPool（如 max_idle）
+
+    Returns:
+        AsyncConnectionPool
+    """
+    from psycopg_pool import AsyncConnectionPool
+    connection_kwargs = dict(kwargs.pop("kwargs", None) or {})
+    connection_kwargs.update(_psycopg_kwargs())
+    pool = AsyncConnectionPool(
+        conninfo=libpq_conninfo(conninfo),
+        min_size=min(1, max_size),
+        max_size=max_size,
+        timeout=timeout,
+        kwargs=connection_kwargs or None,
+        **kwargs,
+    )
+    with _registry_lock:
+        _psycopg_pools[name] = pool
+        _limits[name] = max_size
+    return pool
+
+
+def _psycopg_pool_snapshot(pool) -> Dict[str, Any]:
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    connects = stats.get("connections_num", 0)
+    return {
+        "checked_out": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+        "waiting": stats.get("requests_waiting", 0),
+        "checkouts": requests,
+        "wait_ms_avg": round(stats.get("requests_wait_ms", 0) / requests, 2) if requests else 0.0,
+        "connects": connects,
+        "connect_errors": stats.get("connections_errors", 0),
+        "connect_ms_avg": round(stats.get("connections_ms", 0) / connects, 2) if connects else 0.0,
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    获取所有连接池的指标
+
+    Returns:
+        {"pgbouncer": 是否兼容模式, "max_connections": 单进程连接上限之和, "pools": {名称: 指标}}
+    """
+    with _registry_lock:
+        metrics = dict(_metrics)
+        psycopg_pools = dict(_psycopg_pools)
+        limits = dict(_limits)
+    pools = {name: item.snapshot() for name, item in metrics.items()}
+    for name, pool in psycopg_pools.items():
+        try:
+            pools[name] = _psycopg_pool_snapshot(pool)
+        except Exception as e:
+            pools[name] = {"error": str(e)}
+    return {
+        "pgbouncer": DB_PGBOUNCER,
+        "max_connections": sum(limits.values()),
+        "pools": pools,
+    }
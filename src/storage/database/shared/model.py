@@ -1,7 +1,8 @@
 from coze_coding_dev_sdk.database import Base
 
-from sqlalchemy import PrimaryKeyConstraint, String, Text
+from sqlalchemy import DateTime, Index, PrimaryKeyConstraint, String, Text, func
 from typing import Optional
+from datetime import datetime
 
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -9,9 +10,42 @@ class 翻译知识库(Base):
     __tablename__ = '翻译知识库'
     __table_args__ = (
         PrimaryKeyConstraint('中文', name='翻译知识库_pkey'),
+        # 三元组 GIN 索引（需要 pg_trgm 扩展）：术语近似匹配走索引
+        Index('翻译知识库_中文_trgm_idx', '中文', postgresql_using='gin', postgresql_ops={'中文': 'gin_trgm_ops'}),
     )
 
     中文: Mapped[str] = mapped_column(String, primary_key=True)
     英语: Mapped[Optional[str]] = mapped_column(String)
     日语: Mapped[Optional[str]] = mapped_column(String)
     韩语: Mapped[Optional[str]] = mapped_column(String)
+
+
+class 术语翻译(Base):
+    """长表格式的术语表：每个 (中文, 语言) 一行，新增语言无需修改表结构"""
+    __tablename__ = '术语翻译'
+    __table_args__ = (
+        # 主键与二级索引均包含译文：按术语或按语言查询都只需扫描索引
+        PrimaryKeyConstraint('中文', '语言', name='术语翻译_pkey', postgresql_include=['译文']),
+        Index('术语翻译_语言_中文_idx', '语言', '中文', postgresql_include=['译文']),
+        Index('术语翻译_中文_trgm_idx', '中文', postgresql_using='gin', postgresql_ops={'中文': 'gin_trgm_ops'}),
+    )
+
+    中文: Mapped[str] = mapped_column(String, primary_key=True)
+    语言: Mapped[str] = mapped_column(String, primary_key=True)
+    译文: Mapped[str] = mapped_column(String)
+
+
+class 翻译记忆(Base):
+    __tablename__ = '翻译记忆'
+    __table_args__ = (
+        PrimaryKeyConstraint('缓存键', name='翻译记忆_pkey'),
+        Index('翻译记忆_目标语言_idx', '目标语言'),
+    )
+
+    缓存键: Mapped[str] = mapped_column(String(64), primary_key=True)
+    原文: Mapped[str] = mapped_column(Text)
+    目标语言: Mapped[str] = mapped_column(String)
+    模型: Mapped[str] = mapped_column(String)
+    配置哈希: Mapped[str] = mapped_column(String(16))
+    译文: Mapped[str] = mapped_column(Text)
+    更新时间: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,145 @@
+"""
+术语表缓存并发刷新单元测试：读取较早的加载结果不得覆盖读取较晚的结果，过期重载与自动机重建不阻塞查询
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import storage.database.db as db_module
+import storage.database.glossary_cache as glossary_cache_module
+from storage.database.glossary_cache import GlossaryCache
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+class FakeManager:
+    """以字典代替数据库；during_full_load 在全量加载读取之后、应用之前执行，模拟并发的刷新"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.during_full_load = []
+
+    def load_entries(self, db, chinese_terms=None, language_keys=None):
+        if chinese_terms is not None:
+            return {term: dict(self.rows[term]) for term in chinese_terms if term in self.rows}
+        snapshot = {term: dict(entry) for term, entry in self.rows.items()}
+        while self.during_full_load:
+            self.during_full_load.pop(0)()
+        return snapshot
+
+    def get_language_key(self, lang):
+        return {"英文": "英语"}.get(lang)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(db_module, "get_session", FakeSession)
+    cache = GlossaryCache(listen=False)
+    cache.manager = FakeManager({"天使": {"英语": "angel"}, "扣子": {"英语": "button"}})
+    cache._full_reload()
+    return cache
+
+
+def english(cache, term):
+    return cache.lookup([term], ["英文"]).get(term, {}).get("英文")
+
+
+def test_refresh_during_full_reload_is_kept(cache):
+    rows = cache.manager.rows
+
+    def concurrent_update():
+        rows["天使"] = {"英语": "angel v2"}
+        del rows["扣子"]
+        rows["钢"] = {"英语": "steel"}
+        cache._refresh_terms(["天使", "扣子", "钢"])
+
+    cache.manager.during_full_load.append(concurrent_update)
+    cache._full_reload()
+    assert english(cache, "天使") == "angel v2"
+    assert english(cache, "扣子") is None
+    assert english(cache, "钢") == "steel"
+
+
+def test_stale_full_reload_is_discarded(cache):
+    rows = cache.manager.rows
+
+    def newer_full_reload():
+        rows["天使"] = {"英语": "angel v2"}
+        cache._full_reload()
+
+    cache.manager.during_full_load.append(newer_full_reload)
+    full_loads = cache.get_stats()["full_loads"]
+    cache._full_reload()
+    assert english(cache, "天使") == "angel v2"
+    assert cache.get_stats()["full_loads"] == full_loads + 1
+
+
+def test_refresh_older_than_full_reload_is_discarded(cache):
+    rows = cache.manager.rows
+    seq = cache._next_load_seq()
+    rows["天使"] = {"英语": "angel v2"}
+    cache._full_reload()
+    # 序号更小的刷新读取的是旧值
+    cache._next_load_seq = lambda: seq
+    rows["天使"] = {"英语": "angel"}
+    cache._refresh_terms(["天使"])
+    assert english(cache, "天使") == "angel v2"
+
+
+def test_stats(cache):
+    cache.lookup(["天使"], ["英文"])
+    cache._apply_notification('["天使"]')
+    stats = cache.get_stats()
+    assert stats["lookups"] == 1
+    assert stats["notifications"] == 1
+    assert stats["incremental_refreshes"] == 1
+    assert stats["terms"] == 2
+
+
+def test_expired_snapshot_is_served_while_reloading(cache):
+    started = threading.Event()
+    release = threading.Event()
+    cache.manager.rows["天使"] = {"英语": "angel v2"}
+    cache.manager.during_full_load.append(lambda: started.set() or release.wait(5))
+    cache._loaded_at -= cache.ttl + 1
+
+    # 过期后立即返回旧快照，在后台重新加载
+    assert english(cache, "天使") == "angel"
+    assert started.wait(5)
+    assert english(cache, "天使") == "angel"
+    assert cache.get_stats()["full_loads"] == 1
+    release.set()
+    cache._warming.join(5)
+    assert english(cache, "天使") == "angel v2"
+    assert cache.get_stats()["full_loads"] == 2
+
+
+def test_matcher_is_rebuilt_in_background(cache, monkeypatch):
+    matcher = cache.get_matcher()
+    assert matcher.find_longest_terms(["天使扣子"]) == {"天使", "扣子"}
+
+    release = threading.Event()
+
+    class SlowTermMatcher(glossary_cache_module.TermMatcher):
+        def __init__(self, terms):
+            release.wait(5)
+            super().__init__(terms)
+
+    monkeypatch.setattr(glossary_cache_module, "TermMatcher", SlowTermMatcher)
+    cache.manager.rows["天使扣"] = {"英语": "angel button"}
+    cache._refresh_terms(["天使扣"])
+
+    # 重建完成前继续使用旧的自动机
+    assert cache.get_matcher() is matcher
+    release.set()
+    cache._matcher_builder.join(5)
+    assert cache.get_matcher().find_longest_terms(["天使扣子"]) == {"天使扣"}
+    assert cache.get_stats()["matcher_builds"] == 2
@@ -0,0 +1,83 @@
+"""
+术语表快照单元测试：写入后 mmap 读取，查询结果与 TermMatcher 及原始字典一致
+"""
+import random
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from storage.database.glossary_snapshot import GlossarySnapshot, write_glossary_snapshot
+from utils.text.term_matcher import TermMatcher
+
+ENTRIES = {
+    "天使": {"英语": "angel", "日语": "天使"},
+    "天使扣": {"英语": "angel button"},
+    "扣子": {"英语": "button", "韩语": "단추"},
+    "不锈钢": {"英语": "stainless steel", "日语": None},
+    "空翻译": {"英语": "", "日语": None},
+}
+
+
+def open_snapshot(tmp_path, entries):
+    path = str(tmp_path / "glossary.snapshot")
+    stats = write_glossary_snapshot(path, entries)
+    return GlossarySnapshot(path), stats
+
+
+def test_round_trip_lookup(tmp_path):
+    snapshot, stats = open_snapshot(tmp_path, ENTRIES)
+    try:
+        assert stats["terms"] == len(ENTRIES) == len(snapshot)
+        assert snapshot.languages == ["日语", "英语", "韩语"]
+        assert "天使扣" in snapshot and "天使扣子" not in snapshot
+        # 目标语言使用标准名（英文），按列名映射读取；空翻译不写入
+        assert snapshot.lookup(["天使", "扣子", "不锈钢", "空翻译", "未收录"], ["英文", "日文"]) == {
+            "天使": {"英文": "angel", "日文": "天使"},
+            "扣子": {"英文": "button"},
+            "不锈钢": {"英文": "stainless steel"},
+        }
+        assert snapshot.lookup(["天使"], ["法文"]) == {}
+    finally:
+        snapshot.close()
+
+
+def test_find_longest_terms_matches_term_matcher(tmp_path):
+    snapshot, _ = open_snapshot(tmp_path, ENTRIES)
+    matcher = TermMatcher(ENTRIES)
+    texts = ["天使扣子", "天使的扣子", "不锈钢天使扣", "", None, 12]
+    try:
+        assert snapshot.find_longest_terms(texts) == matcher.find_longest_terms(texts) == {"天使扣", "天使", "扣子", "不锈钢"}
+    finally:
+        snapshot.close()
+
+
+def test_random_glossaries_match_term_matcher(tmp_path):
+    rng = random.Random(0)
+    alphabet = "天使扣子钢板不锈ab"
+    for case in range(100):
+        terms = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 20))}
+        entries = {term: {"英语": f"en-{term}"} for term in terms}
+        texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15))) for _ in range(3)]
+        path = str(tmp_path / f"case{case}.snapshot")
+        write_glossary_snapshot(path, entries)
+        snapshot = GlossarySnapshot(path)
+        try:
+            found = snapshot.find_longest_terms(texts)
+            assert found == TermMatcher(terms).find_longest_terms(texts), (terms, texts)
+            assert snapshot.lookup(found, ["英文"]) == {term: {"英文": f"en-{term}"} for term in found}
+        finally:
+            snapshot.close()
+
+
+def test_empty_glossary(tmp_path):
+    snapshot, stats = open_snapshot(tmp_path, {})
+    try:
+        assert stats["terms"] == 0 and len(snapshot) == 0
+        assert snapshot.languages == []
+        assert "天使" not in snapshot
+        assert snapshot.find_longest_terms(["天使扣子"]) == set()
+        assert snapshot.lookup(["天使"], ["英文"]) == {}
+    finally:
+        snapshot.close()
@@ -0,0 +1,74 @@
+"""
+术语近似匹配查询构建单元测试：阈值设置、分块、候选数及结果分组
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import storage.database.translation_manager as translation_manager
+from storage.database.translation_manager import TranslationKnowledgeManager, _attach_translations, _group_similar_rows
+
+
+def compile_statement(statement):
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test_no_terms():
+    manager = TranslationKnowledgeManager("wide")
+    assert manager._similar_terms_statements([], 0.5, 3, False) is None
+    assert manager._similar_terms_statements(["", ""], 0.5, 3, False) is None
+
+
+@pytest.mark.parametrize("layout, table", [("wide", '"翻译知识库"'), ("long", '"术语翻译"')])
+def test_statements_per_layout(layout, table):
+    setup, statements = TranslationKnowledgeManager(layout)._similar_terms_statements(
+        ["不锈钢", "天使扣", "不锈钢"], 0.4, 3, False
+    )
+    sql, params = compile_statement(setup)
+    assert "pg_trgm.similarity_threshold" in sql and params == {"threshold": "0.4"}
+    assert len(statements) == 1
+    sql, params = compile_statement(statements[0])
+    assert f"FROM {table} g" in sql and "%%" in sql
+    assert "similarity(" in sql and "ORDER BY score DESC" in sql
+    # 去重后保持原顺序；不包含精确命中时多取一个候选
+    assert params == {"terms": ["不锈钢", "天使扣"], "limit": 4}
+
+
+def test_include_exact_uses_limit():
+    _, statements = TranslationKnowledgeManager("wide")._similar_terms_statements(["不锈钢"], 0.5, 3, True)
+    assert compile_statement(statements[0])[1]["limit"] == 3
+
+
+def test_terms_are_chunked(monkeypatch):
+    monkeypatch.setattr(translation_manager, "TERM_QUERY_CHUNK_SIZE", 2)
+    _, statements = TranslationKnowledgeManager("wide")._similar_terms_statements(["甲乙", "丙丁", "戊己"], 0.5, 3, False)
+    assert [compile_statement(statement)[1]["terms"] for statement in statements] == [["甲乙", "丙丁"], ["戊己"]]
+
+
+def test_group_similar_rows_skips_exact_and_limits():
+    rows = [
+        ("不锈钢板", "不锈钢板", 1.0),
+        ("不锈钢板", "不锈钢板材", 0.8),
+        ("不锈钢板", "不锈钢管", 0.6),
+        ("不锈钢板", "钢板", 0.5),
+        ("天使扣", "天使扣子", 0.7),
+    ]
+    assert _group_similar_rows(rows, include_exact=False, limit=2) == {
+        "不锈钢板": [("不锈钢板材", 0.8), ("不锈钢管", 0.6)],
+        "天使扣": [("天使扣子", 0.7)],
+    }
+    assert _group_similar_rows(rows, include_exact=True, limit=1)["不锈钢板"] == [("不锈钢板", 1.0)]
+
+
+def test_attach_translations_drops_untranslated_candidates():
+    matches = {"不锈钢板": [("不锈钢板材", 0.81234), ("不锈钢管", 0.6)], "天使扣": [("天使扣子", 0.7)]}
+    translations = {"不锈钢管": {"英文": "stainless steel pipe"}}
+    assert _attach_translations(matches, translations) == {
+        "不锈钢板": [{"term": "不锈钢管", "similarity": 0.6, "translations": {"英文": "stainless steel pipe"}}]
+    }
@@ -0,0 +1,98 @@
+"""
+翻译记忆单元测试：LRU淘汰、原文规范化、缓存键冲突及不启用数据库的情况
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from storage.database.translation_memory import TranslationMemory, build_cache_key, normalize_text
+
+ARGS = ("英文", "model", "cfg")
+
+
+class FakeDBTranslationMemory(TranslationMemory):
+    """以字典代替 Postgres 表，记录每次写回的行"""
+
+    def __init__(self, capacity=100):
+        super().__init__(capacity=capacity, db_enabled=True)
+        self.table = {}
+        self.written = []
+
+    def _db_get(self, keys):
+        return {key: self.table[key] for key in keys if key in self.table}
+
+    def _db_put(self, rows):
+        keys = [row["缓存键"] for row in rows]
+        # 与 ON CONFLICT DO UPDATE 相同：同一语句中的键不能重复
+        assert len(keys) == len(set(keys))
+        self.written.append(rows)
+        self.table.update({row["缓存键"]: row["译文"] for row in rows})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("苹果", "苹果"),
+    ("  苹果 ", "苹果"),
+    ("红色\t\n苹果", "红色 苹果"),
+    ("ＡＢＣ１２３", "ABC123"),
+    ("苹果（大）", "苹果(大)"),
+    ("", ""),
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_cache_key_depends_on_language_model_and_config():
+    key = build_cache_key("苹果", *ARGS)
+    assert build_cache_key(" 苹果", *ARGS) == key
+    assert build_cache_key("苹果", "日文", "model", "cfg") != key
+    assert build_cache_key("苹果", "英文", "other", "cfg") != key
+    assert build_cache_key("苹果", "英文", "model", "other") != key
+
+
+def test_db_disabled_uses_lru_only():
+    memory = TranslationMemory(capacity=10, db_enabled=False)
+    memory._db_get = memory._db_put = pytest.fail
+    memory.put_many({"苹果": "apple", "香蕉": "", "梨": None}, *ARGS)
+    assert memory.get_many(["苹果", "香蕉", "梨"], *ARGS) == {"苹果": "apple"}
+    stats = memory.get_stats()
+    assert stats["writes"] == 1 and stats["lru_hits"] == 1 and stats["misses"] == 2
+    assert stats["lru_size"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    memory = TranslationMemory(capacity=2, db_enabled=False)
+    memory.put_many({"一": "one", "二": "two"}, *ARGS)
+    # 读取“一”后，“二”成为最久未使用的条目
+    assert memory.get_many(["一"], *ARGS) == {"一": "one"}
+    memory.put_many({"三": "three"}, *ARGS)
+    assert memory.get_many(["一", "二", "三"], *ARGS) == {"一": "one", "三": "three"}
+    assert memory.get_stats()["lru_size"] == 2
+
+
+def test_colliding_texts_are_written_once():
+    memory = FakeDBTranslationMemory()
+    memory.put_many({"苹果": "apple", "苹果 ": "apple!", "ＡＢＣ": "abc", "ABC": "abc"}, *ARGS)
+    assert len(memory.written) == 1
+    rows = memory.written[0]
+    assert sorted(row["原文"] for row in rows) == ["ABC", "苹果"]
+    assert memory.get_stats()["writes"] == 2
+
+
+def test_colliding_texts_all_hit_from_db():
+    memory = FakeDBTranslationMemory()
+    memory.put_many({"苹果": "apple"}, *ARGS)
+    # 新实例（LRU为空）共用同一张表
+    fresh = FakeDBTranslationMemory()
+    fresh.table = memory.table
+    assert fresh.get_many(["苹果", " 苹果", "苹果　", "香蕉"], *ARGS) == {
+        "苹果": "apple", " 苹果": "apple", "苹果　": "apple"
+    }
+    stats = fresh.get_stats()
+    assert stats["db_hits"] == 3 and stats["misses"] == 1
+    # 命中后写入LRU，再次查询不访问数据库
+    fresh.table = {}
+    assert fresh.get_many(["苹果 "], *ARGS) == {"苹果 ": "apple"}
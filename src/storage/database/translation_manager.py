@@ -1,11 +1,26 @@
-from typing import List, Optional, Dict, Tuple
+import os
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict, Sequence, Tuple, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-from storage.database.shared.model import 翻译知识库
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, Select, TextClause, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from storage.database.shared.model import 翻译知识库, 术语翻译
+
+# 批量查询时单条SQL中IN列表的最大长度
+TERM_QUERY_CHUNK_SIZE = 5000
+# 术语表存储格式：wide 为"翻译知识库"（每种语言一列），long 为"术语翻译"（每个 (中文, 语言) 一行）
+GLOSSARY_LAYOUT = os.getenv("GLOSSARY_LAYOUT", "wide").lower()
+GLOSSARY_LAYOUTS = ("wide", "long")
+# 术语近似匹配的默认相似度阈值（pg_trgm similarity，0~1）及每个术语返回的最大候选数
+GLOSSARY_FUZZY_THRESHOLD = float(os.getenv("GLOSSARY_FUZZY_THRESHOLD", "0.5"))
+GLOSSARY_FUZZY_MAX_CANDIDATES = int(os.getenv("GLOSSARY_FUZZY_MAX_CANDIDATES", "3"))
+
+# 宽表的语言列（数据库实际列），首次查询后缓存，避免每次调用都做表结构反射
+_wide_language_columns: Optional[List[str]] = None
 
 
 class TranslationKnowledgeManager:
-    """翻译知识库管理器：根据中文术语查询多语言翻译"""
+    """翻译知识库管理器：根据中文术语查询多语言翻译，支持宽表与长表两种存储格式"""
 
     # 语言名称到数据库列名的映射
     LANGUAGE_COLUMN_MAPPING: Dict[str, str] = {
@@ -56,6 +71,11 @@ class TranslationKnowledgeManager:
         "pt": "葡萄牙语",
     }
 
+    def __init__(self, layout: str = GLOSSARY_LAYOUT):
+        if layout not in GLOSSARY_LAYOUTS:
+            raise ValueError(f"不支持的术语表存储格式: {layout}，可选: {', '.join(GLOSSARY_LAYOUTS)}")
+        self.layout = layout
+
     def get_translation(
         self,
         db: Session,
@@ -71,21 +91,10 @@ class TranslationKnowledgeManager:
             target_language: 目标语言（如"英文"、"日文"）
 
         Returns:
-            翻译结果，如果不存在或数据库中没有该语言列则返回None
+            翻译结果，如果不存在或数据库中没有该语言则返回None
         """
-        # 标准化语言名称并获取列名
-        column_name = self._get_column_name(target_language)
-        if not column_name:
-            return None
-
-        # 查询数据库
-        result = db.query(翻译知识库).filter(翻译知识库.中文 == chinese_term).first()
-        if not result:
-            return None
-
-        # 动态获取对应列的值
-        translation = getattr(result, column_name, None)
-        return translation
+        translations = self.get_translations_multi(db, [chinese_term], [target_language])
+        return translations.get(chinese_term, {}).get(target_language)
 
     def get_translations_batch(
         self,
@@ -104,21 +113,252 @@ class TranslationKnowledgeManager:
         Returns:
             字典：{中文术语: 翻译结果}，如果翻译不存在则值为None
         """
-        # 标准化语言名称并获取列名
-        column_name = self._get_column_name(target_language)
-        if not column_name:
-            return {term: None for term in chinese_terms}
+        translations: Dict[str, Optional[str]] = {term: None for term in chinese_terms}
+        found = self.get_translations_multi(db, chinese_terms, [target_language])
+        for term, lang_translations in found.items():
+            translations[term] = lang_translations.get(target_language)
+        return translations
 
-        # 批量查询
-        results = db.query(翻译知识库).filter(翻译知识库.中文.in_(chinese_terms)).all()
-        
-        # 构建结果字典
-        translations = {term: None for term in chinese_terms}
-        for result in results:
-            translation = getattr(result, column_name, None)
-            translations[result.中文] = translation
+    def get_translations_multi(
+        self,
+        db: Session,
+        chinese_terms: List[str],
+        target_languages: List[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        批量查询中文术语在多个目标语言下的翻译，所有语言在同一查询中返回
 
-        return translations
+        Args:
+            db: 数据库会话
+            chinese_terms: 中文术语列表，按 TERM_QUERY_CHUNK_SIZE 分块查询
+            target_languages: 目标语言列表（如["英文", "日文"]）
+
+        Returns:
+            字典：{中文术语: {目标语言: 翻译结果}}，只包含非空的翻译
+        """
+        language_keys = self._resolve_language_keys(target_languages)
+        if not language_keys:
+            return {}
+        entries = self.load_entries(db, chinese_terms, set(language_keys.values()))
+        return _pick_translations(entries, language_keys)
+
+    async def aget_translations_multi(
+        self,
+        db: AsyncSession,
+        chinese_terms: List[str],
+        target_languages: List[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        get_translations_multi 的异步版本，查询期间不占用线程
+
+        Args:
+            db: 异步数据库会话（见 storage.database.db.get_async_session）
+            chinese_terms: 中文术语列表，按 TERM_QUERY_CHUNK_SIZE 分块查询
+            target_languages: 目标语言列表（如["英文", "日文"]）
+
+        Returns:
+            字典：{中文术语: {目标语言: 翻译结果}}，只包含非空的翻译
+        """
+        language_keys = self._resolve_language_keys(target_languages)
+        if not language_keys:
+            return {}
+        entries = await self.aload_entries(db, chinese_terms, set(language_keys.values()))
+        return _pick_translations(entries, language_keys)
+
+    def _resolve_language_keys(self, target_languages: List[str]) -> Dict[str, str]:
+        # 标准化语言名称，数据库中没有的语言直接跳过
+        language_keys = {}
+        for lang in target_languages:
+            key = self.get_language_key(lang)
+            if key:
+                language_keys[lang] = key
+        return language_keys
+
+    def load_entries(
+        self,
+        db: Session,
+        chinese_terms: Optional[Iterable[str]] = None,
+        language_keys: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        读取术语表条目，两种存储格式返回相同结构
+
+        Args:
+            db: 数据库会话
+            chinese_terms: 中文术语，为None时读取全部术语
+            language_keys: 标准语言名（宽表即列名，如"英语"），为None时读取全部语言
+
+        Returns:
+            字典：{中文术语: {标准语言名: 翻译}}
+        """
+        entries: Dict[str, Dict[str, Optional[str]]] = {}
+        statements, collect = self._entry_statements(chinese_terms, language_keys)
+        for statement in statements:
+            collect(entries, db.execute(statement).all())
+        return entries
+
+    async def aload_entries(
+        self,
+        db: AsyncSession,
+        chinese_terms: Optional[Iterable[str]] = None,
+        language_keys: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Optional[str]]]:
+        """load_entries 的异步版本，参数与返回值相同"""
+        entries: Dict[str, Dict[str, Optional[str]]] = {}
+        statements, collect = self._entry_statements(chinese_terms, language_keys)
+        for statement in statements:
+            collect(entries, (await db.execute(statement)).all())
+        return entries
+
+    def _entry_statements(
+        self,
+        chinese_terms: Optional[Iterable[str]],
+        language_keys: Optional[Iterable[str]]
+    ) -> Tuple[Iterator[Select], Callable[[Dict[str, Dict[str, Optional[str]]], Sequence[Row]], None]]:
+        """
+        构建读取术语表的查询（按术语分块）及把结果行并入 {中文: {语言: 翻译}} 的函数，供同步/异步读取共用
+        """
+        if self.layout == "long":
+            base = select(术语翻译.中文, 术语翻译.语言, 术语翻译.译文)
+            if language_keys is not None:
+                base = base.where(术语翻译.语言.in_(list(language_keys)))
+            term_column = 术语翻译.中文
+
+            def collect(entries, rows):
+                for term, language, translation in rows:
+                    entries.setdefault(term, {})[language] = translation
+        else:
+            model_columns = [column.name for column in 翻译知识库.__table__.columns if column.name != '中文']
+            keys = set(language_keys) if language_keys is not None else None
+            column_names = [name for name in model_columns if keys is None or name in keys]
+            base = select(翻译知识库.中文, *[getattr(翻译知识库, name) for name in column_names])
+            term_column = 翻译知识库.中文
+
+            def collect(entries, rows):
+                for row in rows:
+                    entries[row[0]] = dict(zip(column_names, row[1:]))
+
+        statements = (
+            base.where(term_column.in_(chunk)) if chunk is not None else base
+            for chunk in _chunked(chinese_terms)
+        )
+        return statements, collect
+
+    def find_similar_terms(
+        self,
+        db: Session,
+        chinese_terms: List[str],
+        target_languages: List[str],
+        threshold: float = GLOSSARY_FUZZY_THRESHOLD,
+        limit: int = GLOSSARY_FUZZY_MAX_CANDIDATES,
+        include_exact: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        近似匹配术语（标点差异、个别字不同等）：pg_trgm 三元组相似度，走 GIN 索引，
+        一批术语在同一条查询中匹配，再一次批量查询候选术语的翻译
+
+        三元组按数据库的 LC_CTYPE 切词，需为 UTF-8 区域设置（C 区域下中文字符不产生三元组）。
+
+        Args:
+            db: 数据库会话
+            chinese_terms: 待匹配的中文术语列表，按 TERM_QUERY_CHUNK_SIZE 分块查询
+            target_languages: 目标语言列表（如["英文", "日文"]）
+            threshold: 相似度阈值（0~1），仅在当前事务内生效
+            limit: 每个术语最多返回的候选数
+            include_exact: 是否包含与术语完全相同的候选（精确命中通常已由 get_translations_multi 处理）
+
+        Returns:
+            字典：{待匹配术语: [{"term": 候选术语, "similarity": 相似度, "translations": {目标语言: 翻译}}, ...]}，
+            候选按相似度降序，只包含在目标语言下有翻译的候选
+        """
+        statements = self._similar_terms_statements(chinese_terms, threshold, limit, include_exact)
+        if statements is None:
+            return {}
+        setup, matches_statements = statements
+        db.execute(setup)
+        rows = []
+        for statement in matches_statements:
+            rows.extend(db.execute(statement).all())
+        matches = _group_similar_rows(rows, include_exact, limit)
+        matched_terms = list({term for candidates in matches.values() for term, _ in candidates})
+        translations = self.get_translations_multi(db, matched_terms, target_languages) if matched_terms else {}
+        return _attach_translations(matches, translations)
+
+    async def afind_similar_terms(
+        self,
+        db: AsyncSession,
+        chinese_terms: List[str],
+        target_languages: List[str],
+        threshold: float = GLOSSARY_FUZZY_THRESHOLD,
+        limit: int = GLOSSARY_FUZZY_MAX_CANDIDATES,
+        include_exact: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """find_similar_terms 的异步版本，参数与返回值相同"""
+        statements = self._similar_terms_statements(chinese_terms, threshold, limit, include_exact)
+        if statements is None:
+            return {}
+        setup, matches_statements = statements
+        await db.execute(setup)
+        rows = []
+        for statement in matches_statements:
+            rows.extend((await db.execute(statement)).all())
+        matches = _group_similar_rows(rows, include_exact, limit)
+        matched_terms = list({term for candidates in matches.values() for term, _ in candidates})
+        translations = await self.aget_translations_multi(db, matched_terms, target_languages) if matched_terms else {}
+        return _attach_translations(matches, translations)
+
+    def _similar_terms_statements(
+        self,
+        chinese_terms: List[str],
+        threshold: float,
+        limit: int,
+        include_exact: bool
+    ) -> Optional[Tuple[TextClause, List[TextClause]]]:
+        """构建设置相似度阈值的语句及按块匹配的查询；没有待匹配术语时返回None"""
+        terms = [term for term in dict.fromkeys(chinese_terms) if term]
+        if not terms:
+            return None
+        # % 运算符使用该阈值且可走 GIN 索引；set_config 第三个参数为 true 表示只在当前事务内生效
+        setup = text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)").bindparams(
+            threshold=str(threshold)
+        )
+        if self.layout == "long":
+            candidates = 'SELECT DISTINCT g."中文" FROM "术语翻译" g WHERE g."中文" % q.term'
+        else:
+            candidates = 'SELECT g."中文" FROM "翻译知识库" g WHERE g."中文" % q.term'
+        sql = (
+            'SELECT q.term, m."中文", m.score '
+            'FROM unnest(CAST(:terms AS varchar[])) AS q(term) '
+            'CROSS JOIN LATERAL ('
+            f' SELECT c."中文", similarity(c."中文", q.term) AS score FROM ({candidates}) c'
+            ' ORDER BY score DESC, c."中文" LIMIT :limit'
+            ') m'
+        )
+        # 不包含精确命中时多取一个候选，精确命中占用的名额由下一个候选补上
+        fetch_limit = limit if include_exact else limit + 1
+        statements = [
+            text(sql).bindparams(terms=chunk, limit=fetch_limit)
+            for chunk in _chunked(terms)
+        ]
+        return setup, statements
+
+    def get_language_key(self, language: str) -> Optional[str]:
+        """
+        根据语言名称获取标准语言名：宽表为数据库列名，长表为"术语翻译"中的语言值
+
+        Args:
+            language: 语言名称（如"英文"、"English"、"en"）
+
+        Returns:
+            标准语言名（如"英语"）；宽表中不存在该语言列时返回None，
+            长表中未登记别名的语言按原名使用，新增语言无需修改映射
+        """
+        key = self.LANGUAGE_COLUMN_MAPPING.get(language)
+        if self.layout == "long":
+            return key or language
+        if key and hasattr(翻译知识库, key):
+            return key
+        return None
 
     def _get_column_name(self, language: str) -> Optional[str]:
         """
@@ -134,28 +374,40 @@ class TranslationKnowledgeManager:
 
     def get_available_languages(self, db: Session) -> List[str]:
         """
-        获取数据库中可用的语言列名
+        获取数据库中可用的语言
 
         Args:
             db: 数据库会话
 
         Returns:
-            可用的语言列名列表（如["英语", "日语", "韩语"]）
+            可用的标准语言名列表（如["英语", "日语", "韩语"]）
         """
-        # 获取表的所有列名
-        inspector = db.get_bind()
-        from sqlalchemy import inspect
-        columns = inspect(inspector).get_columns(翻译知识库.__tablename__)
-        
-        # 排除主键"中文"，只返回语言列
-        return [col['name'] for col in columns if col['name'] != '中文']
+        if self.layout == "long":
+            # 在 (语言, 中文) 索引上做松散索引扫描，每种语言只读取一个索引项，与术语数量无关
+            rows = db.execute(text(
+                'WITH RECURSIVE langs AS ('
+                ' SELECT min("语言") AS lang FROM "术语翻译"'
+                ' UNION ALL'
+                ' SELECT (SELECT min("语言") FROM "术语翻译" WHERE "语言" > langs.lang) FROM langs WHERE langs.lang IS NOT NULL'
+                ') SELECT lang FROM langs WHERE lang IS NOT NULL'
+            )).all()
+            return [row[0] for row in rows]
+
+        global _wide_language_columns
+        if _wide_language_columns is None:
+            # 获取表的所有列名
+            from sqlalchemy import inspect
+            columns = inspect(db.get_bind()).get_columns(翻译知识库.__tablename__)
+            # 排除主键"中文"，只返回语言列
+            _wide_language_columns = [col['name'] for col in columns if col['name'] != '中文']
+        return list(_wide_language_columns)
 
     def add_translation(
         self,
         db: Session,
         chinese_term: str,
         translations: Dict[str, Optional[str]]
-    ) -> 翻译知识库:
+    ) -> Union[翻译知识库, List[术语翻译]]:
         """
         添加或更新翻译术语
 
@@ -165,8 +417,13 @@ class TranslationKnowledgeManager:
             translations: 翻译字典 {语言: 翻译结果}，如{"英语": "Apple", "日语": "リンゴ"}
 
         Returns:
-            创建或更新后的翻译知识库对象
+            宽表：创建或更新后的翻译知识库对象；长表：该术语的所有"术语翻译"行
         """
+        from storage.database.glossary_cache import notify_glossary_changed
+
+        if self.layout == "long":
+            return self._add_translation_long(db, chinese_term, translations)
+
         # 查询是否存在
         existing = db.query(翻译知识库).filter(翻译知识库.中文 == chinese_term).first()
         
@@ -177,6 +434,8 @@ class TranslationKnowledgeManager:
                     setattr(existing, lang, translation)
             db.add(existing)
             try:
+                # 与写入同一事务发送变更通知，提交后各实例的术语表缓存增量刷新
+                notify_glossary_changed(db, [chinese_term])
                 db.commit()
                 db.refresh(existing)
                 return existing
@@ -190,9 +449,98 @@ class TranslationKnowledgeManager:
             new_term = 翻译知识库(**data)
             db.add(new_term)
             try:
+                notify_glossary_changed(db, [chinese_term])
                 db.commit()
                 db.refresh(new_term)
                 return new_term
             except Exception as e:
                 db.rollback()
                 raise Exception(f"添加翻译失败: {e}")
+
+    def _add_translation_long(
+        self,
+        db: Session,
+        chinese_term: str,
+        translations: Dict[str, Optional[str]]
+    ) -> List[术语翻译]:
+        from storage.database.glossary_cache import notify_glossary_changed
+
+        rows = {}
+        deleted = []
+        for lang, translation in translations.items():
+            key = self.get_language_key(lang)
+            if translation:
+                rows[key] = {"中文": chinese_term, "语言": key, "译文": translation}
+            else:
+                deleted.append(key)
+        try:
+            if rows:
+                stmt = insert(术语翻译).values(list(rows.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["中文", "语言"],
+                    set_={"译文": stmt.excluded.译文},
+                )
+                db.execute(stmt)
+            if deleted:
+                db.query(术语翻译).filter(术语翻译.中文 == chinese_term, 术语翻译.语言.in_(deleted)).delete(synchronize_session=False)
+            notify_glossary_changed(db, [chinese_term])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise Exception(f"添加翻译失败: {e}")
+        return db.query(术语翻译).filter(术语翻译.中文 == chinese_term).all()
+
+
+def _group_similar_rows(rows: Sequence[Row], include_exact: bool, limit: int) -> Dict[str, List[Tuple[str, float]]]:
+    """把 (待匹配术语, 候选术语, 相似度) 行按待匹配术语分组"""
+    matches: Dict[str, List[Tuple[str, float]]] = {}
+    for query, term, score in rows:
+        if not include_exact and term == query:
+            continue
+        candidates = matches.setdefault(query, [])
+        if len(candidates) < limit:
+            candidates.append((term, float(score)))
+    return matches
+
+
+def _attach_translations(
+    matches: Dict[str, List[Tuple[str, float]]],
+    translations: Dict[str, Dict[str, str]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    result: Dict[str, List[Dict[str, Any]]] = {}
+    for query, candidates in matches.items():
+        items = [
+            {"term": term, "similarity": round(score, 4), "translations": translations[term]}
+            for term, score in candidates
+            if term in translations
+        ]
+        if items:
+            result[query] = items
+    return result
+
+
+def _pick_translations(
+    entries: Dict[str, Dict[str, Optional[str]]],
+    language_keys: Dict[str, str]
+) -> Dict[str, Dict[str, str]]:
+    """把 {中文: {标准语言名: 翻译}} 转换为 {中文: {目标语言: 翻译}}，只保留非空翻译"""
+    translations: Dict[str, Dict[str, str]] = {}
+    for term, values in entries.items():
+        lang_translations = {
+            lang: values[key]
+            for lang, key in language_keys.items()
+            if values.get(key)
+        }
+        if lang_translations:
+            translations[term] = lang_translations
+    return translations
+
+
+def _chunked(terms: Optional[Iterable[str]]):
+    """按 TERM_QUERY_CHUNK_SIZE 对术语去重分块；terms 为None时产出一次None表示不按术语过滤"""
+    if terms is None:
+        yield None
+        return
+    terms = list(dict.fromkeys(terms))
+    for i in range(0, len(terms), TERM_QUERY_CHUNK_SIZE):
+        yield terms[i:i + TERM_QUERY_CHUNK_SIZE]
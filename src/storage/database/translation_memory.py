@@ -0,0 +1,223 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import func
+from storage.database.shared.model import 翻译记忆
+
+logger = logging.getLogger(__name__)
+
+# 进程内LRU容量（条目数）
+TRANSLATION_MEMORY_LRU_SIZE = int(os.getenv("TRANSLATION_MEMORY_LRU_SIZE", "50000"))
+# 是否启用Postgres持久层，关闭后仅使用进程内LRU
+TRANSLATION_MEMORY_DB_ENABLED = os.getenv("TRANSLATION_MEMORY_DB_ENABLED", "true").lower() != "false"
+# 单条SQL中IN列表的最大长度
+DB_QUERY_CHUNK_SIZE = 1000
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化原文：NFKC归一化、去除首尾空白并折叠连续空白
+
+    Args:
+        text: 原文
+
+    Returns:
+        规范化后的文本
+    """
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+
+
+def build_cache_key(text: str, target_language: str, model: str, cfg_hash: str) -> str:
+    """
+    构建翻译记忆缓存键：sha256(规范化原文, 目标语言, 模型, 配置哈希)
+    """
+    raw = "\x1f".join([normalize_text(text), target_language, model, cfg_hash])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class TranslationMemory:
+    """翻译记忆：段落级翻译缓存，进程内LRU在前，Postgres表"翻译记忆"在后"""
+
+    def __init__(self, capacity: int = TRANSLATION_MEMORY_LRU_SIZE, db_enabled: bool = TRANSLATION_MEMORY_DB_ENABLED):
+        self.capacity = capacity
+        self.db_enabled = db_enabled
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "lru_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "db_errors": 0,
+        }
+
+    def _lru_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+            return value
+
+    def _lru_put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.capacity:
+                self._lru.popitem(last=False)
+
+    def _incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def get_many(
+        self,
+        texts: Iterable[str],
+        target_language: str,
+        model: str,
+        cfg_hash: str
+    ) -> Dict[str, str]:
+        """
+        批量查询翻译记忆
+
+        Args:
+            texts: 原文列表
+            target_language: 目标语言
+            model: 模型名称
+            cfg_hash: 提示词/配置哈希
+
+        Returns:
+            字典：{原文: 译文}，只包含命中的条目
+        """
+        hits: Dict[str, str] = {}
+        # {缓存键: [原文, ...]}：规范化后相同的多个原文（如首尾空白、全角/半角不同）共用一个缓存键
+        pending: Dict[str, List[str]] = {}
+
+        for text in set(texts):
+            key = build_cache_key(text, target_language, model, cfg_hash)
+            value = self._lru_get(key)
+            if value is not None:
+                hits[text] = value
+            else:
+                pending.setdefault(key, []).append(text)
+        self._incr("lru_hits", len(hits))
+
+        if pending and self.db_enabled:
+            db_hits = 0
+            for key, value in self._db_get(list(pending.keys())).items():
+                for text in pending.pop(key):
+                    hits[text] = value
+                    db_hits += 1
+                self._lru_put(key, value)
+            self._incr("db_hits", db_hits)
+
+        self._incr("misses", sum(len(texts) for texts in pending.values()))
+        return hits
+
+    def put_many(
+        self,
+        translations: Dict[str, str],
+        target_language: str,
+        model: str,
+        cfg_hash: str
+    ) -> None:
+        """
+        写回翻译结果到LRU和Postgres
+
+        Args:
+            translations: 字典：{原文: 译文}
+            target_language: 目标语言
+            model: 模型名称
+            cfg_hash: 提示词/配置哈希
+        """
+        # 按缓存键去重：同一条 INSERT ... ON CONFLICT DO UPDATE 中不能出现重复的键
+        rows: Dict[str, Dict[str, str]] = {}
+        for text, translation in translations.items():
+            if not isinstance(translation, str) or not translation:
+                continue
+            key = build_cache_key(text, target_language, model, cfg_hash)
+            self._lru_put(key, translation)
+            rows[key] = {
+                "缓存键": key,
+                "原文": normalize_text(text),
+                "目标语言": target_language,
+                "模型": model,
+                "配置哈希": cfg_hash,
+                "译文": translation,
+            }
+        if not rows:
+            return
+        self._incr("writes", len(rows))
+        if self.db_enabled:
+            self._db_put(list(rows.values()))
+
+    def _db_get(self, keys: list) -> Dict[str, str]:
+        from storage.database.db import get_session
+        results: Dict[str, str] = {}
+        db = None
+        try:
+            db = get_session()
+            for i in range(0, len(keys), DB_QUERY_CHUNK_SIZE):
+                chunk = keys[i:i + DB_QUERY_CHUNK_SIZE]
+                rows = db.query(翻译记忆.缓存键, 翻译记忆.译文).filter(翻译记忆.缓存键.in_(chunk)).all()
+                for key, value in rows:
+                    results[key] = value
+        except Exception as e:
+            self._incr("db_errors")
+            logger.warning(f"翻译记忆查询失败，仅使用进程内缓存: {e}")
+        finally:
+            if db is not None:
+                db.close()
+        return results
+
+    def _db_put(self, rows: list) -> None:
+        from storage.database.db import get_session
+        db = None
+        try:
+            db = get_session()
+            for i in range(0, len(rows), DB_QUERY_CHUNK_SIZE):
+                stmt = insert(翻译记忆).values(rows[i:i + DB_QUERY_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["缓存键"],
+                    set_={"译文": stmt.excluded.译文, "更新时间": func.now()},
+                )
+                db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            if db is not None:
+                db.rollback()
+            self._incr("db_errors")
+            logger.warning(f"翻译记忆写回失败: {e}")
+        finally:
+            if db is not None:
+                db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中/未命中计数"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["lru_size"] = len(self._lru)
+        lookups = stats["lru_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["lru_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_translation_memory: Optional[TranslationMemory] = None
+_translation_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    """获取进程级翻译记忆单例"""
+    global _translation_memory
+    if _translation_memory is None:
+        with _translation_memory_lock:
+            if _translation_memory is None:
+                _translation_memory = TranslationMemory()
+    return _translation_memory
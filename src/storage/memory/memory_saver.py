@@ -1,5 +1,6 @@
 import psycopg
 from psycopg_pool import AsyncConnectionPool
+from storage.database.pool import DB_CONNECT_TIMEOUT, connect_direct, create_psycopg_pool
 from langgraph.checkpoint.postgres import PostgresSaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from langgraph.checkpoint.memory import MemorySaver
@@ -10,8 +11,8 @@ import time
 
 logger = logging.getLogger(__name__)
 
-# 数据库连接超时时间（秒），每次尝试 15 秒，共尝试 2 次
-DB_CONNECTION_TIMEOUT = 15
+# 数据库连接超时时间（秒），每次尝试 DB_CONNECT_TIMEOUT 秒（默认15秒），共尝试 2 次
+DB_CONNECTION_TIMEOUT = DB_CONNECT_TIMEOUT
 DB_MAX_RETRIES = 2
 
 
@@ -34,7 +35,7 @@ class MemoryManager:
         for attempt in range(1, DB_MAX_RETRIES + 1):
             try:
                 logger.info(f"Attempting database connection (attempt {attempt}/{DB_MAX_RETRIES})")
-                conn = psycopg.connect(db_url, autocommit=True, connect_timeout=DB_CONNECTION_TIMEOUT)
+                conn = connect_direct(db_url, name="checkpointer_setup", autocommit=True)
                 logger.info(f"Database connection established on attempt {attempt}")
                 return conn
             except Exception as e:
@@ -109,12 +110,8 @@ class MemoryManager:
 
         # 4. 尝试创建连接池和 checkpointer
         try:
-            self._pool = AsyncConnectionPool(
-                conninfo=db_url,
-                timeout=DB_CONNECTION_TIMEOUT,
-                min_size=1,
-                max_idle=300,
-            )
+            # 连接上限、超时及 PgBouncer 兼容参数与 ORM 连接池统一配置，并纳入连接池指标
+            self._pool = create_psycopg_pool(db_url, name="checkpointer", max_idle=300)
             self._checkpointer = AsyncPostgresSaver(self._pool)
             logger.info("AsyncPostgresSaver initialized successfully")
         except Exception as e:
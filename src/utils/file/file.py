@@ -1,4 +1,7 @@
 import os
+import re
+import codecs
+import logging
 import requests
 import uuid
 import chardet
@@ -9,6 +12,13 @@ from urllib.parse import urlparse
 from pptx import Presentation
 
 MAX_FILE_SIZE = 10 * 1024 * 1024
+# CSV 编码检测只读取开头的这么多字节，避免对整个文件做 chardet
+CSV_ENCODING_SAMPLE_BYTES = 64 * 1024
+# CSV 解析引擎：c（pandas 默认）或 pyarrow（多线程，需安装 pyarrow，仅用于 UTF-8 文件）
+CSV_READ_ENGINE = os.getenv("CSV_READ_ENGINE", "c").lower()
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+logger = logging.getLogger(__name__)
 
 class File(BaseModel):
     """
@@ -106,6 +116,14 @@ class FileOps:
         """
         获取文件内容和后缀, 5MB大小限制检查, 超出抛异常
         """
+        buffer, ext = FileOps._get_buffer(file_obj)
+        return buffer.getvalue(), ext
+
+    @staticmethod
+    def _get_buffer(file_obj:File) -> tuple[BytesIO, str]:
+        """
+        获取装有文件内容的 BytesIO（位置在开头）和后缀，远程文件直接返回下载缓冲区，不再复制
+        """
         _, ext = infer_file_category(file_obj.url)
 
         if file_obj.is_remote:
@@ -132,8 +150,8 @@ class FileOps:
                                 raise Exception(f"检测到文件超过 5MB，已中断。")
                             downloaded_content.write(chunk)
 
-                    # 获取完整 bytes
-                    return downloaded_content.getvalue(), ext
+                    downloaded_content.seek(0)
+                    return downloaded_content, ext
 
             except requests.RequestException as e:
                 raise RuntimeError(f"网络请求失败: {e}")
@@ -149,7 +167,26 @@ class FileOps:
             '''
 
             with open(file_obj.url, 'rb') as f:
-                return f.read(), ext
+                return BytesIO(f.read()), ext
+
+    @staticmethod
+    def get_size(file_obj: File) -> Optional[int]:
+        """
+        获取文件大小（字节），不下载文件内容
+
+        Returns:
+            本地文件为文件大小，远程文件为响应头 Content-Length；无法获取时返回None
+        """
+        if not file_obj.is_remote:
+            return os.path.getsize(file_obj.url) if os.path.exists(file_obj.url) else None
+        try:
+            # 预签名URL通常只允许 GET，用流式 GET 只读取响应头，不读取 Body
+            with requests.get(file_obj.url, stream=True, timeout=60) as resp:
+                resp.raise_for_status()
+                content_length = resp.headers.get('Content-Length')
+                return int(content_length) if content_length else None
+        except (requests.RequestException, ValueError):
+            return None
 
     @staticmethod
     def save_to_local(file_obj: File, filename: str) -> str:
@@ -213,6 +250,39 @@ class FileOps:
         except Exception as e:
             return f"[FileOps Error] Failed to read content: {str(e)}"
 
+    @staticmethod
+    def read_csv(file_obj: File, engine: Optional[str] = None, **kwargs):
+        """
+        直接从下载缓冲区解析 CSV 为 DataFrame，不解码为整段字符串，也不写临时文件
+
+        编码只根据开头 CSV_ENCODING_SAMPLE_BYTES 字节检测：UTF-8（含 BOM）走快速路径，
+        其他编码用 chardet 检测样本；样本判断为 UTF-8 但后文解码失败时，按整个文件重新检测。
+
+        Args:
+            file_obj: CSV 文件（URL 或本地路径）
+            engine: 解析引擎，c 或 pyarrow，默认为 CSV_READ_ENGINE；pyarrow 只用于 UTF-8 文件，未安装时回退到 c
+            **kwargs: 透传给 pandas.read_csv
+
+        Returns:
+            pandas.DataFrame
+        """
+        import pandas as pd
+        buffer, _ = FileOps._get_buffer(file_obj)
+        with buffer.getbuffer() as view:
+            encoding = detect_encoding(bytes(view[:CSV_ENCODING_SAMPLE_BYTES]))
+        engine = _resolve_csv_engine(engine or CSV_READ_ENGINE, encoding)
+        try:
+            df = pd.read_csv(buffer, encoding=encoding, engine=engine, **kwargs)
+            if engine != 'pyarrow' or not _has_undecoded_columns(df):
+                return df
+        except UnicodeDecodeError:
+            pass
+        with buffer.getbuffer() as view:
+            fallback = _detect_legacy_encoding(bytes(view))
+        logger.warning(f"CSV 按 {encoding} 解码失败，按整个文件检测为 {fallback} 后重试")
+        buffer.seek(0)
+        return pd.read_csv(buffer, encoding=fallback, engine="c", **kwargs)
+
     @staticmethod
     def _parse_document_bytes(file_obj: File, content: bytes, ext:str) -> str:
         stream = BytesIO(content)
@@ -244,6 +314,92 @@ class FileOps:
 
         return text_result
 
+def _normalize_encoding(encoding: str) -> str:
+    # chardet 常把 GBK 文本判为 GB2312，个别字不在 GB2312 中会解码失败，统一按超集 GB18030 解码
+    if encoding.lower().replace('-', '').replace('_', '') in ('gb2312', 'gbk', 'gb18030'):
+        return 'gb18030'
+    return encoding
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    根据文件开头的样本检测文本编码
+
+    Args:
+        sample: 文件开头的字节（截断在多字节字符中间也可以）
+
+    Returns:
+        编码名称；带 BOM 的 UTF-8 返回 utf-8-sig
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # final=False：样本末尾被截断的多字节字符不算解码错误
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    return _detect_legacy_encoding(sample)
+
+
+def _detect_legacy_encoding(data: bytes) -> str:
+    # 从第一个非 ASCII 字节处取样给 chardet：开头大段 ASCII 会稀释样本，导致误判（如把 GBK 判为 Big5）
+    match = _NON_ASCII.search(data)
+    start = match.start() if match else 0
+    charset = chardet.detect(data[start:start + CSV_ENCODING_SAMPLE_BYTES])
+    return _normalize_encoding(charset.get('encoding') or 'utf-8')
+
+
+def detect_file_encoding(path: str, after_decode_error: bool = False) -> str:
+    """
+    检测本地文件的文本编码，只读取样本
+
+    Args:
+        path: 文件路径
+        after_decode_error: 按开头样本检测的编码解码失败后重新检测：从第一个非 ASCII 字节处取样
+
+    Returns:
+        编码名称
+    """
+    with open(path, 'rb') as f:
+        if not after_decode_error:
+            return detect_encoding(f.read(CSV_ENCODING_SAMPLE_BYTES))
+        offset = 0
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                return 'utf-8'
+            match = _NON_ASCII.search(block)
+            if match:
+                f.seek(offset + match.start())
+                return _detect_legacy_encoding(f.read(CSV_ENCODING_SAMPLE_BYTES))
+            offset += len(block)
+
+
+def _has_undecoded_columns(df) -> bool:
+    # pyarrow 遇到非法 UTF-8 不报错，而是把整列读为 bytes，检查每列第一个非空值即可
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].dropna()
+        if len(values) and isinstance(values.iloc[0], bytes):
+            return True
+    return False
+
+
+def _resolve_csv_engine(engine: str, encoding: str) -> str:
+    if engine != 'pyarrow':
+        return 'c'
+    if encoding not in ('utf-8', 'utf-8-sig'):
+        return 'c'
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("未安装 pyarrow，CSV 解析回退到 c 引擎")
+        return 'c'
+    return 'pyarrow'
+
+
 def read_docx(cont_stream) -> str:
     """
     使用docx2python按顺序读取内容
@@ -0,0 +1,52 @@
+"""
+大模型异步调用
+
+SDK 的 LLMClient 只提供同步的 invoke/stream。异步节点用同一客户端（请求头、鉴权与同步调用一致）
+构建 ChatOpenAI，在事件循环上流式等待响应，大模型调用期间不占用线程。
+"""
+from typing import Any, Dict, List, Optional
+from coze_coding_dev_sdk import LLMClient, LLMConfig
+from cozeloop.decorator import observe
+from langchain_core.messages import AIMessage, BaseMessage
+
+
+@observe(name="llm_ainvoke")
+async def ainvoke_llm(
+    llm_client: LLMClient,
+    messages: List[BaseMessage],
+    model: str = "doubao-seed-1-8-251228",
+    thinking: Optional[str] = "disabled",
+    temperature: Optional[float] = 1.0,
+    max_completion_tokens: Optional[int] = 32768,
+) -> AIMessage:
+    """
+    异步调用大模型，返回完整响应（与 LLMClient.invoke 相同：流式读取后组装）
+
+    Args:
+        llm_client: SDK 客户端，提供请求头与鉴权配置
+        messages: 消息列表
+        model: 模型ID
+        thinking: 思考模式
+        temperature: 温度参数
+        max_completion_tokens: 最大完成 token 数
+
+    Returns:
+        AIMessage，response_metadata 中包含 finish_reason
+    """
+    llm_config = LLMConfig(
+        model=model,
+        thinking=thinking,
+        temperature=temperature,
+        max_completion_tokens=max_completion_tokens,
+        streaming=True,
+    )
+    llm = llm_client._create_llm(llm_config)
+
+    content_parts: List[str] = []
+    response_metadata: Dict[str, Any] = {}
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            content_parts.append(str(chunk.content))
+        if chunk.response_metadata:
+            response_metadata.update(chunk.response_metadata)
+    return AIMessage(content="".join(content_parts), response_metadata=response_metadata)
@@ -0,0 +1,157 @@
+"""
+大模型配置与提示词模板注册表
+
+翻译任务会产生成千上万个批次，每个批次都重新读取配置文件、编译Jinja模板并创建
+LLMClient 的开销不可忽略。注册表在进程内缓存：
+- 配置文件：首次读取后缓存，仅当文件 mtime/大小变化时重新加载
+- 提示词模板：按配置文件缓存编译后的 jinja2.Template，配置重新加载时一并失效
+- LLMClient：SDK配置（密钥、地址）全进程共享，客户端按 run_id 复用，
+  保证链路请求头（logid 等）仍然来自各自请求的 Context
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from jinja2 import Template
+from coze_coding_utils.runtime_ctx.context import Context
+from coze_coding_dev_sdk import LLMClient
+
+logger = logging.getLogger(__name__)
+
+# 按 run_id 缓存的 LLMClient 数量上限
+LLM_CLIENT_CACHE_SIZE = 256
+
+
+class LLMConfigEntry:
+    """一个配置文件的缓存条目：配置字典、配置哈希及编译后的模板"""
+
+    def __init__(self, cfg_file: str, cfg: dict, signature: Tuple[int, int]):
+        self.cfg_file = cfg_file
+        self.cfg = cfg
+        self.signature = signature
+        self.cfg_hash = hashlib.sha256(
+            json.dumps(cfg, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+        self._templates: Dict[str, Template] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model_config(self) -> dict:
+        return self.cfg.get("config", {})
+
+    def get_template(self, name: str) -> Template:
+        """
+        获取编译后的提示词模板
+
+        Args:
+            name: 模板名称，如 sp/up/sp_multi/up_multi，不存在时视为空模板
+
+        Returns:
+            jinja2.Template
+        """
+        template = self._templates.get(name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    template = Template(self.cfg.get(name, ""))
+                    self._templates[name] = template
+        return template
+
+
+class LLMConfigRegistry:
+    """进程级配置注册表"""
+
+    def __init__(self, client_cache_size: int = LLM_CLIENT_CACHE_SIZE):
+        self._entries: Dict[str, LLMConfigEntry] = {}
+        self._lock = threading.Lock()
+        self._client_config: Any = None
+        self._clients: "OrderedDict[Optional[str], LLMClient]" = OrderedDict()
+        self._client_cache_size = client_cache_size
+        self._stats: Dict[str, int] = {"loads": 0, "reloads": 0, "hits": 0}
+        # 命中计数单独加锁，命中路径不等待配置文件加载
+        self._stats_lock = threading.Lock()
+
+    def get(self, cfg_file: str) -> LLMConfigEntry:
+        """
+        获取配置文件对应的缓存条目，文件变化时重新加载
+
+        Args:
+            cfg_file: 配置文件绝对路径
+
+        Returns:
+            LLMConfigEntry；条目内的配置字典为共享对象，调用方不应修改
+        """
+        stat = os.stat(cfg_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(cfg_file)
+        if entry is not None and entry.signature == signature:
+            with self._stats_lock:
+                self._stats["hits"] += 1
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(cfg_file)
+            if entry is not None and entry.signature == signature:
+                return entry
+            with open(cfg_file, 'r', encoding='utf-8') as fd:
+                cfg = json.load(fd)
+            if entry is None:
+                self._stats["loads"] += 1
+            else:
+                self._stats["reloads"] += 1
+                logger.info(f"大模型配置文件已变更，重新加载: {cfg_file}")
+            entry = LLMConfigEntry(cfg_file, cfg, signature)
+            self._entries[cfg_file] = entry
+            return entry
+
+    def get_client(self, ctx: Optional[Context] = None) -> LLMClient:
+        """
+        获取可复用的 LLMClient
+
+        Args:
+            ctx: 请求上下文，同一 run_id 复用同一个客户端
+
+        Returns:
+            LLMClient
+        """
+        run_id = getattr(ctx, 'run_id', None)
+        with self._lock:
+            client = self._clients.get(run_id)
+            if client is not None and client.ctx is ctx:
+                self._clients.move_to_end(run_id)
+                return client
+            if self._client_config is None:
+                client = LLMClient(ctx=ctx)
+                self._client_config = client.config
+            else:
+                client = LLMClient(config=self._client_config, ctx=ctx)
+            self._clients[run_id] = client
+            while len(self._clients) > self._client_cache_size:
+                self._clients.popitem(last=False)
+            return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取加载/命中计数"""
+        with self._lock, self._stats_lock:
+            stats = dict(self._stats)
+            stats["files"] = len(self._entries)
+            stats["clients"] = len(self._clients)
+        return stats
+
+
+_registry: Optional[LLMConfigRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_config_registry() -> LLMConfigRegistry:
+    """获取进程级配置注册表单例"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMConfigRegistry()
+    return _registry
@@ -0,0 +1,208 @@
+"""
+进程级大模型调用调度器
+
+所有语言、所有请求的翻译批次进入同一个调度器：
+- 全局并发上限：LLM_MAX_CONCURRENCY（默认8），同步任务与异步任务共享同一额度
+- 按 run_id 分队列，在各 run 之间轮询放行，保证多个请求公平分享并发
+- 同步任务（submit）由调度器的工作线程执行；异步任务（arun）在调用方事件循环上执行，
+  调度器只负责放行，相当于一个按 run 公平排队的信号量
+- 提供排队数、执行中数量等指标
+"""
+import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 全局大模型并发上限
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+
+class _SyncTask:
+    """由工作线程执行的同步任务"""
+
+    def __init__(self, run_id: str, future: Future, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        self.run_id = run_id
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+
+class _AsyncWaiter:
+    """等待放行的异步任务"""
+
+    def __init__(self, run_id: str, loop: asyncio.AbstractEventLoop, future: "asyncio.Future[None]"):
+        self.run_id = run_id
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+class LLMScheduler:
+    """大模型调用调度器：全局并发上限 + 按 run 公平轮询"""
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        # {run_id: 等待放行的任务队列}，按轮询顺序排列
+        self._queues: "OrderedDict[str, Deque[Any]]" = OrderedDict()
+        # 已放行、等待工作线程执行的同步任务
+        self._ready: Deque[_SyncTask] = deque()
+        self._in_flight: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._workers = []
+        self._completed = 0
+        self._failed = 0
+
+    def _ensure_workers(self) -> None:
+        # 调用方需持有 self._cond
+        while len(self._workers) < self.max_concurrency:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"llm-scheduler-{len(self._workers)}",
+                daemon=True
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _enqueue(self, entry: Any) -> None:
+        # 调用方需持有 self._cond
+        self._queues.setdefault(entry.run_id, deque()).append(entry)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # 调用方需持有 self._cond；在额度内按 run 轮询放行任务
+        while self._queues and sum(self._in_flight.values()) < self.max_concurrency:
+            run_id, queue = next(iter(self._queues.items()))
+            entry = queue.popleft()
+            if queue:
+                self._queues.move_to_end(run_id)
+            else:
+                del self._queues[run_id]
+            self._in_flight[run_id] = self._in_flight.get(run_id, 0) + 1
+            if isinstance(entry, _SyncTask):
+                self._ready.append(entry)
+                self._cond.notify()
+            else:
+                entry.granted = True
+                entry.loop.call_soon_threadsafe(_wake, entry.future)
+
+    def _release(self, run_id: str, failed: bool) -> None:
+        with self._cond:
+            self._in_flight[run_id] -= 1
+            if self._in_flight[run_id] == 0:
+                del self._in_flight[run_id]
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+            self._dispatch()
+
+    def submit(self, run_id: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        提交一个同步大模型调用任务，由调度器工作线程执行
+
+        Args:
+            run_id: 所属运行ID，同一 run 的任务按提交顺序执行，不同 run 之间轮询
+            fn: 任务函数
+            *args, **kwargs: 任务参数
+
+        Returns:
+            concurrent.futures.Future
+        """
+        future: Future = Future()
+        with self._cond:
+            self._ensure_workers()
+            self._enqueue(_SyncTask(run_id, future, fn, args, kwargs))
+        return future
+
+    async def arun(self, run_id: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        在当前事件循环上执行一个异步大模型调用任务，执行前按 run 公平排队等待额度
+
+        Args:
+            run_id: 所属运行ID
+            fn: 异步任务函数
+            *args, **kwargs: 任务参数
+
+        Returns:
+            任务返回值
+        """
+        waiter = _AsyncWaiter(run_id, asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+        with self._cond:
+            self._enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._cond:
+                if not waiter.granted:
+                    self._queues.get(run_id, deque()).remove(waiter)
+                    if run_id in self._queues and not self._queues[run_id]:
+                        del self._queues[run_id]
+            if waiter.granted:
+                self._release(run_id, failed=True)
+            raise
+
+        failed = True
+        try:
+            result = await fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self._release(run_id, failed)
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                task = self._ready.popleft()
+
+            failed = False
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    task.future.set_result(task.fn(*task.args, **task.kwargs))
+                except BaseException as e:
+                    failed = True
+                    task.future.set_exception(e)
+            self._release(task.run_id, failed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调度器指标：排队数、执行中数量及各 run 的分布"""
+        with self._cond:
+            runs: Dict[str, Dict[str, int]] = {}
+            for run_id, queue in self._queues.items():
+                runs.setdefault(run_id, {"queued": 0, "in_flight": 0})["queued"] = len(queue)
+            for run_id, count in self._in_flight.items():
+                runs.setdefault(run_id, {"queued": 0, "in_flight": 0})["in_flight"] = count
+            return {
+                "max_concurrency": self.max_concurrency,
+                "queue_depth": sum(len(queue) for queue in self._queues.values()),
+                "in_flight": sum(self._in_flight.values()),
+                "completed": self._completed,
+                "failed": self._failed,
+                "runs": runs,
+            }
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """获取进程级调度器单例"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,54 @@
+"""
+大模型异步调用单元测试：使用 SDK 客户端构建的模型流式读取，组装结果与 LLMClient.invoke 一致
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from utils.llm.async_client import ainvoke_llm
+
+
+class FakeChatModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+class FakeClient:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.llm_configs = []
+
+    def _create_llm(self, llm_config, **kwargs):
+        self.llm_configs.append(llm_config)
+        return FakeChatModel(self.chunks)
+
+
+def test_streams_and_assembles_response():
+    client = FakeClient([
+        AIMessageChunk(content='{"0": "Go'),
+        AIMessageChunk(content=""),
+        AIMessageChunk(content='ods"}', response_metadata={"finish_reason": "length", "model_name": "m"}),
+    ])
+    response = asyncio.run(ainvoke_llm(
+        client, [HumanMessage(content="商品")], model="m", temperature=0.3, max_completion_tokens=100, thinking="disabled"
+    ))
+    assert response.content == '{"0": "Goods"}'
+    assert response.response_metadata == {"finish_reason": "length", "model_name": "m"}
+    llm_config = client.llm_configs[0]
+    assert llm_config.model == "m" and llm_config.temperature == 0.3
+    assert llm_config.max_completion_tokens == 100 and llm_config.streaming
+
+
+def test_empty_response():
+    response = asyncio.run(ainvoke_llm(FakeClient([]), [HumanMessage(content="商品")]))
+    assert response.content == "" and response.response_metadata == {}
@@ -0,0 +1,183 @@
+"""
+大模型调用调度器单元测试：全局并发上限、按 run 轮询、异常与取消时释放额度
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.llm.scheduler import LLMScheduler
+
+TIMEOUT = 5
+
+
+def wait_until(predicate):
+    deadline = time.monotonic() + TIMEOUT
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.001)
+
+
+def test_global_concurrency_limit():
+    scheduler = LLMScheduler(max_concurrency=2)
+    release = threading.Event()
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def task():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(TIMEOUT)
+        with lock:
+            running[0] -= 1
+
+    futures = [scheduler.submit(f"run-{i % 3}", task) for i in range(10)]
+    wait_until(lambda: running[0] == 2)
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 2 and stats["queue_depth"] == 8
+    release.set()
+    for future in futures:
+        future.result(TIMEOUT)
+    assert peak[0] == 2
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 0 and stats["completed"] == 10 and stats["runs"] == {}
+
+
+def test_round_robin_across_runs():
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = threading.Event()
+    order = []
+
+    def task(name):
+        order.append(name)
+        if name == "A1":
+            release.wait(TIMEOUT)
+
+    futures = [scheduler.submit("A", task, "A1")]
+    wait_until(lambda: order == ["A1"])
+    futures += [scheduler.submit("A", task, name) for name in ("A2", "A3", "A4")]
+    futures += [scheduler.submit("B", task, name) for name in ("B1", "B2")]
+    assert scheduler.get_stats()["runs"] == {"A": {"queued": 3, "in_flight": 1}, "B": {"queued": 2, "in_flight": 0}}
+    release.set()
+    for future in futures:
+        future.result(TIMEOUT)
+    # 同一 run 内按提交顺序执行，run 之间轮流放行
+    assert order == ["A1", "A2", "B1", "A3", "B2", "A4"]
+
+
+def test_exception_releases_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    failing = scheduler.submit("run", fail)
+    succeeding = scheduler.submit("run", lambda: "ok")
+    assert isinstance(failing.exception(TIMEOUT), ValueError)
+    assert succeeding.result(TIMEOUT) == "ok"
+    stats = scheduler.get_stats()
+    assert stats["failed"] == 1 and stats["completed"] == 1 and stats["in_flight"] == 0
+
+
+def test_cancelled_submit_is_skipped_and_releases_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = threading.Event()
+    called = []
+
+    first = scheduler.submit("run", release.wait, TIMEOUT)
+    cancelled = scheduler.submit("run", called.append, "cancelled")
+    assert cancelled.cancel()
+    third = scheduler.submit("run", called.append, "third")
+    release.set()
+    first.result(TIMEOUT)
+    third.result(TIMEOUT)
+    assert called == ["third"]
+    wait_until(lambda: scheduler.get_stats()["in_flight"] == 0)
+
+
+def test_arun_shares_limit_and_releases_on_exception():
+    scheduler = LLMScheduler(max_concurrency=2)
+    running = [0]
+    peak = [0]
+
+    async def task(fail):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        if fail:
+            raise ValueError("boom")
+        return "ok"
+
+    async def main():
+        return await asyncio.gather(
+            *(scheduler.arun(f"run-{i % 2}", task, i % 3 == 0) for i in range(9)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert peak[0] == 2
+    assert sum(isinstance(result, ValueError) for result in results) == 3
+    stats = scheduler.get_stats()
+    assert stats["failed"] == 3 and stats["completed"] == 6 and stats["in_flight"] == 0
+
+
+def test_arun_cancelled_while_waiting():
+    scheduler = LLMScheduler(max_concurrency=1)
+    called = []
+
+    async def task(name, release=None):
+        called.append(name)
+        if release is not None:
+            await release.wait()
+        return name
+
+    async def main():
+        release = asyncio.Event()
+        first = asyncio.ensure_future(scheduler.arun("A", task, "first", release))
+        waiting = asyncio.ensure_future(scheduler.arun("B", task, "waiting"))
+        await asyncio.sleep(0.01)
+        assert scheduler.get_stats()["queue_depth"] == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # 取消的任务已从队列移除，不占用额度
+        assert scheduler.get_stats()["queue_depth"] == 0
+        release.set()
+        assert await first == "first"
+        assert await scheduler.arun("B", task, "after") == "after"
+
+    asyncio.run(main())
+    assert called == ["first", "after"]
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 0 and stats["runs"] == {}
+
+
+def test_arun_cancelled_while_running_releases_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(TIMEOUT)
+
+        running = asyncio.ensure_future(scheduler.arun("run", hang))
+        await started.wait()
+        assert scheduler.get_stats()["in_flight"] == 1
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        assert scheduler.get_stats()["in_flight"] == 0
+        assert await asyncio.wait_for(scheduler.arun("run", asyncio.sleep, 0, "ok"), TIMEOUT) == "ok"
+
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+token估算与批次打包单元测试
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.llm import tokens
+from utils.llm.tokens import (
+    char_token_estimator,
+    estimate_input_tokens,
+    estimate_output_tokens,
+    pack_segments,
+    set_token_estimator,
+)
+
+LANGUAGES = ["英文", "日文"]
+
+
+@pytest.fixture(autouse=True)
+def default_estimator():
+    set_token_estimator(None)
+    yield
+    set_token_estimator(None)
+
+
+def make_segments(count, text="商品名称示例"):
+    return [("名称", f"{text}{i}") for i in range(count)]
+
+
+def output_tokens(batch, languages=LANGUAGES, compact=False):
+    return sum(estimate_output_tokens(col, text, languages, compact) for col, text in batch)
+
+
+def test_char_token_estimator():
+    assert char_token_estimator("") == 0
+    assert char_token_estimator("商品") == 2
+    assert char_token_estimator("abcdefgh") == 2
+    assert char_token_estimator("商品abcde") == 4
+
+
+def test_estimates_grow_with_languages_and_shrink_when_compact():
+    one = estimate_output_tokens("名称", "商品名称", ["英文"])
+    two = estimate_output_tokens("名称", "商品名称", LANGUAGES)
+    assert two > one
+    assert estimate_output_tokens("名称", "商品名称", LANGUAGES, compact=True) < two
+    assert estimate_input_tokens("名称", "商品名称", compact=True) < estimate_input_tokens("名称", "商品名称")
+
+
+def test_empty_input():
+    assert pack_segments([], LANGUAGES, output_budget=1000) == []
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_batches_stay_within_budgets(compact):
+    segments = make_segments(200)
+    output_budget = 400
+    input_budget = 300
+    batches = pack_segments(segments, LANGUAGES, output_budget, input_budget=input_budget, max_items=50, compact=compact)
+    assert len(batches) > 1
+    # 顺序打包：拼接后与输入完全一致，不丢失、不重复
+    assert [segment for batch in batches for segment in batch] == segments
+    for batch in batches:
+        assert len(batch) <= 50
+        assert output_tokens(batch, compact=compact) <= output_budget
+        assert sum(estimate_input_tokens(col, text, compact) for col, text in batch) <= input_budget
+
+
+def test_max_items_limits_batch_size():
+    batches = pack_segments(make_segments(25), LANGUAGES, output_budget=10 ** 9, input_budget=10 ** 9, max_items=10)
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+
+
+def test_segment_larger_than_budget_gets_own_batch():
+    small = make_segments(3)
+    large = ("描述", "超长描述" * 200)
+    assert estimate_output_tokens(*large, LANGUAGES) > 300
+    batches = pack_segments(small[:2] + [large] + small[2:], LANGUAGES, output_budget=300)
+    assert batches == [small[:2], [large], small[2:]]
+
+
+def test_custom_estimator_is_used():
+    set_token_estimator(lambda text: 100)
+    assert tokens.get_token_estimator()("任意") == 100
+    # 每个片段的输出估算都超过预算，每个片段独占一个批次
+    assert pack_segments(make_segments(3), ["英文"], output_budget=100) == [[segment] for segment in make_segments(3)]
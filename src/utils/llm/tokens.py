@@ -0,0 +1,134 @@
+"""
+翻译批次的token估算与打包
+
+估算器可替换：默认使用字符启发式（CJK字符约1个token，其他字符约4个一个token），
+需要更精确时可通过 set_token_estimator 注入基于分词器的实现。
+"""
+import os
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 单个批次的输入token预算（仅统计待翻译数据，不含提示词模板）
+TRANSLATE_BATCH_INPUT_TOKENS = int(os.getenv("TRANSLATE_BATCH_INPUT_TOKENS", "3000"))
+# 单个批次的输出token预算，未配置时使用 max_completion_tokens * OUTPUT_TOKEN_HEADROOM
+TRANSLATE_BATCH_OUTPUT_TOKENS = int(os.getenv("TRANSLATE_BATCH_OUTPUT_TOKENS", "0"))
+# 单个批次的最大片段数，避免模型在过长列表中漏项
+TRANSLATE_BATCH_MAX_ITEMS = int(os.getenv("TRANSLATE_BATCH_MAX_ITEMS", "100"))
+# 仅使用 max_completion_tokens 的80%，为估算误差留余量
+OUTPUT_TOKEN_HEADROOM = 0.8
+
+# 每个JSON字段的列名、引号等结构开销
+TOKENS_PER_FIELD = 12
+# 紧凑格式（[编号, 原文] / {编号: 译文}）每个字段的编号、引号等结构开销
+TOKENS_PER_COMPACT_FIELD = 4
+# 译文相对中文原文的token膨胀系数（按目标语言）
+OUTPUT_EXPANSION: Dict[str, float] = {
+    "英文": 1.5,
+    "日文": 1.2,
+    "韩文": 1.3,
+    "法文": 1.8,
+    "德文": 1.8,
+    "西班牙文": 1.8,
+    "俄文": 2.0,
+    "意大利文": 1.8,
+}
+DEFAULT_OUTPUT_EXPANSION = 2.0
+
+_CJK_RE = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+TokenEstimator = Callable[[str], int]
+
+
+def char_token_estimator(text: str) -> int:
+    """字符启发式估算：CJK字符按1个token计，其余字符按4个一个token计"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+_estimator: TokenEstimator = char_token_estimator
+
+
+def set_token_estimator(estimator: Optional[TokenEstimator]) -> None:
+    """替换全局token估算器，传入None恢复默认的字符启发式"""
+    global _estimator
+    _estimator = estimator or char_token_estimator
+
+
+def get_token_estimator() -> TokenEstimator:
+    """获取当前token估算器"""
+    return _estimator
+
+
+def estimate_input_tokens(column: str, text: str, compact: bool = False) -> int:
+    """估算一个片段 {列名: 原文}（紧凑格式为 [编号, 原文]）的输入token数"""
+    if compact:
+        return _estimator(text) + TOKENS_PER_COMPACT_FIELD
+    return _estimator(column) + _estimator(text) + TOKENS_PER_FIELD
+
+
+def estimate_output_tokens(column: str, text: str, target_languages: Sequence[str], compact: bool = False) -> int:
+    """估算一个片段的输出token数：原文回显 + 每种目标语言的译文（紧凑格式不回显原文）"""
+    source_tokens = _estimator(text)
+    if compact:
+        total = TOKENS_PER_COMPACT_FIELD
+        for lang in target_languages:
+            expansion = OUTPUT_EXPANSION.get(lang, DEFAULT_OUTPUT_EXPANSION)
+            lang_key = _estimator(lang) if len(target_languages) > 1 else 0
+            total += source_tokens * expansion + lang_key + TOKENS_PER_COMPACT_FIELD
+        return int(total)
+    total = source_tokens + _estimator(column) + TOKENS_PER_FIELD
+    for lang in target_languages:
+        expansion = OUTPUT_EXPANSION.get(lang, DEFAULT_OUTPUT_EXPANSION)
+        total += source_tokens * expansion + _estimator(f"{column}_{lang}_翻译") + TOKENS_PER_FIELD
+    return int(total)
+
+
+def get_output_token_budget(max_completion_tokens: int) -> int:
+    """获取单个批次的输出token预算"""
+    if TRANSLATE_BATCH_OUTPUT_TOKENS > 0:
+        return min(TRANSLATE_BATCH_OUTPUT_TOKENS, max_completion_tokens)
+    return int(max_completion_tokens * OUTPUT_TOKEN_HEADROOM)
+
+
+def pack_segments(
+    segments: List[Tuple[str, str]],
+    target_languages: Sequence[str],
+    output_budget: int,
+    input_budget: int = TRANSLATE_BATCH_INPUT_TOKENS,
+    max_items: int = TRANSLATE_BATCH_MAX_ITEMS,
+    compact: bool = False
+) -> List[List[Tuple[str, str]]]:
+    """
+    按输入/输出token预算顺序打包片段
+
+    Args:
+        segments: 片段列表：[(列名, 原文), ...]
+        target_languages: 本批次需要返回的目标语言
+        output_budget: 单批次输出token预算
+        input_budget: 单批次输入token预算
+        max_items: 单批次最大片段数
+        compact: 是否按紧凑格式估算
+
+    Returns:
+        批次列表；单个片段超出预算时独占一个批次
+    """
+    batches: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    current_in = 0
+    current_out = 0
+    for col, text in segments:
+        seg_in = estimate_input_tokens(col, text, compact)
+        seg_out = estimate_output_tokens(col, text, target_languages, compact)
+        if current and (
+            current_in + seg_in > input_budget
+            or current_out + seg_out > output_budget
+            or len(current) >= max_items
+        ):
+            batches.append(current)
+            current, current_in, current_out = [], 0, 0
+        current.append((col, text))
+        current_in += seg_in
+        current_out += seg_out
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,38 @@
+"""
+单元格分类：判断单元格是否包含需要翻译的中文文本
+
+中文列中常混有空值、被渲染成 "nan" 的缺失值、纯数字、SKU、链接等内容，
+这些单元格发送给大模型只会浪费token，由合并节点原样保留即可。
+"""
+import re
+from typing import Any
+
+# 中文字符（CJK统一汉字及扩展A区）
+_CJK_RE = re.compile(r'[㐀-䶿一-鿿]')
+# 链接、邮箱等整体不需要翻译的文本
+_NON_TRANSLATABLE_RE = re.compile(
+    r'^(?:[a-z][a-z0-9+.-]*://\S+|www\.\S+|[\w.+-]+@[\w-]+\.[\w.-]+)$',
+    re.IGNORECASE
+)
+# pandas/数据库导出时常见的缺失值文本
+_MISSING_VALUES = frozenset({"nan", "none", "null", "nat", "n/a", "#n/a"})
+
+
+def is_translatable_cell(value: Any) -> bool:
+    """
+    判断单元格是否需要翻译：字符串、包含中文字符，且不是链接/邮箱/缺失值
+
+    Args:
+        value: 单元格的值
+
+    Returns:
+        需要发送给大模型时返回True
+    """
+    if not isinstance(value, str):
+        return False
+    text = value.strip()
+    if not text or text.lower() in _MISSING_VALUES:
+        return False
+    if _CJK_RE.search(text) is None:
+        return False
+    return _NON_TRANSLATABLE_RE.match(text) is None
@@ -0,0 +1,127 @@
+"""
+多模式串匹配（Aho-Corasick 自动机）
+
+一次构建、多次扫描：扫描一段文本的时间与文本长度线性相关，与词条数量无关，
+适合在大量单元格中查找术语表中出现的词条。
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+# 转移表的键：节点下标左移该位数后与字符码位按位或，单个字典即可容纳整棵字典树
+_CHAR_BITS = 21
+
+
+class TermMatcher:
+    """术语多模式匹配器"""
+
+    def __init__(self, terms: Iterable[str]):
+        # 转移表：{(节点 << _CHAR_BITS) | 字符码位: 子节点}，比每个节点一个字典节省大量内存
+        self._goto: Dict[int, int] = {}
+        self._fail: List[int] = [0]
+        # {节点: 以该节点结尾的所有词条（包含经失败链可达的词条）}
+        self._output: Dict[int, Tuple[str, ...]] = {}
+        self._size = 0
+        for term in set(terms):
+            if isinstance(term, str) and term:
+                self._add(term)
+        self._build()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add(self, term: str) -> None:
+        node = 0
+        for char in term:
+            key = (node << _CHAR_BITS) | ord(char)
+            nxt = self._goto.get(key)
+            if nxt is None:
+                nxt = len(self._fail)
+                self._goto[key] = nxt
+                self._fail.append(0)
+            node = nxt
+        self._output[node] = (term,)
+        self._size += 1
+
+    def _build(self) -> None:
+        # 按广度优先计算失败指针，并把失败链上的输出合并到当前节点
+        children: Dict[int, List[Tuple[int, int]]] = {}
+        for key, child in self._goto.items():
+            children.setdefault(key >> _CHAR_BITS, []).append((key & ((1 << _CHAR_BITS) - 1), child))
+        goto, fail, output = self._goto, self._fail, self._output
+        queue = deque(child for _, child in children.get(0, []))
+        while queue:
+            node = queue.popleft()
+            for code, child in children.get(node, []):
+                queue.append(child)
+                state = fail[node]
+                while state and ((state << _CHAR_BITS) | code) not in goto:
+                    state = fail[state]
+                target = goto.get((state << _CHAR_BITS) | code, 0)
+                fail[child] = target if target != child else 0
+                if target in output:
+                    output[child] = output.get(child, ()) + output[target]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        扫描文本，逐个返回命中的词条（包括重叠、嵌套的命中）
+
+        Args:
+            text: 待扫描文本
+
+        Returns:
+            迭代器：(起始位置, 词条)
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for i, char in enumerate(text):
+            code = ord(char)
+            nxt = goto.get((node << _CHAR_BITS) | code)
+            while nxt is None and node:
+                node = fail[node]
+                nxt = goto.get((node << _CHAR_BITS) | code)
+            node = nxt or 0
+            if node in output:
+                for term in output[node]:
+                    yield i - len(term) + 1, term
+
+    def find_terms(self, texts: Iterable[str]) -> Set[str]:
+        """
+        查找多段文本中出现过的所有词条（包括被更长词条包含的词条）
+
+        Args:
+            texts: 文本列表，非字符串元素会被忽略
+
+        Returns:
+            命中的词条集合
+        """
+        found: Set[str] = set()
+        if not self._size:
+            return found
+        for text in texts:
+            if isinstance(text, str):
+                found.update(term for _, term in self.iter_matches(text))
+        return found
+
+    def find_longest_terms(self, texts: Iterable[str]) -> Set[str]:
+        """
+        查找多段文本中的词条，重叠时取最左最长匹配（如"天使扣"命中时不再单独返回"天使"）
+
+        Args:
+            texts: 文本列表，非字符串元素会被忽略
+
+        Returns:
+            命中的词条集合
+        """
+        found: Set[str] = set()
+        if not self._size:
+            return found
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            end = 0
+            for start, term in sorted(self.iter_matches(text), key=lambda match: (match[0], -len(match[1]))):
+                if start >= end:
+                    found.add(term)
+                    end = start + len(term)
+        return found
@@ -0,0 +1,57 @@
+"""
+单元格分类单元测试
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.text.cell_classifier import is_translatable_cell
+
+
+@pytest.mark.parametrize("value, expected", [
+    # 缺失值
+    (None, False),
+    (float("nan"), False),
+    ("nan", False),
+    ("NaN", False),
+    (" None ", False),
+    ("null", False),
+    ("#N/A", False),
+    # 数字
+    (0, False),
+    (12.5, False),
+    (True, False),
+    ("12345", False),
+    ("3.14", False),
+    # SKU、型号等纯ASCII编码
+    ("SKU-2023-001", False),
+    ("AB12_cd34", False),
+    # 链接、邮箱
+    ("https://example.com/商品/123", False),
+    ("www.例子.com", False),
+    ("客服@example.com", False),
+    # 空白
+    ("", False),
+    ("   ", False),
+    ("\t\n", False),
+    ("　", False),
+    # 中文及中英混排
+    ("商品", True),
+    ("  商品名称  ", True),
+    ("iPhone 15 手机壳", True),
+    ("SKU-001 红色", True),
+    ("尺码: XL", True),
+    ("100%纯棉", True),
+    ("链接见 https://example.com", True),
+    ("㐀", True),
+    # 非中文文字
+    ("Hello world", False),
+    ("こんにちは", False),
+    ("안녕하세요", False),
+])
+def test_is_translatable_cell(value, expected):
+    assert is_translatable_cell(value) is expected
@@ -0,0 +1,82 @@
+"""
+TermMatcher 单元测试：与逐位置暴力匹配的结果对比
+"""
+import random
+import sys
+from pathlib import Path
+
+# 添加src目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.text.term_matcher import TermMatcher
+
+
+def brute_force_terms(terms, texts):
+    """所有出现过的词条（包括重叠、嵌套）"""
+    return {term for text in texts if isinstance(text, str) for term in set(terms) if term and term in text}
+
+
+def brute_force_longest_terms(terms, texts):
+    """从左到右，每个位置取最长词条，命中后跳过该词条"""
+    terms = {term for term in terms if term}
+    found = set()
+    for text in texts:
+        if not isinstance(text, str):
+            continue
+        i = 0
+        while i < len(text):
+            matches = [term for term in terms if text.startswith(term, i)]
+            if matches:
+                longest = max(matches, key=len)
+                found.add(longest)
+                i += len(longest)
+            else:
+                i += 1
+    return found
+
+
+def test_nested_terms_prefer_longest():
+    matcher = TermMatcher(["天使", "天使扣", "扣子"])
+    assert matcher.find_terms(["天使扣子"]) == {"天使", "天使扣", "扣子"}
+    assert matcher.find_longest_terms(["天使扣子"]) == {"天使扣"}
+    assert matcher.find_longest_terms(["天使的扣子"]) == {"天使", "扣子"}
+
+
+def test_overlapping_terms_leftmost_wins():
+    matcher = TermMatcher(["ab", "bc", "abc", "cd"])
+    assert matcher.find_longest_terms(["abcd"]) == {"abc"}
+    assert matcher.find_longest_terms(["xbcd"]) == {"bc"}
+    assert matcher.find_terms(["abcd"]) == {"ab", "bc", "abc", "cd"}
+
+
+def test_term_inside_longer_term_via_fail_link():
+    # "不锈钢" 只能经失败链在 "锈钢板" 之前的节点上命中
+    matcher = TermMatcher(["不锈钢", "锈钢板", "钢"])
+    assert matcher.find_terms(["不锈钢板"]) == {"不锈钢", "锈钢板", "钢"}
+    assert matcher.find_longest_terms(["不锈钢板"]) == {"不锈钢"}
+
+
+def test_non_str_input_ignored():
+    matcher = TermMatcher(["商品", None, 3, ""])
+    assert len(matcher) == 1
+    texts = ["新商品", None, float("nan"), 42, b"\xe5\x95\x86"]
+    assert matcher.find_terms(texts) == {"商品"}
+    assert matcher.find_longest_terms(texts) == {"商品"}
+
+
+def test_empty_matcher():
+    matcher = TermMatcher([])
+    assert len(matcher) == 0
+    assert matcher.find_terms(["商品"]) == set()
+    assert matcher.find_longest_terms(["商品"]) == set()
+
+
+def test_matches_brute_force_on_random_cases():
+    rng = random.Random(0)
+    alphabet = "天使扣子钢板不锈ab"
+    for _ in range(300):
+        terms = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(0, 12))]
+        texts = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15))) for _ in range(rng.randint(1, 4))]
+        matcher = TermMatcher(terms)
+        assert matcher.find_terms(texts) == brute_force_terms(terms, texts), (terms, texts)
+        assert matcher.find_longest_terms(texts) == brute_force_longest_terms(terms, texts), (terms, texts)